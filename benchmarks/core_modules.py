@@ -0,0 +1,346 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+# Drives the core modules against a local fake steam server on a
+# virtual clock, so hours of waiting take a few seconds. Each run is
+# executed in its own process and reports wall time, requests issued,
+# event loop wakeups, peak RSS and allocations.
+#
+# usage: python benchmarks/core_modules.py [-m MODULE ...] [-s SCALE ...]
+#                                          [-o OUTPUT] [-c PREVIOUS_OUTPUT]
+#                                          [--process-executors] [--memory-budget MB]
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, List
+
+os.environ['XDG_CONFIG_HOME'] = tempfile.mkdtemp()
+
+import steam_tools_ng  # noqa: E402
+from steam_tools_ng import config  # noqa: E402 (config must be imported first)
+from steam_tools_ng.core import cardfarming, confirmations, coupons, market, steam_process, steamgifts  # noqa: E402
+from steam_tools_ng.testing import fake_steam, virtual_time  # noqa: E402
+
+import stlib  # noqa: E402
+from stlib import community, internals, plugins, universe, webapi  # noqa: E402
+
+session_index = 0
+steamid = universe.generate_steamid(76561198000000000)
+identity_secret = 'cnOgv/KdpLtgdqBSA5K5N9ZgVF8='
+results_directory = Path(__file__).parent / 'results'
+process_executors = False
+
+
+async def wait_available() -> None:
+    pass
+
+
+def scenario_data(module: str, scale: int) -> fake_steam.FakeSteamData:
+    sizes = {'games': 10, 'coupons': 0, 'orders': 0, 'confirmations': 0, 'giveaways': 0}
+    sizes[{
+        'cardfarming': 'games',
+        'coupons': 'coupons',
+        'market': 'orders',
+        'confirmations': 'confirmations',
+        'steamgifts': 'giveaways',
+    }[module]] = scale
+
+    data = fake_steam.FakeSteamData.generate(**sizes)
+
+    if module == 'cardfarming':
+        rng = random.Random(0)
+
+        for game in data.games:
+            game.cards = rng.randint(1, 3)
+
+    if module == 'market':
+        # stlib doesn't stop paging listings when there are more than 100
+        for order in data.orders[200:]:
+            order.buy = True
+
+    if module == 'steamgifts':
+        data.points = scale * 50
+
+    return data
+
+
+def configure(module: str, memory_budget: int) -> None:
+    config.init()
+    config.init_plugins()
+
+    # short waits keep the number of loop iterations reasonable on
+    # large scenarios; the wait itself costs nothing on a virtual clock
+    settings = {
+        'cardfarming': {
+            'mandatory_waiting': 120,
+            'wait_while_running': 60,
+            'wait_for_drops': 10,
+            'invisible': False,
+            'memory_budget': memory_budget,
+        },
+        'coupons': {
+            'botids': str(steamid.id64),
+            'tokens': 'faketoken',
+            'blacklist': '',
+            'minimum_discount': 0,
+        },
+        'steamgifts': {
+            'wait_after_each_strategy': 10,
+            'wait_after_full_cycle': 60,
+        },
+        'login': {
+            'identity_secret': identity_secret,
+            'deviceid': 'android:fake',
+        },
+    }
+
+    for section, options in settings.items():
+        for option, value in options.items():
+            config.parser.set(section, option, str(value))
+
+    for index in range(2, 6):
+        config.parser.set(f'steamgifts_strategy{index}', 'enable', '')
+
+
+async def new_sessions(server: fake_steam.FakeSteam) -> None:
+    await stlib.set_default_http_params(session_index, **server.http_params())
+    await community.Community.new_session(session_index, **server.session_kwargs('community'))
+    await webapi.SteamWebAPI.new_session(session_index, api_key='fakekey', **server.session_kwargs('webapi'))
+    await internals.Internals.new_session(session_index, **server.session_kwargs('internals'))
+    await plugins.get_plugin('steamgifts').Main.new_session(session_index, **server.session_kwargs('steamgifts'))
+
+
+def module_generator(module: str) -> AsyncGenerator[Any, None]:
+    if module == 'cardfarming':
+        if process_executors:
+            cardfarming.executor_class = fake_steam.FakeSteamAPIProcessExecutor
+        else:
+            cardfarming.executor_class = fake_steam.FakeSteamAPIExecutor
+
+        steam_process.watcher = fake_steam.running_steam_watcher()
+        return cardfarming.main(steamid, session_index=session_index)
+
+    if module == 'coupons':
+        fetch_event = asyncio.Event()
+        fetch_event.set()
+        return coupons.main(steamid, fetch_event, wait_available, session_index)
+
+    if module == 'market':
+        fetch_buy_event = asyncio.Event()
+        fetch_sell_event = asyncio.Event()
+        fetch_buy_event.set()
+        fetch_sell_event.set()
+        return market.main(fetch_buy_event, fetch_sell_event, session_index)
+
+    if module == 'confirmations':
+        return confirmations.main(steamid, wait_available, session_index)
+
+    return steamgifts.main(session_index)
+
+
+async def run_module(module: str, scale: int, latency: float) -> Dict[str, Any]:
+    async with fake_steam.FakeSteam(scenario_data(module, scale), latency=latency) as server:
+        await new_sessions(server)
+        loop = asyncio.get_running_loop()
+        assert isinstance(loop, virtual_time.VirtualTimeLoop)
+        updates = 0
+        errors = 0
+        peak_running_games = 0
+
+        try:
+            async for module_data in module_generator(module):
+                updates += 1
+                peak_running_games = max(peak_running_games, cardfarming.running_games.value())
+
+                if module_data.error:
+                    errors += 1
+        finally:
+            # the shared http session is closed by the first one
+            for session in (community.Community, webapi.SteamWebAPI, internals.Internals):
+                with contextlib.suppress(KeyError):
+                    await session.destroy_session(session_index, no_fail=True)
+
+        return {
+            'updates': updates,
+            'module_errors': errors,
+            'requests': server.total_requests,
+            'requests_by_route': dict(server.requests),
+            'virtual_time': round(loop.offset, 3),
+            'peak_running_games': peak_running_games,
+        }
+
+
+def worker(
+        module: str,
+        scale: int,
+        latency: float,
+        real_time: bool,
+        allocations: bool,
+        memory_budget: int,
+) -> Dict[str, Any]:
+    configure(module, memory_budget)
+    logging.disable(logging.CRITICAL)
+    loop = virtual_time.VirtualTimeLoop(skip_idle=not real_time)
+
+    if allocations:
+        tracemalloc.start()
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+    result = virtual_time.run(run_module(module, scale, latency), loop)
+    wall_time = time.perf_counter() - start
+    cpu_time = time.process_time() - cpu_start
+
+    if allocations:
+        _current, allocated_peak = tracemalloc.get_traced_memory()
+        allocated_blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        tracemalloc.stop()
+    else:
+        allocated_peak = allocated_blocks = 0
+
+    return {
+        'module': module,
+        'scale': scale,
+        'wall_time': round(wall_time, 4),
+        'cpu_time': round(cpu_time, 4),
+        'loop_wakeups': loop.wakeups,
+        # ru_maxrss is in kilobytes on linux and bytes on macOS
+        'peak_rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024),
+        'allocated_peak': allocated_peak,
+        'allocated_blocks': allocated_blocks,
+        **result,
+    }
+
+
+def compare(results: List[Dict[str, Any]], previous_file: Path) -> None:
+    with open(previous_file, encoding='utf-8') as file:
+        previous_runs = {(run['module'], run['scale']): run for run in json.load(file)['runs']}
+
+    for run in results:
+        previous = previous_runs.get((run['module'], run['scale']))
+
+        if not previous:
+            continue
+
+        changes = []
+
+        for metric in ('wall_time', 'requests', 'loop_wakeups', 'peak_rss', 'allocated_peak'):
+            if previous[metric]:
+                changes.append(f"{metric} {(run[metric] - previous[metric]) / previous[metric]:+.1%}")
+
+        print(f"{run['module']:>13} {run['scale']:>6}: {', '.join(changes)}")
+
+
+def main() -> None:
+    modules = ['cardfarming', 'coupons', 'market', 'confirmations', 'steamgifts']
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-m', '--module', choices=modules, action='append', dest='modules')
+    parser.add_argument('-s', '--scale', type=int, action='append', dest='scales')
+    parser.add_argument('-o', '--output', type=Path)
+    parser.add_argument('-c', '--compare', type=Path, help='previous output to compare with')
+    parser.add_argument('--latency', type=float, default=0.0, help='fake server latency in seconds')
+    parser.add_argument('--real-time', action='store_true', help="don't skip idle waits")
+    parser.add_argument('--no-allocations', action='store_true', help="don't trace allocations (faster)")
+    parser.add_argument(
+        '--process-executors',
+        action='store_true',
+        help='farm cards with a worker process per game, like the real executors',
+    )
+    parser.add_argument('--memory-budget', type=int, default=0, help='card farming memory budget in MB')
+    parser.add_argument('--worker', nargs=2, metavar=('MODULE', 'SCALE'), help=argparse.SUPPRESS)
+    params = parser.parse_args()
+
+    if params.worker:
+        global process_executors
+
+        module, scale = params.worker
+        process_executors = params.process_executors
+        result = worker(
+            module,
+            int(scale),
+            params.latency,
+            params.real_time,
+            not params.no_allocations,
+            params.memory_budget,
+        )
+        print(json.dumps(result))
+        return
+
+    runs = []
+
+    for module in params.modules or modules:
+        for scale in params.scales or [10, 100, 1000]:
+            command = [sys.executable, __file__, '--worker', module, str(scale), '--latency', str(params.latency)]
+
+            if params.real_time:
+                command.append('--real-time')
+
+            if params.no_allocations:
+                command.append('--no-allocations')
+
+            if params.process_executors:
+                command.append('--process-executors')
+
+            command.extend(['--memory-budget', str(params.memory_budget)])
+
+            process = subprocess.run(command, capture_output=True, text=True, check=False)
+
+            if process.returncode:
+                print(f"{module} {scale} failed:\n{process.stderr}", file=sys.stderr)
+                continue
+
+            run = json.loads(process.stdout.splitlines()[-1])
+            runs.append(run)
+
+            print(
+                f"{module:>13} {scale:>6}: {run['wall_time']:8.3f}s wall, {run['requests']:>7} requests, "
+                f"{run['loop_wakeups']:>9} wakeups, {run['peak_rss'] / 2 ** 20:6.1f}MB rss, "
+                f"{run['allocated_peak'] / 2 ** 20:6.1f}MB allocated",
+            )
+
+    output = params.output or results_directory / f'{steam_tools_ng.__version__}-{time.strftime("%Y%m%d%H%M%S")}.json'
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump({
+            'version': steam_tools_ng.__version__,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'runs': runs,
+        }, file, indent=2)
+
+    print(f"results saved at {output}")
+
+    if params.compare:
+        compare(runs, params.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+# Inserts coupon rows in a SimpleTextTree (as used by the coupons tab)
+# row by row and in batches. Needs PyGObject with GTK 4 and a display.
+#
+# usage: python benchmarks/simple_text_tree.py [rows]
+import argparse
+import random
+import time
+from typing import Callable, List
+
+import gi
+
+gi.require_version('Gtk', '4.0')
+
+from gi.repository import GLib, Gtk
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng.gtk import utils
+
+coupons_tree_headers = '_price', '_name', 'link', 'botid', 'token', 'assetid'
+Inserter = Callable[[utils.SimpleTextTree, List[utils.SimpleTextTreeItem]], None]
+
+
+def new_tree() -> utils.SimpleTextTree:
+    tree = utils.SimpleTextTree(*coupons_tree_headers)
+    window = Gtk.Window()
+    window.set_child(tree)
+    window.present()
+    return tree
+
+
+def new_rows(tree: utils.SimpleTextTree, count: int) -> List[utils.SimpleTextTreeItem]:
+    return [
+        tree.new_item(
+            f"{random.uniform(0.5, 60):.2f}",
+            utils.markup(f"75% OFF Game {index} - Coupon", foreground='blue', underline='single'),
+            f"https://store.steampowered.com/search/?list_of_subs={index}",
+            '76561199642778394',
+            'BsccNcth',
+            str(index),
+        )
+        for index in range(count)
+    ]
+
+
+def process_events() -> None:
+    context = GLib.MainContext.default()
+
+    while context.pending():
+        context.iteration(False)
+
+
+def measure(name: str, count: int, insert: Inserter) -> None:
+    tree = new_tree()
+    rows = new_rows(tree, count)
+    process_events()
+
+    start = time.perf_counter()
+    insert(tree, rows)
+    process_events()
+    elapsed = time.perf_counter() - start
+
+    print(f"{name:>14}: {elapsed * 1000:10.1f}ms ({count / elapsed:,.0f} rows/s)")
+    tree.get_root().destroy()
+
+
+def append_row(tree: utils.SimpleTextTree, rows: List[utils.SimpleTextTreeItem]) -> None:
+    for row in rows:
+        tree.append_row(row)
+
+
+def append_rows(tree: utils.SimpleTextTree, rows: List[utils.SimpleTextTreeItem]) -> None:
+    tree.append_rows(rows)
+
+
+def append_batches(tree: utils.SimpleTextTree, rows: List[utils.SimpleTextTreeItem]) -> None:
+    for index in range(0, len(rows), 100):
+        tree.append_rows(rows[index:index + 100])
+
+
+def replace_all(tree: utils.SimpleTextTree, rows: List[utils.SimpleTextTreeItem]) -> None:
+    tree.replace_all(rows)
+    tree.replace_all(rows)
+
+
+def update_rows(tree: utils.SimpleTextTree, rows: List[utils.SimpleTextTreeItem]) -> None:
+    tree.update_rows(rows, key='assetid')
+    # a single row changed, as when a confirmation is accepted
+    rows = rows.copy()
+    rows[len(rows) // 2] = tree.new_item('0.00', 'changed', '', '', '', rows[len(rows) // 2].assetid)
+    tree.update_rows(rows, key='assetid')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('rows', type=int, nargs='?', default=10_000)
+    params = parser.parse_args()
+
+    Gtk.init()
+
+    measure('append_row', params.rows, append_row)
+    measure('append_rows', params.rows, append_rows)
+    measure('batches of 100', params.rows, append_batches)
+    measure('replace_all x2', params.rows, replace_all)
+    measure('update_rows x2', params.rows, update_rows)
+
+
+if __name__ == "__main__":
+    main()
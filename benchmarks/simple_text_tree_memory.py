@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+# Measures the per-row memory footprint of SimpleTextTreeItem holding
+# coupon data, compared with the setattr based item it replaced.
+# Needs PyGObject with GTK 4 (no display is needed).
+#
+# usage: python benchmarks/simple_text_tree_memory.py [rows]
+import argparse
+import contextlib
+import gc
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple, Type
+
+import gi
+
+gi.require_version('Gtk', '4.0')
+
+from gi.repository import Gio, GObject
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng.gtk import utils
+
+coupons_tree_headers = '_price', '_name', 'link', 'botid', 'token', 'assetid'
+
+
+class SetattrTreeItem(GObject.Object):
+    # SimpleTextTreeItem before the shared column mapping, unchanged, kept as the baseline
+    def __init__(self, *args: str, headers: Tuple[str, ...], **kwargs: Any) -> None:
+        for name, value in kwargs.items():
+            setattr(self, name, value)
+
+        for index, header in enumerate(headers):
+            name = header.replace(' ', '_').lower()
+
+            # remove translation mark
+            if name.startswith('_'):
+                name = name[1:]
+
+            with contextlib.suppress(IndexError):
+                setattr(self, name, args[index])
+
+        super(GObject.Object, self).__init__()
+        self.children: List[SetattrTreeItem] = []
+
+
+def coupon_row(index: int) -> Tuple[str, ...]:
+    return (
+        f"{index % 60}.99",
+        utils.markup(f"75% OFF Game {index} - Coupon", foreground='blue', underline='single'),
+        f"https://store.steampowered.com/search/?list_of_subs={index}",
+        '76561199642778394',
+        'BsccNcth',
+        str(index),
+    )
+
+
+def measure(name: str, item_type: Type[GObject.Object], rows: int, new_item: Callable[[int], Any]) -> float:
+    store = Gio.ListStore.new(item_type)
+    gc.collect()
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = [new_item(index) for index in range(rows)]
+    store.splice(0, 0, items)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name}:")
+    print(f"  build time: {elapsed * 1000:.1f}ms")
+    print(f"  python heap: {current / 1024 / 1024:.2f}MiB (peak {peak / 1024 / 1024:.2f}MiB)")
+    print(f"  per row: {current / rows:.0f} bytes")
+
+    # columns are readable as attributes in both
+    assert items[-1].assetid == str(rows - 1)
+    return current / rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('rows', type=int, nargs='?', default=50_000)
+    params = parser.parse_args()
+
+    columns: Dict[str, int] = {utils.column_key(header): index for index, header in enumerate(coupons_tree_headers)}
+    print(f"rows: {params.rows:,}")
+
+    baseline = measure(
+        'setattr (baseline)',
+        SetattrTreeItem,
+        params.rows,
+        lambda index: SetattrTreeItem(*coupon_row(index), headers=coupons_tree_headers),
+    )
+
+    current = measure(
+        'compact item',
+        utils.SimpleTextTreeItem,
+        params.rows,
+        lambda index: utils.SimpleTextTreeItem(*coupon_row(index), columns=columns),
+    )
+
+    print(f"saved per row: {baseline - current:.0f} bytes ({(baseline - current) / baseline:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+# Measures CPU time spent by the console status path (translation,
+# logging and output) for a burst of status updates at info level.
+# The output goes to a pseudo terminal that is drained in background.
+#
+# usage: python benchmarks/status_updates.py [updates]
+import argparse
+import os
+import pty
+import sys
+import tempfile
+import threading
+import time
+
+os.environ['XDG_CONFIG_HOME'] = tempfile.mkdtemp()
+
+from steam_tools_ng import config, i18n  # noqa: E402 (config must be imported first)
+from steam_tools_ng.console import utils  # noqa: E402
+from steam_tools_ng.core.utils import ModuleData  # noqa: E402
+
+_ = i18n.get_translation
+
+
+def drain(master: int) -> None:
+    while True:
+        try:
+            if not os.read(master, 65536):
+                break
+        except OSError:
+            break
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument('updates', type=int, nargs='?', default=10_000)
+    params = parser.parse_args()
+
+    config.init()
+    config.parser.set('logger', 'log_level', 'info')
+    config.parser.set('logger', 'log_console_level', 'info')
+    config.init_logger()
+
+    master, slave = pty.openpty()
+    threading.Thread(target=drain, args=(master,), daemon=True).start()
+    real_stdout = os.dup(1)
+    os.dup2(slave, 1)
+    sys.stdout = sys.stderr = os.fdopen(1, 'w', closefd=False)
+
+    cpu_start = time.process_time()
+    start = time.perf_counter()
+
+    for index in range(params.updates):
+        module_data = ModuleData(
+            status=_("Waiting Changes"),
+            display=_("Running {}").format(index),
+            info=_("Farming cards"),
+            level=(index % 100, 100),
+        )
+        utils.set_console(module_data)
+
+    config.shutdown_logger()
+    sys.stdout.flush()
+    elapsed = time.perf_counter() - start
+    cpu_time = time.process_time() - cpu_start
+
+    os.dup2(real_stdout, 1)
+    sys.stdout = sys.__stdout__
+    sys.stderr = sys.__stderr__
+
+    print(f"updates: {params.updates:,}")
+    print(f"wall time: {elapsed * 1000:.1f}ms")
+    print(f"cpu time: {cpu_time * 1000:.1f}ms ({cpu_time / params.updates * 1_000_000:.1f}us per update)")
+
+
+if __name__ == "__main__":
+    main()
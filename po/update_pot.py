@@ -42,6 +42,7 @@ if __name__ == "__main__":
             [
                 'xgettext',
                 '-jo',
+                '--keyword=LazyMessage',
                 output_file,
                 file,
                 f'--copyright-holder={copyright_}',
@@ -20,17 +20,50 @@ import argparse
 import asyncio
 import contextlib
 import logging
+import shutil
 import sys
 import textwrap
 from multiprocessing import freeze_support
-from pathlib import Path
+from typing import List
 
 from steam_tools_ng import config, i18n, __version__
-from steam_tools_ng.console import cli
 
 _ = i18n.get_translation
 log = logging.getLogger(__name__)
 
+available_modules = ['steamguard', 'steamtrades', 'steamgifts', 'cardfarming', 'fakerun']
+
+
+def module_list(value: str) -> List[str]:
+    modules = [module.strip() for module in value.split(',') if module.strip()]
+
+    if not modules:
+        raise argparse.ArgumentTypeError('No module has been specified')
+
+    for module in modules:
+        if module not in available_modules:
+            raise argparse.ArgumentTypeError(
+                f"invalid choice: '{module}' (choose from {', '.join(available_modules)})"
+            )
+
+    if len(modules) > 1 and 'fakerun' in modules:
+        raise argparse.ArgumentTypeError('fakerun module must run alone')
+
+    return list(dict.fromkeys(modules))
+
+
+def profile_list(value: str) -> List[str]:
+    profiles = [profile.strip() for profile in value.split(',') if profile.strip()]
+
+    if not profiles:
+        raise argparse.ArgumentTypeError('No profile has been specified')
+
+    for profile in profiles:
+        if not profile.replace('-', '').replace('_', '').isalnum():
+            raise argparse.ArgumentTypeError(f"invalid profile name: '{profile}'")
+
+    return list(dict.fromkeys(profiles))
+
 
 def main() -> None:
     freeze_support()
@@ -45,15 +78,26 @@ def main() -> None:
                  steamgifts       | [oneshot]
                  cardfarming      | [oneshot],[gameid]
                  fakerun          | <gameid>
+
+                Multiple modules can run together in a single process
+                using a comma separated list (except fakerun):
+                 steam-tools-ng steamguard,cardfarming,steamgifts
+
+                Multiple accounts can run together using profiles.
+                'default' is the main config file:
+                 steam-tools-ng --accounts default,account2 steamguard
+
+                cardfarming and fakerun use the local steam client,
+                so they can only run with a single profile
                        '''))
 
     command_parser.add_argument(
         'module',
-        choices=['steamguard', 'steamtrades', 'steamgifts', 'cardfarming', 'fakerun'],
+        type=module_list,
         metavar='<module>',
         action='store',
         nargs='?',
-        help='Start a module',
+        help='Start a module (or a comma separated list of modules)',
     )
 
     command_parser.add_argument(
@@ -84,6 +128,50 @@ def main() -> None:
         dest='reset_password',
     )
 
+    command_parser.add_argument(
+        '--accounts',
+        type=profile_list,
+        metavar='<profile>',
+        help='Run modules for a comma separated list of account profiles',
+        dest='accounts',
+    )
+
+    command_parser.add_argument(
+        '--metrics-port',
+        type=int,
+        metavar='<port>',
+        help='Serve metrics in prometheus text format at http://127.0.0.1:<port>/metrics',
+        dest='metrics_port',
+    )
+
+    command_parser.add_argument(
+        '--metrics-file',
+        metavar='<file>',
+        help='Dump metrics in prometheus text format to <file> periodically',
+        dest='metrics_file',
+    )
+
+    command_parser.add_argument(
+        '--loop-monitor',
+        action='store_true',
+        help='Record slow callbacks and report the event loop lag distribution',
+        dest='loop_monitor',
+    )
+
+    command_parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Account CPU time and awaits to each module and save a report in the log directory on exit',
+        dest='profile',
+    )
+
+    command_parser.add_argument(
+        '--cprofile',
+        action='store_true',
+        help='Also save a cProfile dump with the report (slower, implies --profile)',
+        dest='cprofile',
+    )
+
     command_parser.add_argument(
         '--add-authenticator',
         action='store_true',
@@ -113,6 +201,12 @@ def main() -> None:
     )
 
     console_params = command_parser.parse_args()
+    console_params.profile |= console_params.cprofile
+
+    # there's only one steam client running, and it's logged in a single account
+    if console_params.accounts and len(console_params.accounts) > 1:
+        if {'cardfarming', 'fakerun'} & set(console_params.module or []):
+            command_parser.error('cardfarming and fakerun modules must run with a single profile')
 
     if console_params.version:
         print(__version__)
@@ -128,20 +222,34 @@ def main() -> None:
 
     config.init_logger()
 
+    # command line values are not saved in the config file
+    if console_params.metrics_port is not None:
+        config.parser.set('metrics', 'http_port', str(console_params.metrics_port))
+
+    if console_params.metrics_file is not None:
+        config.parser.set('metrics', 'dump_file', console_params.metrics_file)
+
     if console_params.reset:
         config.cookies_file.unlink(missing_ok=True)
         config.config_file.unlink(missing_ok=True)
-        logging.root.removeHandler(logging.root.handlers[0])
-
-        log_directory = config.parser.get("logger", "log_directory")
-        Path(log_directory, 'steam-tools-ng.log').unlink()
-        Path(log_directory, 'steam-tools-ng.log.1').unlink()
+        shutil.rmtree(config.profiles_directory, ignore_errors=True)
+        config.remove_log_files()
 
         log.info(_('Done!'))
         sys.exit(0)
 
+    session_indexes = [0]
+
+    if console_params.accounts:
+        session_indexes = [
+            0 if profile == 'default' else config.load_profile(profile)
+            for profile in console_params.accounts
+        ]
+
     if console_params.reset_password:
-        config.new("login", "password", "")
+        for session_index in session_indexes:
+            config.new("login", "password", "", session_index=session_index)
+
         log.info(_('Done!'))
         sys.exit(0)
 
@@ -150,24 +258,68 @@ def main() -> None:
 
     if not console_params.module:
         if console_params.add_authenticator:
-            console_params.module = "add_authenticator"
+            console_params.module = ["add_authenticator"]
         elif console_params.remove_authenticator:
-            console_params.module = "remove_authenticator"
+            console_params.module = ["remove_authenticator"]
         else:
             log.critical('No module has scheduled to run.')
             log.critical("Use 'steam-tools-ng-gui' for the graphical user interface.")
             sys.exit(1)
 
-    module_name = console_params.module
+    module_names = console_params.module
     module_options = console_params.options
 
-    app = cli.SteamToolsNG(module_name, module_options)
+    # console.cli pulls all the stlib stack, so it's only imported
+    # when a module is going to run (--version, --config-dir, etc. stay fast)
+    from steam_tools_ng import loop_monitor, metrics, profiling, tracing
+    from steam_tools_ng.console import cli
+
+    config.init_plugins()
+
+    apps = [
+        cli.SteamToolsNG(module_names, module_options, session_index)
+        for session_index in session_indexes
+    ]
+
+    if len(apps) > 1:
+        # every profile is prefixed, so the default one isn't ambiguous
+        for app in apps:
+            app.profile_name = app.profile_name or 'default'
+
+    async def run_apps() -> None:
+        # before any task is created, so all of them are accounted
+        if console_params.profile:
+            profiling.start(cprofile=console_params.cprofile)
+
+        if config.parser.getboolean('logger', 'log_trace_spans'):
+            tracing.start()
+
+        # exporters are cancelled (flushing the metrics file) when asyncio.run returns
+        metrics.start_exporters()
+
+        if console_params.loop_monitor:
+            loop_monitor.start(debug_hooks=True, report_interval=600)
+        else:
+            loop_monitor.start()
+
+        await asyncio.gather(*[app.init() for app in apps])
 
     with contextlib.suppress(asyncio.CancelledError, KeyboardInterrupt):
-        asyncio.run(app.init())
+        asyncio.run(run_apps())
+
+    tracing.stop()
+
+    if console_params.profile:
+        profiling.stop()
+
+    # flush pending log records and close log file
+    config.shutdown_logger()
+
+    if console_params.loop_monitor:
+        print(f"\n{loop_monitor.report()}")
 
-    # prevent tries to open log file at shutdown
-    logging.root.removeHandler(logging.root.handlers[0])
+    if console_params.profile:
+        print(f"\n{profiling.report()}")
 
     print("\nUntil next time!")
     sys.exit(0)
@@ -16,6 +16,7 @@
 # along with this program. If not, see http://www.gnu.org/licenses/.
 #
 import asyncio
+import atexit
 import configparser
 import locale
 import logging
@@ -24,10 +25,7 @@ import site
 import sys
 from collections import OrderedDict
 from pathlib import Path
-from typing import Any, Dict
-
-from stlib import login
-from stlib import plugins as stlib_plugins
+from typing import Any, Dict, Tuple
 
 from . import i18n, logger_handlers
 
@@ -45,15 +43,25 @@ else:
 config_file_directory = data_dir / 'steam-tools-ng'
 config_file_name = 'steam-tools-ng.config'
 cookies_file_name = 'cookiejar'
+checkpoint_file_name = 'cardfarming.json'
 config_file = config_file_directory / config_file_name
 cookies_file = config_file_directory / cookies_file_name
+profiles_directory = config_file_directory / 'profiles'
+log_file_name = 'steam-tools-ng.log'
+
+log_queue_size = 10000
+log_listener: logger_handlers.BlockingQueueListener | None = None
+log_queue_handler: logger_handlers.BoundedQueueHandler | None = None
 
-try:
-    from stlib import client
-except ImportError as exception:
-    log.error(str(exception))
-    client = None
+# session index -> (profile name, parser, config file, cookies file)
+profiles: Dict[int, Tuple[str, configparser.RawConfigParser, Path, Path]] = {
+    0: ('', parser, config_file, cookies_file),
+}
 
+# session index -> options saved in the profile config file (everything else comes from the main config)
+profile_options: Dict[int, configparser.RawConfigParser] = {
+    0: parser,
+}
 
 # translation module isn't initialized yet
 def _(message: str) -> str:
@@ -142,6 +150,24 @@ default_config: Dict[str, Dict[str, Any]] = {
         'log_level': 'debug',
         'log_console_level': 'info',
         'log_color': True,
+        'log_max_size': 10,
+        'log_rotate_interval': 24,
+        'log_backup_count': 5,
+        'log_compress': True,
+        'log_directory_max_size': 100,
+        'log_trace_spans': False,
+    },
+    'loop_monitor': {
+        'enable': True,
+        'interval': 250,
+        'debug_hooks': False,
+        'slow_callback_duration': 100,
+    },
+    'metrics': {
+        'http_host': '127.0.0.1',
+        'http_port': 0,
+        'dump_file': '',
+        'dump_interval': 60,
     },
     'steam': {
         'api_url': 'https://api.steampowered.com',
@@ -185,6 +211,8 @@ default_config: Dict[str, Dict[str, Any]] = {
         'wait_while_running': 300,
         'wait_for_drops': 120,
         'max_concurrency': 50,
+        'memory_budget': 0,
+        'cpu_budget': 0,
         'invisible': True,
     },
     'fakerun': {
@@ -228,7 +256,11 @@ for index in range(1, 6):
 
 def update_log_level(type_: str, level_string: str) -> None:
     level = getattr(logging, level_string.upper())
-    file_handler, console_handler, *extra_handlers = logging.root.handlers
+
+    if not log_listener:
+        return
+
+    file_handler, console_handler, *extra_handlers = log_listener.handlers
 
     if type_ == "console":
         console_handler.setLevel(level)
@@ -236,13 +268,60 @@ def update_log_level(type_: str, level_string: str) -> None:
         file_handler.setLevel(level)
 
 
-def validate_config(section: str, option: str, defaults: OrderedDict[str, str]) -> None:
-    value = parser.get(section, option)
+def get_parser(session_index: int = 0) -> configparser.RawConfigParser:
+    return profiles[session_index][1]
+
+
+def get_cookies_file(session_index: int = 0) -> Path:
+    return profiles[session_index][3]
+
+
+def get_checkpoint_file(session_index: int = 0) -> Path:
+    # saved in the same directory of the profile cookies
+    return get_cookies_file(session_index).parent / checkpoint_file_name
+
+
+def load_profile(name: str) -> int:
+    for session_index, (profile_name, *_profile) in profiles.items():
+        if profile_name == name:
+            return session_index
+
+    profile_directory = profiles_directory / name
+    profile_directory.mkdir(parents=True, exist_ok=True)
+    profile_file = profile_directory / config_file_name
+
+    options_parser = configparser.RawConfigParser()
+
+    if profile_file.is_file():
+        options_parser.read(profile_file)
+    else:
+        options_parser.read_dict({'login': default_config['login']})
+
+    # profiles inherit everything else from the main config file
+    profile_parser = configparser.RawConfigParser()
+    profile_parser.read_dict(parser)
+    profile_parser.read_dict(options_parser)
+
+    session_index = max(profiles) + 1
+    profiles[session_index] = (name, profile_parser, profile_file, profile_directory / cookies_file_name)
+    profile_options[session_index] = options_parser
+    log.debug(i18n.LazyMessage("Profile {} loaded with session index {}", name, session_index))
+
+    return session_index
+
+
+def validate_config(
+        section: str,
+        option: str,
+        defaults: OrderedDict[str, str],
+        session_index: int = 0,
+) -> None:
+    value = get_parser(session_index).get(section, option)
 
     if value and value not in defaults.keys():
         if option == 'language':
             log.error(_("Unsupported language requested. Fallbacking to English."))
-            new('general', 'language', 'en')
+            new('general', 'language', 'en', session_index=session_index)
             return
 
         raise configparser.Error(_("Please, fix your config file. Available values for {}:\n{}").format(
@@ -283,6 +362,12 @@ def init() -> None:
 
     log_directory.mkdir(parents=True, exist_ok=True)
 
+
+def init_plugins() -> None:
+    # stlib is heavy to import (aiohttp, bs4, steamworks), so it's
+    # only loaded when a module is really going to run
+    from stlib import plugins as stlib_plugins
+
     stlib_plugins.add_search_paths(
         str(Path(os.getcwd(), 'lib', 'stlib-plugins')),
         *[str(Path(site_, 'stlib-plugins')) for site_ in site.getsitepackages()],
@@ -295,7 +380,10 @@ def init() -> None:
     if not stlib_plugins.has_plugin("steamgifts"):
         new("steamgifts", "enable", False)
 
-    if not client:
+    try:
+        from stlib import client  # noqa: F401
+    except ImportError as exception:
+        log.error(str(exception))
         new("cardfarming", "enable", False)
 
 
@@ -304,59 +392,122 @@ def init_logger() -> None:
     log_level = parser.get("logger", "log_level")
     log_console_level = parser.get("logger", "log_console_level")
 
-    log_file_handler = logger_handlers.RotatingFileHandler(log_directory / 'steam-tools-ng.log',
-                                                           backupCount=1,
-                                                           encoding='utf-8')
-    log_file_handler.setFormatter(logging.Formatter('%(name)s:%(levelname)s (%(funcName)s) => %(message)s'))
-    log_file_handler.setLevel(getattr(logging, log_level.upper()))
-
     try:
-        log_file_handler.doRollover()
+        log_file_handler = logger_handlers.SizedTimedRotatingFileHandler(
+            log_directory / log_file_name,
+            max_bytes=parser.getint("logger", "log_max_size") * 1024 * 1024,
+            interval=parser.getint("logger", "log_rotate_interval") * 60 * 60,
+            backup_count=max(1, parser.getint("logger", "log_backup_count")),
+            compress=parser.getboolean("logger", "log_compress"),
+            max_directory_size=parser.getint("logger", "log_directory_max_size") * 1024 * 1024,
+            encoding='utf-8',
+        )
+        log_file_handler.setFormatter(logging.Formatter('%(name)s:%(levelname)s (%(funcName)s) => %(message)s'))
+        log_file_handler.setLevel(getattr(logging, log_level.upper()))
     except PermissionError:
         log.debug(_("Unable to open steam-tools-ng.log"))
-        log_file_handler.close()
         log_file_handler = logger_handlers.NullHandler()  # type: ignore
 
     log_console_handler = logger_handlers.ColoredStreamHandler()
     log_console_level = getattr(logging, log_console_level.upper())
     log_console_handler.setLevel(log_console_level)
+    log_console_handler.addFilter(logger_handlers.ExcludeFilter('stlib'))
 
     log_stlib = logging.getLogger('stlib')
     log_stlib.setLevel(logging.DEBUG)
 
-    # TODO: ColoredStreamHandler isn't working from root log
-    log_stlib.propagate = False
     log_stlib_handler = logger_handlers.ColoredStreamHandler()
     log_stlib_handler.setLevel(log_console_level)
-    log_stlib.addHandler(log_stlib_handler)
-    log_stlib.addHandler(log_file_handler)
+    log_stlib_handler.addFilter(logging.Filter('stlib'))
 
     if 'gtk' not in sys.modules:
         log_console_handler.setLevel(logging.WARNING)
 
+    global log_listener, log_queue_handler
+    log_queue_handler = logger_handlers.BoundedQueueHandler(log_queue_size)
+    log_listener = logger_handlers.BlockingQueueListener(
+        log_queue_handler.queue,
+        log_file_handler,
+        log_console_handler,
+        log_stlib_handler,
+        respect_handler_level=True,
+    )
+    log_listener.start()
+    atexit.register(shutdown_logger)
+
     # noinspection PyArgumentList
-    logging.basicConfig(level=logging.DEBUG, handlers=[log_file_handler, log_console_handler])
+    logging.basicConfig(level=logging.DEBUG, handlers=[log_queue_handler])
+
+
+def shutdown_logger() -> None:
+    global log_listener, log_queue_handler
+
+    if not log_listener or not log_queue_handler:
+        return
+
+    # the listener is still running, so it's written to the log file too
+    log_queue_handler.blocking = True
+
+    if log_queue_handler.total_dropped:
+        log.warning(_("%d log messages has been dropped"), log_queue_handler.total_dropped)
+
+    # blocks until all queued records are written
+    log_listener.stop()
+    logging.root.removeHandler(log_queue_handler)
+
+    file_handler, *console_handlers = log_listener.handlers
+    file_handler.close()
 
+    # console is still available for messages logged after shutdown
+    for handler in console_handlers:
+        logging.root.addHandler(handler)
 
-def new(section: str, option: str, value: Any) -> None:
+    log_listener = None
+    log_queue_handler = None
+
+
+def remove_log_files() -> None:
+    shutdown_logger()
+
+    log_directory = Path(parser.get("logger", "log_directory"))
+
+    for log_file in log_directory.glob(f'{log_file_name}*'):
+        log_file.unlink(missing_ok=True)
+
+
+def new(section: str, option: str, value: Any, session_index: int = 0) -> None:
     if option == "log_level":
         update_log_level("file", value)
     elif option == "log_console_level":
         update_log_level("console", value)
 
-    if parser.get(section, option, fallback='') != str(value):
-        log.debug(_('Saving {}:{} on config file').format(section, option))
-        parser.set(section, option, str(value))
+    _name, profile_parser, profile_file, _cookies_file = profiles[session_index]
+
+    if profile_parser.get(section, option, fallback='') != str(value):
+        log.debug(i18n.LazyMessage('Saving {}:{} on config file', section, option))
+        profile_parser.set(section, option, str(value))
+        options_parser = profile_options.get(session_index, profile_parser)
+
+        if not options_parser.has_section(section):
+            options_parser.add_section(section)
 
-        with open(config_file, 'w', encoding="utf8") as config_file_object:
-            parser.write(config_file_object)
+        options_parser.set(section, option, str(value))
+
+        with open(profile_file, 'w', encoding="utf8") as config_file_object:
+            options_parser.write(config_file_object)
+
+        if session_index == 0:
+            # profiles follow the main config unless they have their own value
+            for index, (_name, other_parser, *_files) in profiles.items():
+                if index != 0 and not profile_options.get(index, other_parser).has_option(section, option):
+                    other_parser.set(section, option, str(value))
     else:
-        log.debug(_('Not saving {}:{} because values are already updated').format(section, option))
+        log.debug(i18n.LazyMessage('Not saving {}:{} because values are already updated', section, option))
 
 
-def remove(section: str, option: str) -> None:
+def remove(section: str, option: str, session_index: int = 0) -> None:
     # Some GUI checks will fail if option doesn't exist
-    new(section, option, '')
+    new(section, option, '', session_index=session_index)
     # parser.remove_option(section, option)
 
     # with open(config_file, 'w', encoding="utf8") as config_file_object:
@@ -364,7 +515,9 @@ def remove(section: str, option: str) -> None:
 
 
 def update_steamid_from_cookies(session_id: int = 0) -> None:
+    from stlib import login
+
     login_session = login.Login.get_session(session_id)
     store_cookies = login_session.http_session.cookie_jar.filter_cookies('https://store.steampowered.com')
     steamid = store_cookies['steamLoginSecure'].value.split('%7')[0]
-    new("login", "steamid", steamid)
+    new("login", "steamid", steamid, session_index=session_id)
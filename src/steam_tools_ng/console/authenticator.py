@@ -37,7 +37,7 @@ _ = i18n.get_translation
 class ManageAuthenticator:
     def __init__(self, cli_: 'cli.SteamToolsNG') -> None:
         self.cli = cli_
-        self.webapi_session = webapi.SteamWebAPI.get_session(0)
+        self.webapi_session = webapi.SteamWebAPI.get_session(self.cli.session_index)
         self.authenticator_data: webapi.AuthenticatorData | None = None
         self._sms_code = ''
 
@@ -52,7 +52,7 @@ class ManageAuthenticator:
 
     @property
     def steamid(self) -> universe.SteamId | None:
-        if steamid := config.parser.getint("login", "steamid"):
+        if steamid := config.get_parser(self.cli.session_index).getint("login", "steamid"):
             try:
                 return universe.generate_steamid(steamid)
             except ValueError:
@@ -121,10 +121,20 @@ class ManageAuthenticator:
             await core.safe_cancel(task)
 
         utils.set_console(info=_("Saving new secrets"))
-        config.new("login", "shared_secret", self.authenticator_data.shared_secret)
-        config.new("login", "identity_secret", self.authenticator_data.identity_secret)
-        config.new("steamguard", "enable", True)
-        config.new("steamguard", "enable_confirmations", True)
+        config.new(
+            "login",
+            "shared_secret",
+            self.authenticator_data.shared_secret,
+            session_index=self.cli.session_index,
+        )
+        config.new(
+            "login",
+            "identity_secret",
+            self.authenticator_data.identity_secret,
+            session_index=self.cli.session_index,
+        )
+        config.new("steamguard", "enable", True, session_index=self.cli.session_index)
+        config.new("steamguard", "enable_confirmations", True, session_index=self.cli.session_index)
 
         utils.set_console(info=_(
             "RECOVERY CODE\n\n"
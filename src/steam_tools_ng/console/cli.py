@@ -20,7 +20,7 @@ import contextlib
 import functools
 import logging
 import sys
-from typing import Any, Callable
+from typing import Any, Callable, Dict, List
 
 import aiohttp
 import stlib
@@ -29,7 +29,7 @@ from stlib import plugins, universe, login, community, webapi, internals
 
 from . import authenticator, utils
 from . import login as cli_login
-from .. import i18n, config, core
+from .. import i18n, config, core, cookies, profiling
 
 log = logging.getLogger(__name__)
 _ = i18n.get_translation
@@ -38,6 +38,9 @@ _ = i18n.get_translation
 def while_running(function: Callable[..., Any]) -> Callable[..., Any]:
     @functools.wraps(function)
     async def wrapper(self: 'SteamToolsNG', *args: Any, **kwargs: Any) -> None:
+        module_name = function.__name__.removeprefix('run_')
+        profiling.current_module.set(f"{self.profile_name}/{module_name}" if self.profile_name else module_name)
+
         while True:
             await function(self, *args, **kwargs)
 
@@ -49,33 +52,36 @@ def while_running(function: Callable[..., Any]) -> Callable[..., Any]:
 
 # noinspection PyUnusedLocal
 class SteamToolsNG:
-    def __init__(self, module_name: str, module_options: str) -> None:
-        self.module_name = module_name
+    def __init__(self, module_names: List[str], module_options: List[str], session_index: int = 0) -> None:
+        self.module_names = module_names
+        self.session_index = session_index
+        self.profile_name = config.profiles[session_index][0]
         self.stop = False
         self.custom_gameid = 0
         self.extra_gameid = None
 
-        if (
-                module_name in {'cardfarming', 'fakerun'}
-                and not stlib.steamworks_available
-        ):
-            log.critical(_(
-                "{} module has been disabled because you have "
-                "a stlib built without SteamWorks support. To enable it again, "
-                "reinstall stlib with SteamWorks support"
-            ).format(module_name))
-            sys.exit(1)
-
-        if module_name in {'steamtrades', 'steamgifts'} and not plugins.has_plugin(module_name):
-            log.critical(_(
-                "{0} module has been disabled because you don't "
-                "have {0} plugin installed. To enable it again, "
-                "install the {0} plugin."
-            ).format(module_name))
-            sys.exit(1)
+        for module_name in module_names:
+            if (
+                    module_name in {'cardfarming', 'fakerun'}
+                    and not stlib.steamworks_available
+            ):
+                log.critical(_(
+                    "{} module has been disabled because you have "
+                    "a stlib built without SteamWorks support. To enable it again, "
+                    "reinstall stlib with SteamWorks support"
+                ).format(module_name))
+                sys.exit(1)
+
+            if module_name in {'steamtrades', 'steamgifts'} and not plugins.has_plugin(module_name):
+                log.critical(_(
+                    "{0} module has been disabled because you don't "
+                    "have {0} plugin installed. To enable it again, "
+                    "install the {0} plugin."
+                ).format(module_name))
+                sys.exit(1)
 
         try:
-            if module_name == 'fakerun':
+            if 'fakerun' in module_names:
                 self.stop = True
 
                 if not module_options:
@@ -86,7 +92,7 @@ class SteamToolsNG:
                     self.stop = True
                     continue
 
-                if module_name in {'cardfarming', 'fakerun'}:
+                if {'cardfarming', 'fakerun'} & set(module_names):
                     self.custom_gameid = int(option)
 
                     if self.custom_gameid == 34:
@@ -100,11 +106,11 @@ class SteamToolsNG:
             logging.critical("Wrong command line params!")
             sys.exit(1)
 
-        self.api_url = config.parser.get("steam", "api_url")
+        self.api_url = config.get_parser(session_index).get("steam", "api_url")
 
     @property
     def steamid(self) -> universe.SteamId | None:
-        if steamid := config.parser.getint("login", "steamid"):
+        if steamid := config.get_parser(self.session_index).getint("login", "steamid"):
             try:
                 return universe.generate_steamid(steamid)
             except ValueError:
@@ -113,7 +119,7 @@ class SteamToolsNG:
         return None
 
     async def init(self) -> None:
-        await core.fix_ssl()
+        await core.fix_ssl(self.session_index)
 
         task = asyncio.create_task(self.async_activate())
         task.add_done_callback(utils.safe_task_callback)
@@ -126,14 +132,14 @@ class SteamToolsNG:
         await login_session.do_login(auto)
 
     async def async_activate(self) -> None:
-        login_session = await login.Login.new_session(0, api_url=self.api_url)
-        utils.set_console(info=_("Logging on Steam. Please wait!"))
+        login_session = await login.Login.new_session(self.session_index, api_url=self.api_url)
+        utils.set_console(info=_("Logging on Steam. Please wait!"), module=self.profile_name)
         try_count = 3
 
         for login_count in range(try_count):
-            if await login_session.is_logged_in():
-                utils.set_console(info=_("Steam login Successful"))
-                config.update_steamid_from_cookies()
+            if await cookies.is_logged_in(login_session):
+                utils.set_console(info=_("Steam login Successful"), module=self.profile_name)
+                config.update_steamid_from_cookies(self.session_index)
                 break
 
             try:
@@ -164,7 +170,7 @@ class SteamToolsNG:
             log.exception(str(error))
             # bypass
 
-        community_session = await community.Community.new_session(0, api_url=self.api_url)
+        community_session = await community.Community.new_session(self.session_index, api_url=self.api_url)
 
         try:
             api_key = await community_session.get_api_key()
@@ -182,16 +188,51 @@ class SteamToolsNG:
             log.error(_("Limited account! Using dummy API key"))
             api_key = (0, 'Steam Tools NG')
 
-        await webapi.SteamWebAPI.new_session(0, api_key=api_key[0], api_url=self.api_url)
-        await internals.Internals.new_session(0)
+        await webapi.SteamWebAPI.new_session(self.session_index, api_key=api_key[0], api_url=self.api_url)
+        await internals.Internals.new_session(self.session_index)
+
+        for module_name in self.module_names:
+            if module_name in ['steamtrades', 'steamgifts']:
+                plugin = plugins.get_plugin(module_name)
+                await plugin.Main.new_session(self.session_index)
+
+        if len(self.module_names) == 1:
+            log.debug(i18n.LazyMessage("Initializing module {}", self.module_names[0]))
+            module = getattr(self, f"run_{self.module_names[0]}")
+            await module()
+            return
+
+        await self.run_modules()
+
+    async def run_modules(self) -> None:
+        tasks: Dict[asyncio.Task[Any], str] = {}
+
+        for module_name in self.module_names:
+            log.debug(i18n.LazyMessage("Initializing module {}", module_name))
+            module = getattr(self, f"run_{module_name}")
+            task = asyncio.create_task(module())
+            task.add_done_callback(utils.safe_task_callback)
+            tasks[task] = module_name
+
+        while tasks:
+            done, _pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+            for task in done:
+                module_name = tasks.pop(task)
+                log.debug(i18n.LazyMessage("Module {} has finished", module_name))
+                utils.get_renderer().remove(self.module_label(module_name))
+
+    def module_label(self, module_name: str) -> str:
+        if self.profile_name:
+            return f"{self.profile_name}/{module_name}"
+
+        if len(self.module_names) > 1:
+            return module_name
 
-        if self.module_name in ['steamtrades', 'steamgifts']:
-            plugin = plugins.get_plugin(self.module_name)
-            await plugin.Main.new_session(0)
+        return ''
 
-        log.debug(_("Initializing module %s"), self.module_name)
-        module = getattr(self, f"run_{self.module_name}")
-        await module()
+    def set_console(self, module_data: core.utils.ModuleData, module_name: str) -> None:
+        utils.set_console(module_data, module=self.module_label(module_name))
 
     async def run_add_authenticator(self) -> None:
         authenticator_manage = authenticator.ManageAuthenticator(self)
@@ -203,31 +244,40 @@ class SteamToolsNG:
 
     @while_running
     async def run_steamguard(self) -> None:
-        steamguard = core.steamguard.main()
+        steamguard = core.steamguard.main(session_index=self.session_index)
 
         async for module_data in steamguard:
-            utils.set_console(module_data)
+            self.set_console(module_data, 'steamguard')
 
     @while_running
     async def run_cardfarming(self) -> None:
-        cardfarming = core.cardfarming.main(self.steamid, custom_game_id=self.custom_gameid)
+        cardfarming = core.cardfarming.main(
+            self.steamid,
+            custom_game_id=self.custom_gameid,
+            session_index=self.session_index,
+        )
 
         async for module_data in cardfarming:
-            utils.set_console(module_data)
+            self.set_console(module_data, 'cardfarming')
 
     @while_running
     async def run_fakerun(self) -> None:
-        fakerun = core.fakerun.main(self.steamid, self.custom_gameid, self.extra_gameid)
+        fakerun = core.fakerun.main(
+            self.steamid,
+            self.custom_gameid,
+            self.extra_gameid,
+            session_index=self.session_index,
+        )
 
         async for module_data in fakerun:
-            utils.set_console(module_data)
+            self.set_console(module_data, 'fakerun')
 
     @while_running
     async def run_steamtrades(self) -> None:
-        steamtrades = core.steamtrades.main()
+        steamtrades = core.steamtrades.main(session_index=self.session_index)
 
         async for module_data in steamtrades:
-            utils.set_console(module_data)
+            self.set_console(module_data, 'steamtrades')
 
             if module_data.action == "login":
                 await self.do_login(auto=True)
@@ -235,10 +285,10 @@ class SteamToolsNG:
 
     @while_running
     async def run_steamgifts(self) -> None:
-        steamgifts = core.steamgifts.main()
+        steamgifts = core.steamgifts.main(session_index=self.session_index)
 
         async for module_data in steamgifts:
-            utils.set_console(module_data)
+            self.set_console(module_data, 'steamgifts')
 
             if module_data.action == "login":
                 await self.do_login(auto=True)
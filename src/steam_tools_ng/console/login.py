@@ -26,7 +26,7 @@ from stlib import login
 from stlib.login import AuthCodeType
 
 from . import utils
-from .. import i18n, config, core
+from .. import i18n, config, core, cookies
 
 if TYPE_CHECKING:
     from . import cli
@@ -58,11 +58,11 @@ class Login:
 
     @property
     def shared_secret(self) -> str:
-        return config.parser.get("login", "shared_secret")
+        return config.get_parser(self.cli.session_index).get("login", "shared_secret")
 
     @property
     def identity_secret(self) -> str:
-        return config.parser.get("login", "identity_secret")
+        return config.get_parser(self.cli.session_index).get("login", "identity_secret")
 
     async def do_login(
             self,
@@ -75,29 +75,27 @@ class Login:
         utils.set_console(info=_("Retrieving user data"))
 
         if auto:
-            self._username = config.parser.get("login", "account_name")
-            encrypted_password = config.parser.get("login", "password")
+            self._username = config.get_parser(self.cli.session_index).get("login", "account_name")
+            encrypted_password = config.get_parser(self.cli.session_index).get("login", "password")
             self.set_password(encrypted_password)
 
         if not self.username or not self.__password:
             user_input = utils.safe_input(_("Please, write your username"))
             assert isinstance(user_input, str), "Safe input is returning bool when it should return str"
-            config.new("login", "account_name", user_input)
+            config.new("login", "account_name", user_input, session_index=self.cli.session_index)
             self._username = user_input
 
             self.__password = getpass.getpass(_("Please, write your password (IT'S HIDDEN, and will be encrypted)"))
             encrypted_password = core.utils.encode_password(self.__password)
-            config.new("login", "password", encrypted_password)
+            config.new("login", "password", encrypted_password, session_index=self.cli.session_index)
 
-        _login_session = login.Login.get_session(0)
-        _login_session.http_session.cookie_jar.clear()
+        _login_session = login.Login.get_session(self.cli.session_index)
 
-        if config.cookies_file.is_file():
-            _login_session.http_session.cookie_jar.load(config.cookies_file)
+        if await cookies.is_logged_in(_login_session):
+            log.info("Steam login Successful")
+            return None
 
-            if await _login_session.is_logged_in():
-                log.info("Steam login Successful")
-                return None
+        _login_session.http_session.cookie_jar.clear()
 
         _login_session.username = self.username
         _login_session.password = self.__password
@@ -190,9 +188,9 @@ class Login:
             }
 
             for key, value in new_configs.items():
-                config.new("login", key, value)
+                config.new("login", key, value, session_index=self.cli.session_index)
 
-            _login_session.http_session.cookie_jar.save(config.cookies_file)
+            _login_session.http_session.cookie_jar.save(config.get_cookies_file(self.cli.session_index))
             self.has_user_data = True
 
             return None
@@ -22,10 +22,12 @@ import multiprocessing
 import os
 import signal
 import sys
+import threading
+import time
 from concurrent.futures import ProcessPoolExecutor
-from typing import List, Tuple, Any
+from typing import Dict, List, Tuple, Any, TextIO
 
-from .. import i18n, core
+from .. import i18n, core, logger_handlers
 
 log = logging.getLogger(__name__)
 _ = i18n.get_translation
@@ -104,6 +106,184 @@ class AsyncInput(ProcessPoolExecutor):
         super().shutdown(*args, **kwargs)
 
 
+class ConsoleRenderer:
+    def __init__(self, stream: TextIO | None = None, frame_rate: int = 10) -> None:
+        self.stream = stream or sys.stdout
+        self.is_tty = self.stream.isatty()
+        self.frame_interval = 1 / frame_rate
+        self.columns = 80
+
+        # one status line for each module (and profile), in the order they started
+        self._lines: Dict[str, str] = {}
+        self._printed: Dict[str, Tuple[str, str]] = {}
+        self._rendered: List[str] = []
+        self._last_paint = 0.0
+        self._console_writes = -1
+        self._size_changed = True
+        self._paint_handle: asyncio.TimerHandle | None = None
+
+        if self.is_tty and hasattr(signal, 'SIGWINCH') and threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGWINCH, self._on_resize)
+
+    def _on_resize(self, *args: Any) -> None:
+        self._size_changed = True
+
+    def _refresh_size(self) -> None:
+        # there's no SIGWINCH on windows
+        if not self._size_changed and sys.platform != 'win32':
+            return
+
+        try:
+            self.columns = os.get_terminal_size(self.stream.fileno()).columns or 80
+        except (OSError, ValueError):
+            self.columns = 80
+
+        self._size_changed = False
+
+    def update(self, line: str, key: str = '', summary: str = '', info: str | None = None) -> None:
+        if not self.is_tty:
+            # progress changes on each tick, so only status and info changes are printed
+            # (info is None when it's a countdown, and the last one is kept)
+            printed_summary, printed_info = self._printed.get(key, ('', ''))
+            info = printed_info if info is None else info
+
+            if (summary or info) and (summary, info) != (printed_summary, printed_info):
+                self._printed[key] = (summary, info)
+                output = ' '.join(text for text in [f'[{key}]' if key else '', summary, info] if text)
+                self.stream.write(f'{output}\n')
+                self.stream.flush()
+
+            return
+
+        self._lines[key] = line
+
+        if self._paint_handle:
+            return
+
+        delay = self._last_paint + self.frame_interval - time.monotonic()
+
+        if delay <= 0:
+            self.paint()
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # nothing would draw a delayed frame
+            self.paint()
+            return
+
+        self._paint_handle = loop.call_later(delay, self.paint)
+
+    def paint(self) -> None:
+        if self._paint_handle:
+            self._paint_handle.cancel()
+            self._paint_handle = None
+
+        self._last_paint = time.monotonic()
+
+        if not self.is_tty:
+            return
+
+        with logger_handlers.ColoredStreamHandler.console_lock:
+            self._refresh_size()
+            width = max(self.columns - 1, 0)
+
+            if sys.platform == 'win32':
+                # the cursor can't be moved between lines, so modules share a single one
+                lines = [' | '.join(self._lines.values())[:width]]
+            else:
+                lines = [line[:width] for line in self._lines.values()]
+
+            # log messages has been written over the status lines
+            if logger_handlers.ColoredStreamHandler.writes != self._console_writes:
+                self._console_writes = logger_handlers.ColoredStreamHandler.writes
+                self._rendered = []
+
+            if lines == self._rendered:
+                return
+
+            if sys.platform == 'win32':
+                previous = self._rendered[0] if self._rendered else ''
+                output = f"\r{lines[0]}{' ' * (len(previous) - len(lines[0]))}\r"
+            else:
+                output = self._render_lines(lines)
+
+            self.stream.write(output)
+            self.stream.flush()
+            self._rendered = lines
+
+    def _render_lines(self, lines: List[str]) -> str:
+        # the cursor is kept at the start of the first line, where log messages are written
+        output = ''
+
+        for index, line in enumerate(lines):
+            if index:
+                output += '\n'
+
+            previous = self._rendered[index] if index < len(self._rendered) else ''
+
+            if line == previous and line:
+                continue
+
+            unchanged = len(os.path.commonprefix([line, previous]))
+            output += '\r'
+
+            if unchanged:
+                output += f'\033[{unchanged}C'
+
+            output += line[unchanged:]
+
+            if len(line) < len(previous) or not previous:
+                output += '\033[K'
+
+        # modules that stopped leave their lines behind
+        if len(lines) < len(self._rendered):
+            output += '\033[J'
+
+        output += '\r'
+
+        if len(lines) > 1:
+            output += f'\033[{len(lines) - 1}A'
+
+        return output
+
+    def remove(self, key: str = '') -> None:
+        self._printed.pop(key, None)
+
+        if self._lines.pop(key, None) is not None:
+            self.paint()
+
+    def write_line(self, text: str) -> None:
+        if not self.is_tty:
+            self.stream.write(f'{text}\n')
+            self.stream.flush()
+            return
+
+        with logger_handlers.ColoredStreamHandler.console_lock:
+            if sys.platform == 'win32':
+                previous = self._rendered[0] if self._rendered else ''
+                self.stream.write(f"\r{' ' * len(previous)}\r")
+            else:
+                self.stream.write('\r\033[J')
+
+            self.stream.write(f'{text}\n')
+            self._rendered = []
+            self.paint()
+
+
+_renderer: ConsoleRenderer | None = None
+
+
+def get_renderer() -> ConsoleRenderer:
+    global _renderer
+
+    if not _renderer or _renderer.stream is not sys.stdout:
+        _renderer = ConsoleRenderer()
+
+    return _renderer
+
+
 def set_console(
         module_data: core.utils.ModuleData | None = None,
         *,
@@ -113,32 +293,42 @@ def set_console(
         error: str = '',
         level: Tuple[int, int] = (0, 0),
         suppress_logging: bool = False,
+        module: str = '',
 ) -> None:
-    for std in (sys.stdout, sys.stderr):
-        print(' ' * (os.get_terminal_size().columns - 1), end='\r', file=std)
+    renderer = get_renderer()
 
     if not module_data:
         module_data = core.utils.ModuleData(display, status, info, error, level, suppress_logging=suppress_logging)
 
     if module_data.error:
         if module_data.suppress_logging:
-            print(module_data.error)
+            renderer.write_line(f"[{module}] {module_data.error}" if module else module_data.error)
+        elif module:
+            log.error("[%s] %s", module, module_data.error)
         else:
             log.error(module_data.error)
 
         return
 
+    line = []
+    summary = []
+
     if module_data.status:
         if not module_data.suppress_logging:
-            log.debug(f"status data: {module_data.status}")
+            log.debug("status data: %s", module_data.status)
 
-        print(module_data.status, end=' ')
+        summary.append(module_data.status)
 
     if module_data.display:
         if not module_data.suppress_logging:
-            log.debug(f"display data: {module_data.display}")
+            log.debug("display data: %s", module_data.display)
+
+        summary.append(module_data.display)
 
-        print(module_data.display, end=' ')
+    if module:
+        line.append(f"[{module}]")
+
+    line.extend(summary)
 
     if module_data.level[1] > 0:
         progress = module_data.level[0] + 1
@@ -146,15 +336,24 @@ def set_console(
         bar_size = 20
 
         total = int(progress * bar_size / total) if total > 0 else bar_size
-        print(f"┌{'█' * total:{bar_size}}┐", end=' ')
+        line.append(f"┌{'█' * total:{bar_size}}┐")
 
     if module_data.info:
         if not module_data.suppress_logging:
-            log.info(module_data.info)
-
-        print(module_data.info, sep=' ', end=' ')
-
-    print('', end='\r')
+            if module:
+                log.info("[%s] %s", module, module_data.info)
+            else:
+                log.info(module_data.info)
+
+        line.append(module_data.info)
+
+    renderer.update(
+        ' '.join(line).replace('\n', ' '),
+        module,
+        ' '.join(summary).replace('\n', ' '),
+        # suppressed info is a countdown
+        None if module_data.suppress_logging else module_data.info.replace('\n', ' '),
+    )
 
 
 def safe_task_callback(task: asyncio.Task[Any]) -> None:
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import asyncio
+import atexit
+import base64
+import binascii
+import json
+import logging
+import time
+from http.cookies import BaseCookie, Morsel
+from pathlib import Path
+from typing import Any, FrozenSet, Iterator, Tuple
+
+import aiohttp
+from yarl import URL
+
+from . import i18n
+
+log = logging.getLogger(__name__)
+_ = i18n.get_translation
+
+store_url = URL('https://store.steampowered.com')
+
+
+class PersistentCookieJar(aiohttp.CookieJar):
+    def __init__(self, file: Path, *args: Any, save_delay: float = 5, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.file = file
+        self.save_delay = save_delay
+        self._loaded = False
+        self._loading = False
+        self._dirty = False
+        self._fingerprint: FrozenSet[Tuple[str, str, str]] = frozenset()
+        self._save_handle: asyncio.TimerHandle | None = None
+        atexit.register(self.flush)
+
+    def _ensure_loaded(self) -> None:
+        if self._loaded or self._loading:
+            return
+
+        self._loaded = True
+
+        if not self.file.is_file():
+            return
+
+        self._loading = True
+
+        try:
+            super().load(self.file)
+        except (OSError, ValueError, EOFError) as exception:
+            log.warning(_("Unable to load cookies from {}: {}").format(self.file, exception))
+        finally:
+            self._loading = False
+
+        self._fingerprint = self._current_fingerprint()
+        log.debug(i18n.LazyMessage("{} cookies loaded from {}", len(self._fingerprint), self.file))
+
+    def _current_fingerprint(self) -> FrozenSet[Tuple[str, str, str]]:
+        morsels = super().__iter__()
+        return frozenset((str(morsel['domain']), morsel.key, morsel.value) for morsel in morsels)
+
+    def _changed(self) -> None:
+        if self._loading:
+            return
+
+        fingerprint = self._current_fingerprint()
+
+        if fingerprint == self._fingerprint:
+            return
+
+        self._fingerprint = fingerprint
+        self._dirty = True
+
+        if self._save_handle:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            self.flush()
+        else:
+            self._save_handle = loop.call_later(self.save_delay, self.flush)
+
+    def update_cookies(self, *args: Any, **kwargs: Any) -> None:
+        self._ensure_loaded()
+        super().update_cookies(*args, **kwargs)
+        self._changed()
+
+    def update_cookies_from_headers(self, *args: Any, **kwargs: Any) -> None:
+        # aiohttp >= 3.12 stores response cookies through this method
+        self._ensure_loaded()
+        super().update_cookies_from_headers(*args, **kwargs)  # type: ignore[misc]
+        self._changed()
+
+    def filter_cookies(self, request_url: URL = URL()) -> 'BaseCookie[str]':
+        self._ensure_loaded()
+        return super().filter_cookies(request_url)
+
+    def clear(self, *args: Any, **kwargs: Any) -> None:
+        # explicit clear always wins over a pending lazy load
+        self._loaded = True
+        super().clear(*args, **kwargs)
+        self._changed()
+
+    def clear_domain(self, domain: str) -> None:
+        self._ensure_loaded()
+        super().clear_domain(domain)
+        self._changed()
+
+    def __iter__(self) -> 'Iterator[Morsel[str]]':
+        self._ensure_loaded()
+        return super().__iter__()
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return super().__len__()
+
+    def load(self, file_path: Any) -> None:
+        self._loaded = True
+        self._loading = True
+
+        try:
+            super().load(file_path)
+        finally:
+            self._loading = False
+
+        self._fingerprint = self._current_fingerprint()
+
+    def save(self, file_path: Any) -> None:
+        self._ensure_loaded()
+        super().save(file_path)
+
+        if Path(file_path) == self.file:
+            self._cancel_pending_save()
+            self._dirty = False
+
+    def flush(self) -> None:
+        self._cancel_pending_save()
+
+        if not self._dirty:
+            return
+
+        try:
+            self.file.parent.mkdir(parents=True, exist_ok=True)
+            super().save(self.file)
+        except OSError as exception:
+            log.error(_("Unable to save cookies on {}: {}").format(self.file, exception))
+        else:
+            self._dirty = False
+            log.debug(i18n.LazyMessage("Cookies saved on {}", self.file))
+
+    def discard(self) -> None:
+        self._cancel_pending_save()
+        self._loaded = True
+        super().clear()
+        self._fingerprint = frozenset()
+        self._dirty = False
+        self.file.unlink(missing_ok=True)
+
+    def _cancel_pending_save(self) -> None:
+        if self._save_handle:
+            self._save_handle.cancel()
+            self._save_handle = None
+
+    def session_expiry(self) -> float | None:
+        login_secure = self.filter_cookies(store_url).get('steamLoginSecure')
+
+        if not login_secure or not login_secure.value:
+            return None
+
+        # steamLoginSecure is <steamid>||<access token JWT>
+        access_token = login_secure.value.replace('%7C', '|').rpartition('|')[2]
+
+        try:
+            payload = access_token.split('.')[1]
+            payload += '=' * (-len(payload) % 4)
+            expiry = json.loads(base64.urlsafe_b64decode(payload))['exp']
+        except (IndexError, KeyError, ValueError, TypeError, binascii.Error):
+            return None
+
+        return float(expiry)
+
+    def has_valid_session(self, margin: int = 300) -> bool:
+        expiry = self.session_expiry()
+
+        return expiry is not None and expiry - margin > time.time()
+
+
+async def is_logged_in(login_session: Any) -> bool:
+    cookie_jar = login_session.http_session.cookie_jar
+
+    if isinstance(cookie_jar, PersistentCookieJar) and cookie_jar.has_valid_session():
+        log.debug(i18n.LazyMessage("Session verified from local cookies"))
+        return True
+
+    result = await login_session.is_logged_in()
+    assert isinstance(result, bool)
+    return result
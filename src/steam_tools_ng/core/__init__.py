@@ -18,39 +18,83 @@
 
 __all__ = [
     'steamguard',
+    'checkpoint',
     'confirmations',
     'steamtrades',
     'steamgifts',
     'coupons',
+    'executor_pool',
     'market',
+    'steam_process',
     'utils',
 ]
 
 import asyncio
 import contextlib
+import importlib
 import ssl
 import sys
 from pathlib import Path
-from typing import Any
+from types import ModuleType
+from typing import Any, TYPE_CHECKING
 
-import aiohttp
-import stlib
+from .. import config
 
-from . import *
+if TYPE_CHECKING:
+    import aiohttp
 
-if stlib.steamworks_available:
+    from . import steamguard, checkpoint, confirmations, steamtrades, steamgifts, coupons, executor_pool, market
+    from . import steam_process, utils
     from . import cardfarming, fakerun
 
+_lazy_modules = [*__all__, 'cardfarming', 'fakerun']
 
-async def fix_ssl() -> None:
-    ssl_context = ssl.SSLContext()
 
-    if hasattr(sys, 'frozen'):
-        _executable_path = Path(sys.executable).parent
-        ssl_context.load_verify_locations(cafile=_executable_path / 'etc' / 'cacert.pem')
+# core modules pulls aiohttp and stlib, so they are only imported when used
+def __getattr__(name: str) -> ModuleType:
+    if name not in _lazy_modules:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-    tcp_connector = aiohttp.TCPConnector(ssl=ssl_context, force_close=True)
-    await stlib.set_default_http_params(0, connector=tcp_connector)
+    if name in ['cardfarming', 'fakerun']:
+        import stlib
+
+        if not stlib.steamworks_available:
+            raise AttributeError(f"{name} requires stlib with SteamWorks support")
+
+    return importlib.import_module(f'.{name}', __name__)
+
+
+_tcp_connector: 'aiohttp.TCPConnector | None' = None
+
+
+async def fix_ssl(session_index: int = 0) -> None:
+    global _tcp_connector
+
+    import aiohttp
+    import stlib
+
+    from .. import cookies, metrics
+
+    connector_owner = not _tcp_connector
+
+    if not _tcp_connector:
+        ssl_context = ssl.SSLContext()
+
+        if hasattr(sys, 'frozen'):
+            _executable_path = Path(sys.executable).parent
+            ssl_context.load_verify_locations(cafile=_executable_path / 'etc' / 'cacert.pem')
+
+        _tcp_connector = aiohttp.TCPConnector(ssl=ssl_context, force_close=True)
+
+    # all profiles share the same connection pool, owned by the first session
+    cookie_jar = cookies.PersistentCookieJar(config.get_cookies_file(session_index))
+    await stlib.set_default_http_params(
+        session_index,
+        connector=_tcp_connector,
+        connector_owner=connector_owner,
+        cookie_jar=cookie_jar,
+        trace_configs=[metrics.http_trace_config()],
+    )
 
 
 # TODO: https://github.com/python/cpython/issues/103486
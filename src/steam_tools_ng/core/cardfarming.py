@@ -16,7 +16,7 @@
 # along with this program. If not, see http://www.gnu.org/licenses/.
 #
 import asyncio
-import contextlib
+import math
 import random
 import time
 from subprocess import call
@@ -25,83 +25,132 @@ from typing import AsyncGenerator, Dict, Any
 import aiohttp
 from stlib import webapi, client, universe, community
 
-from . import utils
-from .. import i18n, config
+from . import checkpoint as checkpoint_, executor_pool, steam_process, utils
+from .. import i18n, config, metrics, tracing
 
 _ = i18n.get_translation
-executors = {}
+executors = executor_pool.ExecutorRegistry()
+executor_class = client.SteamAPIExecutor
 
+cards_dropped = metrics.counter('stng_cardfarming_cards_dropped_total', 'Cards dropped while farming')
+cards_remaining = metrics.gauge('stng_cardfarming_cards_remaining', 'Cards remaining to drop')
+running_games = metrics.gauge('stng_cardfarming_running_games', 'Games being farmed right now')
+concurrency_limit = metrics.gauge('stng_cardfarming_concurrency_limit', 'Games allowed to run at once')
 
-def safe_exit(*args: Any, **kwargs: Any) -> None:
-    for executor in executors.values():
-        with contextlib.suppress(RuntimeError):
-            executor.shutdown(*args, **kwargs)
+
+def safe_exit(*args: Any) -> None:
+    executors.shutdown()
 
 
 async def while_has_cards(
         steamid: universe.SteamId,
         badge: community.Badge,
         play_event: asyncio.Event | None = None,
+        session_index: int = 0,
+        checkpoint: checkpoint_.Checkpoint | None = None,
 ) -> AsyncGenerator[utils.ModuleData, None]:
-    webapi_session = webapi.SteamWebAPI.get_session(0)
-    community_session = community.Community.get_session(0)
+    webapi_session = tracing.traced(webapi.SteamWebAPI.get_session(session_index))
+    community_session = tracing.traced(community.Community.get_session(session_index))
+    parser = config.get_parser(session_index)
+    # state saved by a previous run, only used for the first cycle
+    state = checkpoint.games.get(badge.appid) if checkpoint else None
 
     while badge.cards != 0:
         if play_event:
             await play_event.wait()
 
-        mandatory_waiting = config.parser.getint("cardfarming", "mandatory_waiting")
-        wait_while_running = config.parser.getint("cardfarming", "wait_while_running")
-        wait_for_drops = config.parser.getint("cardfarming", "wait_for_drops")
+        mandatory_waiting = parser.getint("cardfarming", "mandatory_waiting")
+        wait_while_running = parser.getint("cardfarming", "wait_while_running")
+        wait_for_drops = parser.getint("cardfarming", "wait_for_drops")
 
-        try:
-            game_list = await webapi_session.get_owned_games(steamid, appids_filter=[badge.appid])
-            game_info = game_list[0]
-        except aiohttp.ClientError:
-            module_data = utils.ModuleData(error=_("Check your connection. (server down?)"), info=_("Waiting Changes"))
+        if state and state.phase == 'drops':
+            wait_offset = max(math.ceil(state.deadline - time.time()), 0)
+        else:
+            if state:
+                wait_offset = state.remaining
+                playtime = state.playtime
+            else:
+                try:
+                    game_list = await webapi_session.get_owned_games(steamid, appids_filter=[badge.appid])
+                    game_info = game_list[0]
+                except aiohttp.ClientError:
+                    module_data = utils.module_error(
+                        'cardfarming',
+                        _("Check your connection. (server down?)"),
+                        info=_("Waiting Changes"),
+                    )
 
-            async for data in utils.timed_module_data(10, module_data):
-                yield data
+                    async for data in utils.timed_module_data(10, module_data):
+                        yield data
 
-            continue
+                    continue
 
-        if game_info.playtime_forever * 60 >= mandatory_waiting:
-            wait_offset = random.randint(wait_while_running, int(wait_while_running / 100 * 125))
-        else:
-            wait_offset = mandatory_waiting - game_info.playtime_forever * 60
+                playtime = game_info.playtime_forever
 
-        try:
-            executor = client.SteamAPIExecutor(badge.appid)
-        except AttributeError:
-            yield utils.ModuleData(action='ignore', info=_("Invalid game id {}. Ignoring.").format(badge.appid))
-            break
-        except ProcessLookupError:
-            module_data = utils.ModuleData(error=_("Steam Client is not running."), info=_("Waiting Changes"))
+                if playtime * 60 >= mandatory_waiting:
+                    wait_offset = random.randint(wait_while_running, int(wait_while_running / 100 * 125))
+                else:
+                    wait_offset = mandatory_waiting - playtime * 60
 
-            async for data in utils.timed_module_data(15, module_data):
-                yield data
+            if not steam_process.is_running():
+                yield utils.ModuleData(error=_("Steam Client is not running."), info=_("Waiting Steam Client"))
+                await steam_process.wait_running()
+                continue
 
-            continue
+            try:
+                executor = executor_class(badge.appid)
+            except AttributeError:
+                yield utils.ModuleData(action='ignore', info=_("Invalid game id {}. Ignoring.").format(badge.appid))
+                break
+            except ProcessLookupError:
+                # steam is still starting
+                module_data = utils.ModuleData(error=_("Steam Client is not running."), info=_("Waiting Changes"))
 
-        module_data = utils.ModuleData(
-            display=str(badge.appid),
-            info=badge.name,
-            status=_("Running {}").format(badge.name),
-            raw_data=executor,
-            action="check",
-        )
+                async for data in utils.timed_module_data(15, module_data):
+                    yield data
 
-        async for data in utils.timed_module_data(wait_offset, module_data):
-            if play_event and not play_event.is_set():
-                executor.shutdown()
-                await asyncio.sleep(1)
-                await play_event.wait()
-                executor.__init__(executor.appid)
+                continue
 
-            yield data
+            if checkpoint:
+                checkpoint.update(
+                    badge.appid,
+                    phase='running',
+                    remaining=wait_offset,
+                    cards=badge.cards,
+                    playtime=playtime,
+                )
+
+            module_data = utils.ModuleData(
+                display=str(badge.appid),
+                info=badge.name,
+                status=_("Running {}").format(badge.name),
+                raw_data=executor,
+                action="check",
+            )
+
+            saved_time = 0
+
+            async for data in utils.timed_module_data(wait_offset, module_data):
+                if play_event and not play_event.is_set():
+                    await executor_pool.pause(executor)
+                    await play_event.wait()
+                    executor_pool.resume(executor)
+
+                past_time = data.level[0]
+
+                if checkpoint and past_time - saved_time >= checkpoint_.save_interval:
+                    checkpoint.update(badge.appid, remaining=wait_offset - past_time)
+                    saved_time = past_time
+
+                yield data
 
-        executor.shutdown()
-        wait_offset = random.randint(wait_for_drops, int(wait_for_drops / 100 * 125))
+            executor.shutdown()
+            wait_offset = random.randint(wait_for_drops, int(wait_for_drops / 100 * 125))
+
+        state = None
+
+        if checkpoint:
+            checkpoint.update(badge.appid, phase='drops', deadline=time.time() + wait_offset)
 
         module_data = utils.ModuleData(
             display=str(badge.appid),
@@ -116,10 +165,14 @@ async def while_has_cards(
             try:
                 cards = await community_session.get_card_drops_remaining(steamid, badge.appid)
             except aiohttp.ClientError:
-                yield utils.ModuleData(error=_("Check your connection. (server down?)"), info=_("Waiting Changes"))
+                yield utils.module_error(
+                    'cardfarming',
+                    _("Check your connection. (server down?)"),
+                    info=_("Waiting Changes"),
+                )
                 await asyncio.sleep(10)
             except community.BadgeError:
-                yield utils.ModuleData(error=_("Steam Server is busy"), info=_("Waiting Changes"))
+                yield utils.module_error('cardfarming', _("Steam Server is busy"), info=_("Waiting Changes"))
                 await asyncio.sleep(20)
             else:
                 break
@@ -129,6 +182,9 @@ async def while_has_cards(
         # noinspection PyProtectedMember
         badge = badge._replace(cards=cards)
 
+    if checkpoint:
+        checkpoint.update(badge.appid, phase='done', cards=0)
+
     utils.ModuleData(
         display=str(badge.appid),
         info=_("{} ({})").format(_("Done"), badge.name),
@@ -139,31 +195,52 @@ async def main(
         steamid: universe.SteamId,
         play_event: asyncio.Event | None = None,
         custom_game_id: int = 0,
+        session_index: int = 0,
 ) -> AsyncGenerator[utils.ModuleData, None]:
     if play_event:
         await play_event.wait()
 
     asyncio.current_task().add_done_callback(safe_exit)
 
-    reverse_sorting = config.parser.getboolean("cardfarming", "reverse_sorting")
-    max_concurrency = config.parser.getint("cardfarming", "max_concurrency")
-    invisible = config.parser.getboolean("cardfarming", "invisible")
-    community_session = community.Community.get_session(0)
+    parser = config.get_parser(session_index)
+    reverse_sorting = parser.getboolean("cardfarming", "reverse_sorting")
+    max_concurrency = parser.getint("cardfarming", "max_concurrency")
+    memory_budget = parser.getint("cardfarming", "memory_budget")
+    cpu_budget = parser.getint("cardfarming", "cpu_budget")
+    invisible = parser.getboolean("cardfarming", "invisible")
+    community_session = tracing.traced(community.Community.get_session(session_index))
+    checkpoint = checkpoint_.Checkpoint.load(
+        config.get_checkpoint_file(session_index),
+        steamid.id64,
+        custom_game_id,
+        reverse_sorting,
+    )
     total_cards_remaining = 0
 
-    try:
-        badges = sorted(
-            await community_session.get_badges(steamid),
-            key=lambda badge_: badge_.cards,  # type: ignore
-            reverse=reverse_sorting
-        )
-    except aiohttp.ClientError:
-        module_data = utils.ModuleData(error=_("Check your connection. (server down?)"), info=_("Waiting Changes"))
+    badges = checkpoint.pending_badges() if checkpoint.is_fresh() else []
 
-        async for data in utils.timed_module_data(10, module_data):
-            yield data
+    if not badges:
+        try:
+            badges = sorted(
+                await community_session.get_badges(steamid),
+                key=lambda badge_: badge_.cards,  # type: ignore
+                reverse=reverse_sorting
+            )
+        except aiohttp.ClientError:
+            module_data = utils.module_error(
+                'cardfarming',
+                _("Check your connection. (server down?)"),
+                info=_("Waiting Changes"),
+            )
 
-        return
+            async for data in utils.timed_module_data(10, module_data):
+                yield data
+
+            return
+
+        checkpoint.clear()
+        checkpoint.badges = badges
+        checkpoint.save()
 
     if not badges or (custom_game_id and custom_game_id not in [badge.appid for badge in badges]):
         module_data = utils.ModuleData(error=_("No more cards to drop."), info=_("Waiting Changes"))
@@ -189,12 +266,13 @@ async def main(
             yield utils.ModuleData(info=_("Skipping {}").format(badge.appid))
             continue
 
-        generators[badge.appid] = while_has_cards(steamid, badge, play_event)
+        generators[badge.appid] = while_has_cards(steamid, badge, play_event, session_index, checkpoint)
         total_cards_remaining += badge.cards
 
+    cards_remaining.set(total_cards_remaining)
     tasks: Dict[int, asyncio.Task[Any] | None] = {}
-    semaphore = asyncio.Semaphore(max_concurrency)
-    last_update = 0
+    pool = executor_pool.ExecutorPool(max_concurrency, memory_budget * 1024 * 1024, cpu_budget / 100)
+    last_update = 0.0
 
     while True:
         for appid in generators:
@@ -202,10 +280,10 @@ async def main(
             assert asyncio.iscoroutine(progress_coro)
 
             if appid not in tasks:
-                if semaphore.locked():
+                if pool.locked():
                     break
 
-                await semaphore.acquire()
+                pool.acquire()
                 tasks[appid] = asyncio.create_task(progress_coro)
 
             if not tasks[appid]:
@@ -215,18 +293,19 @@ async def main(
             assert isinstance(current_task, asyncio.Task)
 
             if current_task.done():
-                semaphore.release()
+                pool.release()
 
                 if current_task.exception():
                     if isinstance(current_task.exception(), StopAsyncIteration):
                         tasks[appid] = None
+                        executors.discard(appid)
                         continue
 
                     current_exception = current_task.exception()
                     assert isinstance(current_exception, BaseException)
                     raise current_exception
 
-                await semaphore.acquire()
+                pool.acquire()
                 tasks[appid] = asyncio.create_task(progress_coro)
 
         if not any(tasks.values()):
@@ -236,7 +315,6 @@ async def main(
 
         for appid, task in tasks.items():
             if task and task.done() and not task.exception():
-                global executors
                 data: utils.ModuleData = task.result()
 
                 if data.action == 'check':
@@ -244,11 +322,16 @@ async def main(
 
                 if data.action == "update_drops":
                     total_cards_remaining -= data.raw_data
+                    cards_dropped.inc(max(data.raw_data, 0))
+                    cards_remaining.set(total_cards_remaining)
 
-                if int(time.time()) > last_update + 3:
+                if utils.loop_time() > last_update + 3:
                     current_running_limit = len(tasks)
                     total_remaining = len(generators) - len([task for task in tasks.values() if not task])
                     running_executors = [executor for executor in executors.values() if executor.is_running()]
+                    running_games.set(len(running_executors))
+                    pool.sample(running_executors)
+                    concurrency_limit.set(pool.concurrency)
                     extra_info = ''
 
                     current_running_limit = min(current_running_limit, total_remaining)
@@ -269,4 +352,6 @@ async def main(
                         raw_data=running_executors,
                         action=data.action,
                     )
-                    last_update = int(time.time())
+                    last_update = utils.loop_time()
+
+    checkpoint.clear()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import dataclasses
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List
+
+from stlib import community
+
+from .. import i18n
+
+log = logging.getLogger(__name__)
+_ = i18n.get_translation
+
+# older checkpoints are ignored, and the badges are fetched again
+max_age = 6 * 60 * 60
+# seconds between saves of the remaining run time, a crash repeats at most that
+save_interval = 60
+
+
+@dataclass
+class GameState:
+    # 'running', 'drops' (waiting drops to update) or 'done'
+    phase: str = 'running'
+    # seconds left to run (games aren't running while stng is down)
+    remaining: int = 0
+    # end of the drops wait (wall clock, steam keeps updating drops while stng is down)
+    deadline: float = 0.0
+    cards: int = 0
+    playtime: int = 0
+
+
+@dataclass
+class Checkpoint:
+    """Card farming state, saved on each transition so farming can resume after a restart"""
+
+    path: Path
+    steamid: int
+    # badges are sorted and filtered by these settings
+    custom_game_id: int = 0
+    reverse_sorting: bool = False
+    saved_at: float = 0.0
+    badges: List[community.Badge] = field(default_factory=list)
+    games: Dict[int, GameState] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path, steamid: int, custom_game_id: int = 0, reverse_sorting: bool = False) -> 'Checkpoint':
+        try:
+            data = json.loads(path.read_text(encoding='utf-8'))
+
+            if data['steamid'] != steamid:
+                raise ValueError('checkpoint from another account')
+
+            if (data['custom_game_id'], data['reverse_sorting']) == (custom_game_id, reverse_sorting):
+                return cls(
+                    path,
+                    steamid,
+                    custom_game_id,
+                    reverse_sorting,
+                    data['saved_at'],
+                    [community.Badge(**badge) for badge in data['badges']],
+                    {int(appid): GameState(**state) for appid, state in data['games'].items()},
+                )
+
+            log.debug("Card farming settings changed. Ignoring checkpoint.")
+        except FileNotFoundError:
+            pass
+        except (ValueError, KeyError, TypeError) as exception:
+            log.warning(_("Ignoring invalid card farming checkpoint: %s"), exception)
+
+        return cls(path, steamid, custom_game_id, reverse_sorting)
+
+    def is_fresh(self) -> bool:
+        return bool(self.badges) and time.time() - self.saved_at < max_age
+
+    def pending_badges(self) -> List[community.Badge]:
+        badges = []
+
+        for badge in self.badges:
+            if badge.appid in self.games:
+                if self.games[badge.appid].phase == 'done':
+                    continue
+
+                # noinspection PyProtectedMember
+                badge = badge._replace(cards=self.games[badge.appid].cards)
+
+            badges.append(badge)
+
+        return badges
+
+    def save(self) -> None:
+        self.saved_at = time.time()
+        data: Dict[str, Any] = {
+            'steamid': self.steamid,
+            'custom_game_id': self.custom_game_id,
+            'reverse_sorting': self.reverse_sorting,
+            'saved_at': self.saved_at,
+            'badges': [badge._asdict() for badge in self.badges],
+            'games': {str(appid): dataclasses.asdict(state) for appid, state in self.games.items()},
+        }
+
+        # write and rename, so a crash never leaves a partial file
+        temp_file = self.path.with_name(f'.{self.path.name}.tmp')
+
+        try:
+            temp_file.write_text(json.dumps(data), encoding='utf-8')
+            os.replace(temp_file, self.path)
+        except OSError as exception:
+            log.warning(_("Unable to save card farming checkpoint: %s"), exception)
+
+    def update(self, appid: int, **changes: Any) -> None:
+        state = self.games.setdefault(appid, GameState())
+
+        for name, value in changes.items():
+            setattr(state, name, value)
+
+        self.save()
+
+    def clear(self) -> None:
+        self.badges.clear()
+        self.games.clear()
+        self.path.unlink(missing_ok=True)
@@ -23,49 +23,66 @@ import aiohttp
 from stlib import login, universe, community
 
 from . import utils
-from .. import i18n, config
+from .. import i18n, config, metrics, tracing
 
 _ = i18n.get_translation
 log = logging.getLogger(__name__)
 
+pending_confirmations = metrics.gauge('stng_confirmations_pending', 'Confirmations waiting to be accepted')
+
 
 async def main(
         steamid: universe.SteamId,
         wait_available: Callable[[], Awaitable[None]],
+        session_index: int = 0,
 ) -> AsyncGenerator[utils.ModuleData, None]:
     await wait_available()
 
-    identity_secret = config.parser.get("login", "identity_secret")
-    session = community.Community.get_session(0)
+    parser = config.get_parser(session_index)
+    identity_secret = parser.get("login", "identity_secret")
+    session = tracing.traced(community.Community.get_session(session_index))
 
     if not identity_secret:
-        config.new("steamguard", "enable_confirmations", "false")
-        module_data = utils.ModuleData(error=_("The current identity secret is invalid."), info=_("Waiting Changes"))
+        config.new("steamguard", "enable_confirmations", "false", session_index=session_index)
+        module_data = utils.module_error(
+            'confirmations',
+            _("The current identity secret is invalid."),
+            info=_("Waiting Changes"),
+        )
 
         async for data in utils.timed_module_data(10, module_data):
             yield data
 
         return
 
-    deviceid = config.parser.get("login", "deviceid")
+    deviceid = parser.get("login", "deviceid")
 
     if not deviceid:
         log.warning(_("Unable to find deviceid. Generating from identity."))
         deviceid = universe.generate_device_id(identity_secret)
-        config.new("login", "deviceid", deviceid)
+        config.new("login", "deviceid", deviceid, session_index=session_index)
 
     try:
         confirmations = await session.get_confirmations(identity_secret, steamid, deviceid)
     except AttributeError as error:
         log.error("%s[%s]: %s", inspect.trace()[-1][3], type(error).__name__, str(error))
-        module_data = utils.ModuleData(error=_("Error when fetching confirmations"), info=_("Waiting Changes"))
+        module_data = utils.module_error(
+            'confirmations',
+            _("Error when fetching confirmations"),
+            info=_("Waiting Changes"),
+        )
     except ProcessLookupError:
         module_data = utils.ModuleData(error=_("Steam is not running"), info=_("Waiting Changes"))
     except login.LoginError:
-        module_data = utils.ModuleData(error=_("Not logged in"), action="login")
+        module_data = utils.module_error('confirmations', _("Not logged in"), action="login")
     except aiohttp.ClientError:
-        module_data = utils.ModuleData(error=_("Check your connection. (server down?)"), info=_("Waiting Changes"))
+        module_data = utils.module_error(
+            'confirmations',
+            _("Check your connection. (server down?)"),
+            info=_("Waiting Changes"),
+        )
     else:
+        pending_confirmations.set(len(confirmations))
         module_data = utils.ModuleData(action="update", raw_data=confirmations)
 
     async for data in utils.timed_module_data(30, module_data):
@@ -23,30 +23,34 @@ import aiohttp
 from stlib import universe, community, internals, webapi
 
 from . import utils
-from .. import i18n, config
+from .. import i18n, config, metrics, tracing
 
 _ = i18n.get_translation
 log = logging.getLogger(__name__)
 
+packages_scanned = metrics.counter('stng_coupons_packages_scanned_total', 'Coupon packages checked on the store')
+
 
 async def main(
         steamid: universe.SteamId,
         coupon_fetch_event: asyncio.Event,
         wait_available: Callable[[], Awaitable[None]],
+        session_index: int = 0,
 ) -> AsyncGenerator[utils.ModuleData, None]:
     await wait_available()
     await coupon_fetch_event.wait()
 
-    community_session = community.Community.get_session(0)
-    internals_session = internals.Internals.get_session(0)
-    webapi_session = webapi.SteamWebAPI.get_session(0)
-    botids = config.parser.get('coupons', 'botids')
-    tokens = config.parser.get('coupons', 'tokens')
-    appid = config.parser.getint('coupons', 'appid')
-    contextid = config.parser.getint('coupons', 'contextid')
+    community_session = tracing.traced(community.Community.get_session(session_index))
+    internals_session = tracing.traced(internals.Internals.get_session(session_index))
+    webapi_session = tracing.traced(webapi.SteamWebAPI.get_session(session_index))
+    parser = config.get_parser(session_index)
+    botids = parser.get('coupons', 'botids')
+    tokens = parser.get('coupons', 'tokens')
+    appid = parser.getint('coupons', 'appid')
+    contextid = parser.getint('coupons', 'contextid')
 
     if not botids:
-        yield utils.ModuleData(error=_("No botID found"), info=_("Waiting Changes"))
+        yield utils.module_error('coupons', _("No botID found"), info=_("Waiting Changes"))
         await asyncio.sleep(5)
         return
 
@@ -54,14 +58,18 @@ async def main(
     token_list = [token.strip() for token in tokens.split(',')]
 
     if len(bot_list) != len(token_list):
-        yield utils.ModuleData(error=_("Invalid config. Each bot must have id and token."), info=_("Waiting Changes"))
+        yield utils.module_error(
+            'coupons',
+            _("Invalid config. Each bot must have id and token."),
+            info=_("Waiting Changes"),
+        )
         await asyncio.sleep(5)
         return
 
     try:
         owned_games = await webapi_session.get_owned_games(steamid)
     except aiohttp.ClientError:
-        yield utils.ModuleData(error=_("Failed when trying to get owned games"))
+        yield utils.module_error('coupons', _("Failed when trying to get owned games"))
         await asyncio.sleep(30)
         return
 
@@ -72,21 +80,25 @@ async def main(
         try:
             steamid = universe.generate_steamid(botid)
         except ValueError:
-            yield utils.ModuleData(error=_("The botid {} is invalid").format(botid))
+            yield utils.module_error('coupons', _("The botid {} is invalid").format(botid))
             await asyncio.sleep(5)
             return
 
         try:
             inventory = await community_session.get_inventory(steamid, appid, contextid)
         except AttributeError:
-            module_data = utils.ModuleData(error=_("Error when fetch inventory"), info=_("Waiting Changes"))
+            module_data = utils.module_error('coupons', _("Error when fetch inventory"), info=_("Waiting Changes"))
 
             async for data in utils.timed_module_data(30, module_data):
                 yield data
 
             return
         except aiohttp.ClientError:
-            module_data = utils.ModuleData(error=_("Check your connection. (server down?)"), info=_("Waiting Changes"))
+            module_data = utils.module_error(
+                'coupons',
+                _("Check your connection. (server down?)"),
+                info=_("Waiting Changes"),
+            )
 
             async for data in utils.timed_module_data(120, module_data):
                 yield data
@@ -112,10 +124,10 @@ async def main(
             yield utils.ModuleData(action="update_level", raw_data=(index + 1, len(inventory)))
             package_link = coupon_.actions[0]['link']
             packageids = [int(id_) for id_ in package_link.split('=')[1].split(',')]
-            blacklist = config.parser.get('coupons', 'blacklist')
+            blacklist = parser.get('coupons', 'blacklist')
             ignored_list = [name.split('% OFF')[-1].split('- Coupon')[0].strip() for name in blacklist.split(',')]
             ignored_list.extend([game.name for game in owned_games])
-            minimum_discount = config.parser.getint('coupons', 'minimum_discount')
+            minimum_discount = parser.getint('coupons', 'minimum_discount')
             game_name = coupon_.name.split('% OFF')[-1].split('- Coupon')[0].strip()
 
             for package_id in packageids:
@@ -151,8 +163,9 @@ async def main(
                     if not package_details:
                         raise ValueError
                 except aiohttp.ClientError:
-                    module_data = utils.ModuleData(
-                        error=_("Check your connection. (server down?)"),
+                    module_data = utils.module_error(
+                        'coupons',
+                        _("Check your connection. (server down?)"),
                         info=_("Waiting Changes"),
                     )
 
@@ -161,10 +174,11 @@ async def main(
 
                     continue
                 except ValueError:
-                    yield utils.ModuleData(error=_("Failed to get package details"), info=_("Waiting Changes"))
+                    yield utils.module_error('coupons', _("Failed to get package details"), info=_("Waiting Changes"))
                     await asyncio.sleep(1)
                     continue
                 else:
+                    packages_scanned.inc()
                     await asyncio.sleep(.5)
 
                 if package_details.discount_percent:
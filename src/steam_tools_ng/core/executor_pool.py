@@ -0,0 +1,298 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import asyncio
+import contextlib
+import logging
+import os
+import signal
+import threading
+import time
+import weakref
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Tuple
+
+from .. import i18n
+
+log = logging.getLogger(__name__)
+_ = i18n.get_translation
+
+# seconds to wait for executors to shut down before killing them
+shutdown_timeout = 5.0
+
+_page_size = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+_clock_ticks = os.sysconf('SC_CLK_TCK') if hasattr(os, 'sysconf') else 100
+
+# executor -> how it was paused ('suspend' or 'shutdown')
+_paused: weakref.WeakKeyDictionary[Any, str] = weakref.WeakKeyDictionary()
+
+
+def worker_pids(executor: Any) -> List[int]:
+    # SteamAPIExecutor is a ProcessPoolExecutor running SteamAPI in its workers
+    processes = getattr(executor, '_processes', None) or {}
+    return list(processes)
+
+
+def _memory_usage(pid: int) -> int:
+    # workers are forked, so the proportional set size doesn't count
+    # the pages shared with the main process for each one of them
+    try:
+        for line in Path('/proc', str(pid), 'smaps_rollup').read_text().splitlines():
+            if line.startswith('Pss:'):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+
+    return int(Path('/proc', str(pid), 'statm').read_text().split()[1]) * _page_size
+
+
+def process_usage(pid: int) -> Tuple[int, float] | None:
+    """Memory (bytes) and CPU time (seconds) used by a process, read from /proc"""
+    try:
+        memory = _memory_usage(pid)
+        # fields after the process name, starting from the state
+        stat = Path('/proc', str(pid), 'stat').read_text().rpartition(')')[2].split()
+    except OSError:
+        return None
+
+    return memory, (int(stat[11]) + int(stat[12])) / _clock_ticks
+
+
+def _send_signal(pids: List[int], signal_number: int) -> bool:
+    try:
+        for pid in pids:
+            os.kill(pid, signal_number)
+    except (ProcessLookupError, PermissionError):
+        return False
+
+    return True
+
+
+def suspend(executor: Any) -> bool:
+    """Stops the executor processes (SIGSTOP), returns False when it's not possible"""
+    pids = worker_pids(executor)
+
+    if not pids or not hasattr(signal, 'SIGSTOP'):
+        return False
+
+    if not _send_signal(pids, signal.SIGSTOP):
+        _send_signal(pids, signal.SIGCONT)
+        return False
+
+    return True
+
+
+def is_paused(executor: Any) -> bool:
+    return executor in _paused
+
+
+async def pause(executor: Any) -> None:
+    if is_paused(executor):
+        return
+
+    # the game keeps its SteamAPI session, so resuming is instant
+    if suspend(executor):
+        log.debug(i18n.LazyMessage("Executor for {} suspended", executor.appid))
+        _paused[executor] = 'suspend'
+        return
+
+    _paused[executor] = 'shutdown'
+    executor.shutdown()
+    # TODO: On Windows processes can't answer too fast due executor workaround
+    await asyncio.sleep(1)
+
+
+def wake(executor: Any) -> None:
+    """Resumes a suspended executor, so it can be shut down"""
+    if _paused.pop(executor, None) == 'suspend':
+        _send_signal(worker_pids(executor), signal.SIGCONT)
+
+
+def resume(executor: Any) -> None:
+    mode = _paused.pop(executor, None)
+
+    if mode == 'suspend' and _send_signal(worker_pids(executor), signal.SIGCONT):
+        log.debug(i18n.LazyMessage("Executor for {} resumed", executor.appid))
+        return
+
+    if mode:
+        executor.__init__(executor.appid)
+
+
+def kill(executor: Any) -> None:
+    processes = getattr(executor, '_processes', None) or {}
+
+    for process in list(processes.values()):
+        with contextlib.suppress(OSError, ValueError):
+            process.kill()
+
+
+def _shutdown(executor: Any) -> None:
+    # already shut down
+    with contextlib.suppress(RuntimeError):
+        executor.shutdown()
+
+
+class ExecutorRegistry:
+    """Executors of the games being farmed, by appid"""
+
+    def __init__(self) -> None:
+        self._executors: Dict[int, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._executors)
+
+    def __contains__(self, appid: int) -> bool:
+        return appid in self._executors
+
+    def __getitem__(self, appid: int) -> Any:
+        return self._executors[appid]
+
+    def __setitem__(self, appid: int, executor: Any) -> None:
+        self._executors[appid] = executor
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._executors)
+
+    def values(self) -> List[Any]:
+        return list(self._executors.values())
+
+    def discard(self, appid: int) -> None:
+        self._executors.pop(appid, None)
+
+    def shutdown(self, timeout: float = shutdown_timeout) -> List[Any]:
+        """Shuts down all executors concurrently, killing the ones that don't finish in time
+
+        :return: executors that had to be killed
+        """
+        executors = self.values()
+        self._executors.clear()
+        threads = []
+
+        for executor in executors:
+            # a stopped process would never answer the shutdown
+            wake(executor)
+            thread = threading.Thread(target=_shutdown, args=(executor,), daemon=True)
+            thread.start()
+            threads.append(thread)
+
+        deadline = time.monotonic() + timeout
+        stragglers = []
+
+        for executor, thread in zip(executors, threads):
+            thread.join(max(deadline - time.monotonic(), 0))
+
+            if thread.is_alive():
+                log.warning(_("Executor for %s didn't shut down in %ss. Killing it."), executor.appid, timeout)
+                kill(executor)
+                stragglers.append(executor)
+
+        return stragglers
+
+
+class ExecutorPool:
+    """Limits how many executors run at once
+
+    The limit starts at max_concurrency and is lowered to what fits in the memory
+    budget (bytes) and the CPU budget (cores), using the memory and CPU usage measured
+    from the executors already running. A zero budget is unlimited.
+    """
+
+    def __init__(self, max_concurrency: int, memory_budget: int = 0, cpu_budget: float = 0.0) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.memory_budget = memory_budget
+        self.cpu_budget = cpu_budget
+        self.active = 0
+        self.sampled = False
+        self.memory_per_executor = 0.0
+        self.cpu_per_executor = 0.0
+        # pid -> (time, cpu time) of the last sample
+        self._cpu_times: Dict[int, Tuple[float, float]] = {}
+
+    @property
+    def concurrency(self) -> int:
+        if not self.memory_budget and not self.cpu_budget:
+            return self.max_concurrency
+
+        # one at a time until there's something to measure
+        if not self.sampled:
+            return 1
+
+        limit = self.max_concurrency
+
+        if self.memory_budget and self.memory_per_executor:
+            limit = min(limit, int(self.memory_budget // self.memory_per_executor))
+
+        if self.cpu_budget and self.cpu_per_executor:
+            limit = min(limit, int(self.cpu_budget / self.cpu_per_executor))
+
+        return max(1, limit)
+
+    def locked(self) -> bool:
+        return self.active >= self.concurrency
+
+    def acquire(self) -> None:
+        self.active += 1
+
+    def release(self) -> None:
+        self.active -= 1
+
+    def sample(self, executors: Iterable[Any]) -> None:
+        now = time.monotonic()
+        cpu_times = {}
+        memory_samples = []
+        cpu_samples = []
+        sampled_executors = 0
+
+        for executor in executors:
+            # suspended processes aren't using CPU, and can't be compared
+            if is_paused(executor):
+                continue
+
+            sampled_executors += 1
+
+            memory = 0
+            cpu_rate = 0.0
+            measured = False
+
+            for pid in worker_pids(executor):
+                if not (usage := process_usage(pid)):
+                    continue
+
+                memory += usage[0]
+                cpu_times[pid] = (now, usage[1])
+                measured = True
+
+                if pid in self._cpu_times:
+                    last_time, last_cpu_time = self._cpu_times[pid]
+
+                    if now > last_time:
+                        cpu_rate += (usage[1] - last_cpu_time) / (now - last_time)
+
+            if measured:
+                memory_samples.append(memory)
+                cpu_samples.append(cpu_rate)
+
+        self._cpu_times = cpu_times
+
+        # without /proc (or worker processes) budgets can't be applied
+        if sampled_executors:
+            self.sampled = True
+
+        if memory_samples:
+            self.memory_per_executor = sum(memory_samples) / len(memory_samples)
+            self.cpu_per_executor = sum(cpu_samples) / len(cpu_samples)
@@ -22,8 +22,8 @@ from typing import AsyncGenerator, List
 import aiohttp
 from stlib import webapi, client, universe, community, login
 
-from . import utils
-from .. import i18n, config
+from . import steam_process, utils
+from .. import i18n, config, tracing
 
 _ = i18n.get_translation
 
@@ -31,23 +31,24 @@ async def main(
         steamid: universe.SteamId,
         game_id: int,
         extra_game_id: int | None = None,
+        session_index: int = 0,
 ) -> AsyncGenerator[utils.ModuleData, None]:
-    webapi_session = webapi.SteamWebAPI.get_session(0)
-    login_session = login.Login.get_session(0)
+    webapi_session = tracing.traced(webapi.SteamWebAPI.get_session(session_index))
+    login_session = tracing.traced(login.Login.get_session(session_index))
 
     if not await login_session.is_limited():
         try:
             game_list = await webapi_session.get_owned_games(steamid, appids_filter=[game_id])
             game_name = game_list[0].name
         except aiohttp.ClientError:
-            module_data = utils.ModuleData(error=_("Check your connection. (server down?)"))
+            module_data = utils.module_error('fakerun', _("Check your connection. (server down?)"))
 
             async for data in utils.timed_module_data(15, module_data):
                 yield data
 
             return
         except ValueError:
-            yield utils.ModuleData(error=_("Game {} doesn't exist").format(game_id))
+            yield utils.module_error('fakerun', _("Game {} doesn't exist").format(game_id))
             return
     else:
         # fallback
@@ -58,6 +59,10 @@ async def main(
         status=_("Loading {}").format(game_name),
     )
 
+    if not steam_process.is_running():
+        yield utils.ModuleData(error=_("Steam Client is not running."), info=_("Waiting Steam Client"))
+        await steam_process.wait_running()
+
     start_time = 0
 
     try:
@@ -73,4 +78,4 @@ async def main(
                 await asyncio.sleep(1)
                 start_time += 1
     except ProcessLookupError:
-        yield utils.ModuleData(error=_("Steam Client is not running."))
+        yield utils.module_error('fakerun', _("Steam Client is not running."))
@@ -23,18 +23,21 @@ import aiohttp
 from stlib import community
 
 from . import utils
-from .. import i18n
+from .. import i18n, metrics, tracing
 
 _ = i18n.get_translation
 log = logging.getLogger(__name__)
 
+histograms_fetched = metrics.counter('stng_market_histograms_total', 'Order histograms fetched', ['type'])
+
 
 async def get_histogram(
         orders: List[community.Order],
         order_type: str,
         fetch_event: asyncio.Event,
+        session_index: int = 0,
 ) -> AsyncGenerator[utils.ModuleData, None]:
-    community_session = community.Community.get_session(0)
+    community_session = tracing.traced(community.Community.get_session(session_index))
 
     for position, order in enumerate(orders):
         if not fetch_event.is_set():
@@ -47,13 +50,15 @@ async def get_histogram(
         try:
             histogram = await community_session.get_item_histogram(order.appid, order.hash_name)
         except (community.MarketError, aiohttp.ClientError):
-            module_data = utils.ModuleData(error=_("Failed when trying to get order histogram"))
+            module_data = utils.module_error('market', _("Failed when trying to get order histogram"))
 
             async for data in utils.timed_module_data(15, module_data):
                 yield data
 
             return
 
+        histograms_fetched.inc(type=order_type)
+
         yield utils.ModuleData(action='update', raw_data={
             'position': position,
             'order': order,
@@ -68,24 +73,25 @@ async def get_histogram(
 async def main(
         fetch_buy_event: asyncio.Event,
         fetch_sell_event: asyncio.Event,
+        session_index: int = 0,
 ) -> AsyncGenerator[utils.ModuleData, None]:
     while not fetch_sell_event.is_set() and not fetch_buy_event.is_set():
         await asyncio.sleep(5)
 
-    community_session = community.Community.get_session(0)
+    community_session = tracing.traced(community.Community.get_session(session_index))
 
     try:
         my_orders = await community_session.get_my_orders()
     except aiohttp.ClientError:
-        yield utils.ModuleData(error=_("Failed when trying to get user orders"))
+        yield utils.module_error('market', _("Failed when trying to get user orders"))
         await asyncio.sleep(30)
         return
 
     yield utils.ModuleData(action="clear")
 
     generators = {
-        "sell": get_histogram(my_orders[0], "sell", fetch_sell_event),
-        "buy": get_histogram(my_orders[1], "buy", fetch_buy_event),
+        "sell": get_histogram(my_orders[0], "sell", fetch_sell_event, session_index),
+        "buy": get_histogram(my_orders[1], "buy", fetch_buy_event, session_index),
     }
 
     tasks: Dict[str, asyncio.Task[Any] | None] = {}
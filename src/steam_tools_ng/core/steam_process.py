@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import asyncio
+import contextlib
+import ctypes
+import ctypes.util
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Callable, List
+
+from .. import i18n
+
+log = logging.getLogger(__name__)
+_ = i18n.get_translation
+
+# steam writes the pid of the client in these files while it's running
+pid_files = [
+    Path.home() / '.steam' / 'steam.pid',
+    Path.home() / '.var' / 'app' / 'com.valvesoftware.Steam' / '.steam' / 'steam.pid',
+]
+
+_IN_CLOSE_WRITE = 0x8
+_IN_MOVED_FROM = 0x40
+_IN_MOVED_TO = 0x80
+_IN_CREATE = 0x100
+_IN_DELETE = 0x200
+
+
+def _process_name(pid: int) -> str:
+    try:
+        stat = Path('/proc', str(pid), 'stat').read_text()
+    except OSError:
+        return ''
+
+    # pid (name) state ...
+    name, _separator, fields = stat.partition('(')[2].rpartition(')')
+
+    # zombies are processes that already exited
+    if fields.split()[:1] == ['Z']:
+        return ''
+
+    return name
+
+
+def _find_pid(pid_files_: List[Path]) -> int | None:
+    for pid_file in pid_files_:
+        with contextlib.suppress(OSError, ValueError):
+            pid = int(pid_file.read_text().strip())
+
+            # pid files are left behind when steam crashes
+            if _process_name(pid).startswith('steam'):
+                return pid
+
+    for process in Path('/proc').glob('[0-9]*'):
+        if _process_name(int(process.name)) == 'steam':
+            return int(process.name)
+
+    return None
+
+
+def _probe_steamworks() -> bool:
+    import stlib
+
+    if not stlib.steamworks_available:
+        return False
+
+    from stlib import client
+
+    try:
+        with client.SteamGameServer():
+            return True
+    except ProcessLookupError:
+        return False
+
+
+def _inotify_watch(directories: List[Path]) -> int | None:
+    if not sys.platform.startswith('linux'):
+        return None
+
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        inotify_fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+
+    if inotify_fd < 0:
+        return None
+
+    mask = _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO | _IN_CREATE | _IN_DELETE
+    watches = [
+        libc.inotify_add_watch(inotify_fd, bytes(directory), mask)
+        for directory in directories if directory.is_dir()
+    ]
+
+    if not any(watch >= 0 for watch in watches):
+        os.close(inotify_fd)
+        return None
+
+    return inotify_fd
+
+
+class SteamWatcher:
+    """Tracks if the steam client is running and publishes when it starts or stops
+
+    On linux, the steam pid file is watched with inotify, and the steam process with
+    a pidfd, so changes are seen without polling. Otherwise, it polls every poll_interval.
+    """
+
+    def __init__(self, pid_files_: List[Path] | None = None, poll_interval: float = 5) -> None:
+        self.pid_files = pid_files if pid_files_ is None else pid_files_
+        self.poll_interval = poll_interval
+        self.pid: int | None = None
+        self.running = asyncio.Event()
+        self.stopped = asyncio.Event()
+        self.stopped.set()
+        self.listeners: List[Callable[[bool], None]] = []
+        self._inotify_fd: int | None = None
+        self._pidfd: int | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def is_running(self) -> bool:
+        return self.running.is_set()
+
+    async def wait_running(self) -> None:
+        await self.running.wait()
+
+    async def wait_stopped(self) -> None:
+        await self.stopped.wait()
+
+    def add_listener(self, callback: Callable[[bool], None]) -> None:
+        self.listeners.append(callback)
+
+    def set_running(self, running: bool) -> None:
+        if running == self.is_running():
+            return
+
+        if running:
+            log.info(_("Steam Client is running"))
+            self.stopped.clear()
+            self.running.set()
+        else:
+            log.info(_("Steam Client has stopped"))
+            self.running.clear()
+            self.stopped.set()
+
+        for callback in self.listeners:
+            callback(running)
+
+    def check(self) -> bool:
+        if not Path('/proc').is_dir():
+            self.set_running(_probe_steamworks())
+            return self.is_running()
+
+        pid = _find_pid(self.pid_files)
+
+        if pid != self.pid:
+            self._close_pidfd()
+            self.pid = pid
+
+            if pid and self._task:
+                self._open_pidfd(pid)
+
+        self.set_running(bool(pid))
+        return self.is_running()
+
+    def start(self) -> None:
+        loop = asyncio.get_running_loop()
+        self._inotify_fd = _inotify_watch(list({pid_file.parent for pid_file in self.pid_files}))
+
+        if self._inotify_fd is not None:
+            loop.add_reader(self._inotify_fd, self._on_inotify_event)
+
+        self._task = loop.create_task(self._poll())
+        self.check()
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        self._close_pidfd()
+
+        if self._inotify_fd is not None:
+            asyncio.get_running_loop().remove_reader(self._inotify_fd)
+            os.close(self._inotify_fd)
+            self._inotify_fd = None
+
+    def _open_pidfd(self, pid: int) -> None:
+        try:
+            self._pidfd = os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            return
+
+        # pidfds are readable when the process exits
+        asyncio.get_running_loop().add_reader(self._pidfd, self.check)
+
+    def _close_pidfd(self) -> None:
+        if self._pidfd is not None:
+            asyncio.get_running_loop().remove_reader(self._pidfd)
+            os.close(self._pidfd)
+            self._pidfd = None
+
+    def _on_inotify_event(self) -> None:
+        assert self._inotify_fd is not None
+
+        with contextlib.suppress(BlockingIOError):
+            while os.read(self._inotify_fd, 4096):
+                pass
+
+        self.check()
+
+    async def _poll(self) -> None:
+        while True:
+            await asyncio.sleep(self.poll_interval)
+
+            # inotify sees steam starting and the pidfd sees it stopping
+            if self._inotify_fd is not None and (self._pidfd is not None or not self.is_running()):
+                continue
+
+            self.check()
+
+
+watcher: SteamWatcher | None = None
+
+
+def get_watcher() -> SteamWatcher:
+    global watcher
+
+    if not watcher:
+        watcher = SteamWatcher()
+        watcher.start()
+
+    return watcher
+
+
+def is_running() -> bool:
+    return get_watcher().is_running()
+
+
+async def wait_running() -> None:
+    await get_watcher().wait_running()
@@ -24,82 +24,90 @@ import aiohttp
 
 from stlib import plugins, login
 from . import utils
-from .. import i18n, config
+from .. import i18n, config, metrics, tracing
 
 _ = i18n.get_translation
 log = logging.getLogger(__name__)
 
+giveaways_joined = metrics.counter('stng_steamgifts_giveaways_joined_total', 'Giveaways joined on steamgifts')
+points = metrics.gauge('stng_steamgifts_points', 'Steamgifts points available')
 
-async def main() -> AsyncGenerator[utils.ModuleData, None]:
+
+async def main(session_index: int = 0) -> AsyncGenerator[utils.ModuleData, None]:
     yield utils.ModuleData(status=_("Loading"))
 
     if not plugins.has_plugin("steamgifts"):
         raise ImportError(_("Unable to find Steamgifts plugin."))
 
     steamgifts = plugins.get_plugin("steamgifts")
-    steamgifts_session = steamgifts.Main.get_session(0)
+    steamgifts_session = tracing.traced(steamgifts.Main.get_session(session_index))
     try:
         await steamgifts_session.do_login()
     except aiohttp.ClientError:
-        yield utils.ModuleData(error=_("Check your connection. (server down?)"), info=_("Waiting Changes"))
+        yield utils.module_error('steamgifts', _("Check your connection. (server down?)"), info=_("Waiting Changes"))
         await asyncio.sleep(15)
         return
     except steamgifts.TooFast:
-        yield utils.ModuleData(error=_("Unable to login. Trying again in 15 seconds"))
+        yield utils.module_error('steamgifts', _("Unable to login. Trying again in 15 seconds"))
         await asyncio.sleep(15)
         return
     except steamgifts.UserSuspended:
-        module_data = utils.ModuleData(error=_("User is suspended."))
+        module_data = utils.module_error('steamgifts', _("User is suspended."))
 
         async for data in utils.timed_module_data(18000, module_data):
             yield data
 
         return
     except steamgifts.PrivateProfile:
-        yield utils.ModuleData(error=_("Your profile must be public to use steamgifts."), info=_("Waiting Changes"))
+        yield utils.module_error(
+            'steamgifts',
+            _("Your profile must be public to use steamgifts."),
+            info=_("Waiting Changes"),
+        )
         await asyncio.sleep(30)
         return
     except login.LoginError:
-        yield utils.ModuleData(error=_("User is not logged in. Trying again in 30 seconds"))
+        yield utils.module_error('steamgifts', _("User is not logged in. Trying again in 30 seconds"))
         await asyncio.sleep(30)
         return
 
     try:
         await steamgifts_session.configure()
     except aiohttp.ClientError:
-        yield utils.ModuleData(error=_("Check your connection. (server down?)"))
+        yield utils.module_error('steamgifts', _("Check your connection. (server down?)"))
         await asyncio.sleep(15)
         return
     except steamgifts.ConfigureError:
-        yield utils.ModuleData(error=_("Unable to configure steamgifts."))
+        yield utils.module_error('steamgifts', _("Unable to configure steamgifts."))
         await asyncio.sleep(20)
         return
 
-    pinned = config.parser.getboolean("steamgifts", "developer_giveaways")
-    points_to_preserve = config.parser.getint("steamgifts", "minimum_points")
-    mode = config.parser.get("steamgifts", "mode")
-    wait_after_each_strategy = config.parser.getint("steamgifts", "wait_after_each_strategy")
-    wait_after_full_cycle = config.parser.getint("steamgifts", "wait_after_full_cycle")
+    parser = config.get_parser(session_index)
+    pinned = parser.getboolean("steamgifts", "developer_giveaways")
+    points_to_preserve = parser.getint("steamgifts", "minimum_points")
+    mode = parser.get("steamgifts", "mode")
+    wait_after_each_strategy = parser.getint("steamgifts", "wait_after_each_strategy")
+    wait_after_full_cycle = parser.getint("steamgifts", "wait_after_full_cycle")
 
     for strategy_index in range(1, 6):
         strategy = f"steamgifts_strategy{strategy_index}"
-        enabled = config.parser.get(strategy, "enable")
+        enabled = parser.get(strategy, "enable")
 
         if not enabled:
             yield utils.ModuleData(info=_("Strategy {} is disabled. Skipping.").format(strategy_index))
             continue
 
-        type_ = config.parser.get(strategy, "restrict_type")
-        minimum_points = config.parser.getint(strategy, "minimum_points")
-        maximum_points = config.parser.getint(strategy, "maximum_points")
-        minimum_level = config.parser.getint(strategy, "minimum_level")
-        maximum_level = config.parser.getint(strategy, "maximum_level")
-        minimum_copies = config.parser.getint(strategy, "minimum_copies")
-        maximum_copies = config.parser.getint(strategy, "maximum_copies")
-        minimum_metascore = config.parser.getint(strategy, "minimum_metascore")
-        maximum_metascore = config.parser.getint(strategy, "maximum_metascore")
-        minimum_entries = config.parser.getint(strategy, "minimum_entries")
-        maximum_entries = config.parser.getint(strategy, "maximum_entries")
+        type_ = parser.get(strategy, "restrict_type")
+        minimum_points = parser.getint(strategy, "minimum_points")
+        maximum_points = parser.getint(strategy, "maximum_points")
+        minimum_level = parser.getint(strategy, "minimum_level")
+        maximum_level = parser.getint(strategy, "maximum_level")
+        minimum_copies = parser.getint(strategy, "minimum_copies")
+        maximum_copies = parser.getint(strategy, "maximum_copies")
+        minimum_metascore = parser.getint(strategy, "minimum_metascore")
+        maximum_metascore = parser.getint(strategy, "maximum_metascore")
+        minimum_entries = parser.getint(strategy, "minimum_entries")
+        maximum_entries = parser.getint(strategy, "maximum_entries")
 
         max_ban_wait = random.randint(5, 15)
         async for data in utils.timed_module_data(max_ban_wait, utils.ModuleData()):
@@ -116,14 +124,15 @@ async def main() -> AsyncGenerator[utils.ModuleData, None]:
                 pinned_giveaways=pinned,
             )
         except aiohttp.ClientError:
-            yield utils.ModuleData(error=_("Check your connection. (server down?)"))
+            yield utils.module_error('steamgifts', _("Check your connection. (server down?)"))
             await asyncio.sleep(15)
             return
 
+        points.set(steamgifts_session.user_info.points)
         wait_enabled = False
 
         if giveaways:
-            sort_type = config.parser.get(strategy, "sort_type")
+            sort_type = parser.get(strategy, "sort_type")
             sort_name = sort_type[:-1]
             sort_direction = sort_type[-1]
 
@@ -158,6 +167,8 @@ async def main() -> AsyncGenerator[utils.ModuleData, None]:
 
             try:
                 if await steamgifts_session.join(giveaway):
+                    giveaways_joined.inc()
+                    points.set(steamgifts_session.user_info.points)
                     yield utils.ModuleData(
                         display=giveaway.id,
                         status=f"{_('Joined')} {giveaway.name} "
@@ -165,11 +176,11 @@ async def main() -> AsyncGenerator[utils.ModuleData, None]:
                     )
                     wait_enabled = True
                 else:
-                    yield utils.ModuleData(display=giveaway.id, error=_("Unable to join {}."))
+                    yield utils.module_error('steamgifts', display=giveaway.id, error=_("Unable to join {}."))
                     await asyncio.sleep(5)
                     continue
             except aiohttp.ClientError:
-                yield utils.ModuleData(error=_("Check your connection. (server down?)"))
+                yield utils.module_error('steamgifts', _("Check your connection. (server down?)"))
                 await asyncio.sleep(15)
                 wait_enabled = False
                 break
@@ -182,7 +193,7 @@ async def main() -> AsyncGenerator[utils.ModuleData, None]:
                 await asyncio.sleep(5)
                 continue
             except login.LoginError:
-                yield utils.ModuleData(error=_("Login is lost. Trying to relogin."))
+                yield utils.module_error('steamgifts', _("Login is lost. Trying to relogin."))
                 await asyncio.sleep(5)
                 wait_enabled = False
                 break
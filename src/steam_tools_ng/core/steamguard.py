@@ -24,8 +24,8 @@ import aiohttp
 import stlib
 from stlib import universe, webapi
 
-from . import utils
-from .. import i18n, config
+from . import steam_process, utils
+from .. import i18n, config, tracing
 
 try:
     from stlib import client
@@ -36,12 +36,12 @@ log = logging.getLogger(__name__)
 _ = i18n.get_translation
 
 
-async def main() -> AsyncGenerator[utils.ModuleData, None]:
-    shared_secret = config.parser.get("login", "shared_secret")
-    webapi_session = webapi.SteamWebAPI.get_session(0)
+async def main(session_index: int = 0) -> AsyncGenerator[utils.ModuleData, None]:
+    shared_secret = config.get_parser(session_index).get("login", "shared_secret")
+    webapi_session = tracing.traced(webapi.SteamWebAPI.get_session(session_index))
 
     try:
-        if not stlib.steamworks_available:
+        if not stlib.steamworks_available or not steam_process.is_running():
             raise ProcessLookupError
 
         with client.SteamGameServer() as server:
@@ -63,12 +63,12 @@ async def main() -> AsyncGenerator[utils.ModuleData, None]:
 
     try:
         if not shared_secret:
-            config.new("steamguard", "enable", "false")
+            config.new("steamguard", "enable", "false", session_index=session_index)
             raise ValueError
 
         auth_code = universe.generate_steam_code(server_time, shared_secret)
     except (ValueError, binascii.Error):
-        yield utils.ModuleData(error=_("The current shared secret is invalid."), info=_("Waiting Changes"))
+        yield utils.module_error('steamguard', _("The current shared secret is invalid."), info=_("Waiting Changes"))
         await asyncio.sleep(10)
     except ProcessLookupError:
         yield utils.ModuleData(status=_("Steam Client is not running"), info=_("Waiting Changes"))
@@ -23,25 +23,26 @@ from typing import AsyncGenerator
 
 from stlib import plugins, login
 from . import utils
-from .. import i18n, config
+from .. import i18n, config, tracing
 
 _ = i18n.get_translation
 log = logging.getLogger(__name__)
 
 
-async def main() -> AsyncGenerator[utils.ModuleData, None]:
+async def main(session_index: int = 0) -> AsyncGenerator[utils.ModuleData, None]:
     yield utils.ModuleData(status=_("Loading"))
 
     if not plugins.has_plugin("steamtrades"):
         raise ImportError(_("Unable to find Steamtrades plugin"))
 
     steamtrades = plugins.get_plugin("steamtrades")
-    steamtrades_session = steamtrades.Main.get_session(0)
-    trade_ids = config.parser.get("steamtrades", "trade_ids")
-    wait_for_bump = config.parser.getint("steamtrades", "wait_for_bump")
+    steamtrades_session = tracing.traced(steamtrades.Main.get_session(session_index))
+    parser = config.get_parser(session_index)
+    trade_ids = parser.get("steamtrades", "trade_ids")
+    wait_for_bump = parser.getint("steamtrades", "wait_for_bump")
 
     if not trade_ids:
-        yield utils.ModuleData(error=_("No trade ID found"), info=_("Waiting Changes"))
+        yield utils.module_error('steamtrades', _("No trade ID found"), info=_("Waiting Changes"))
         await asyncio.sleep(5)
         return
 
@@ -50,30 +51,34 @@ async def main() -> AsyncGenerator[utils.ModuleData, None]:
     try:
         await steamtrades_session.do_login()
     except aiohttp.ClientError:
-        yield utils.ModuleData(error=_("Check your connection. (server down?)"))
+        yield utils.module_error('steamtrades', _("Check your connection. (server down?)"))
         await asyncio.sleep(15)
         return
     except steamtrades.TooFast:
-        yield utils.ModuleData(error=_("Unable to login. Trying again in 15 seconds"))
+        yield utils.module_error('steamtrades', _("Unable to login. Trying again in 15 seconds"))
         await asyncio.sleep(15)
         return
     except steamtrades.UserSuspended:
-        module_data = utils.ModuleData(error=_("User is suspended."))
+        module_data = utils.module_error('steamtrades', _("User is suspended."))
 
         async for data in utils.timed_module_data(18000, module_data):
             yield data
 
         return
     except steamtrades.PrivateProfile:
-        yield utils.ModuleData(error=_("Your profile must be public to use steamtrades."), info=_("Waiting Changes"))
+        yield utils.module_error(
+            'steamtrades',
+            _("Your profile must be public to use steamtrades."),
+            info=_("Waiting Changes"),
+        )
         await asyncio.sleep(30)
         return
     except steamtrades.UserLevelError:
-        yield utils.ModuleData(error=_("You must be level 1 or greater to use steamtrades."))
+        yield utils.module_error('steamtrades', _("You must be level 1 or greater to use steamtrades."))
         await asyncio.sleep(30)
         return
     except login.LoginError:
-        yield utils.ModuleData(error=_("User is not logged in. Trying again in 30 seconds"))
+        yield utils.module_error('steamtrades', _("User is not logged in. Trying again in 30 seconds"))
         await asyncio.sleep(30)
         return
 
@@ -83,11 +88,11 @@ async def main() -> AsyncGenerator[utils.ModuleData, None]:
         try:
             trade_info = await steamtrades_session.get_trade_info(trade_id)
         except (IndexError, aiohttp.ClientResponseError):
-            yield utils.ModuleData(error=_("Unable to find trade id"))
+            yield utils.module_error('steamtrades', _("Unable to find trade id"))
             bumped = False
             break
         except aiohttp.ClientError:
-            yield utils.ModuleData(error=_("Check your connection. (server down?)"))
+            yield utils.module_error('steamtrades', _("Check your connection. (server down?)"))
             bumped = False
             break
 
@@ -102,11 +107,11 @@ async def main() -> AsyncGenerator[utils.ModuleData, None]:
                 yield utils.ModuleData(display=trade_id, info=_("Bumped!"))
                 bumped = True
             else:
-                yield utils.ModuleData(display=trade_id, error=_("Unable to bump"))
+                yield utils.module_error('steamtrades', display=trade_id, error=_("Unable to bump"))
                 await asyncio.sleep(5)
                 continue
         except aiohttp.ClientError:
-            yield utils.ModuleData(error=_("Check your connection. (server down?)"))
+            yield utils.module_error('steamtrades', _("Check your connection. (server down?)"))
             await asyncio.sleep(10)
             bumped = False
             break
@@ -122,7 +127,7 @@ async def main() -> AsyncGenerator[utils.ModuleData, None]:
             await asyncio.sleep(5)
             continue
         except login.LoginError:
-            yield utils.ModuleData(error=_("Login is lost. Trying to relogin."))
+            yield utils.module_error('steamtrades', _("Login is lost. Trying to relogin."))
             await asyncio.sleep(5)
             bumped = False
             break
@@ -23,6 +23,8 @@ import logging
 from dataclasses import dataclass
 from typing import Tuple, Any, AsyncGenerator
 
+from .. import metrics, tracing
+
 
 @dataclass
 class ModuleData:
@@ -36,6 +38,23 @@ class ModuleData:
     suppress_logging: bool = False
 
 
+def module_error(module: str, error: str, **kwargs: Any) -> ModuleData:
+    # failures are counted here. Expected states shown as errors (nothing
+    # left to do, waiting for the steam client...) use ModuleData directly
+    metrics.module_errors.inc(module=module)
+    return ModuleData(error=error, **kwargs)
+
+
+# seconds between progress updates of timed waits
+tick_interval = 1
+
+
+def loop_time() -> float:
+    # all waits are scheduled on the loop clock, so it's the time source
+    # for the modules (testing.virtual_time replaces it with a virtual one)
+    return asyncio.get_running_loop().time()
+
+
 async def timed_module_data(wait_offset: int, module_data: ModuleData) -> AsyncGenerator[ModuleData, None]:
     info = module_data.info
     assert module_data.level == (0, 0), "level should not be used here"
@@ -49,20 +68,30 @@ async def timed_module_data(wait_offset: int, module_data: ModuleData) -> AsyncG
     caller = inspect.currentframe().f_back
     log = logging.getLogger(caller.f_globals['__name__'])
     log.info(info)
+    start_time = loop_time()
 
-    for past_time in range(wait_offset):
-        current_time = round((wait_offset - past_time) / 60)
-        current_time_size = 'm'
+    with tracing.span(info, 'wait', seconds=wait_offset):
+        for past_time in range(0, wait_offset, tick_interval):
+            current_time = round((wait_offset - past_time) / 60)
+            current_time_size = 'm'
 
-        if current_time <= 1:
-            current_time = wait_offset - past_time
-            current_time_size = 's'
+            if current_time <= 1:
+                current_time = wait_offset - past_time
+                current_time_size = 's'
 
-        module_data.level = (past_time, wait_offset)
-        module_data.info = f'{info} ({current_time}{current_time_size})'
+            module_data.level = (past_time, wait_offset)
+            module_data.info = f'{info} ({current_time}{current_time_size})'
 
-        yield module_data
-        await asyncio.sleep(1)
+            yielded_at = loop_time()
+            yield module_data
+            next_tick = min(past_time + tick_interval, wait_offset)
+
+            # a consumer holding the wait past the next tick (e.g. a paused game) doesn't count as waited
+            if loop_time() > start_time + next_tick:
+                start_time += loop_time() - yielded_at
+
+            # sleep until the next tick, so the generator's own drift doesn't add up
+            await asyncio.sleep(start_time + next_tick - loop_time())
 
 
 def encode_password(__password: str) -> str:
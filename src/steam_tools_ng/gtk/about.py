@@ -20,7 +20,7 @@ from importlib import resources
 
 from gi.repository import Gdk, Gtk
 
-from .. import __version__, i18n
+from .. import __version__, i18n, loop_monitor
 
 _ = i18n.get_translation
 
@@ -48,6 +48,7 @@ class AboutDialog(Gtk.AboutDialog):
         self.set_copyright("Lara Maia (C) 2015 ~ 2024 - dev@lara.monster")
         self.set_comments(_("Made with Love <3"))
         self.set_license_type(Gtk.License.GPL_3_0)
+        self.set_system_information(loop_monitor.report())
 
         with resources.as_file(resources.files('steam_tools_ng')) as path:
             logo = Gdk.Texture.new_from_filename(str(path / 'icons' / 'stng.png'))
@@ -29,7 +29,7 @@ from stlib import universe, login, community, webapi, internals, plugins
 
 from . import about, settings, window, utils, update
 from . import login as gtk_login
-from .. import config, i18n, core
+from .. import config, i18n, core, cookies, profiling
 
 _ = i18n.get_translation
 log = logging.getLogger(__name__)
@@ -38,6 +38,8 @@ log = logging.getLogger(__name__)
 def while_window_realized(function: Callable[..., Any]) -> Callable[..., Any]:
     @functools.wraps(function)
     async def wrapper(self: 'SteamToolsNG', *args: Any, **kwargs: Any) -> None:
+        profiling.current_module.set(function.__name__.removeprefix('run_'))
+
         while self.main_window.get_realized():
             await function(self, *args, **kwargs)
 
@@ -122,14 +124,10 @@ class SteamToolsNG(Gtk.Application):
 
         self.main_window.statusbar.set_warning("steamguard", _("Logging on Steam. Please wait!"))
         log.info(_("Logging on Steam"))
-
-        if config.cookies_file.is_file():
-            login_session.http_session.cookie_jar.load(config.cookies_file)
-
         try_count = 3
 
         for login_count in range(try_count):
-            if await login_session.is_logged_in():
+            if await cookies.is_logged_in(login_session):
                 log.info("Steam login Successful")
                 config.update_steamid_from_cookies()
                 break
@@ -265,14 +263,12 @@ class SteamToolsNG(Gtk.Application):
 
                 if not play_event.is_set():
                     for executor in executors:
-                        executor.shutdown()
-                        # TODO: On Windows processes can't answer too fast due executor workaround
-                        await asyncio.sleep(1)
+                        await core.executor_pool.pause(executor)
 
                     await play_event.wait()
 
                     for executor in executors:
-                        executor.__init__(executor.appid)
+                        core.executor_pool.resume(executor)
 
     @while_window_realized
     async def run_confirmations(self) -> None:
@@ -298,13 +294,22 @@ class SteamToolsNG(Gtk.Application):
                     self.main_window.statusbar.clear('confirmations')
                     continue
 
-                self.main_window.confirmations_tree.clear()
+                confirmation_items = []
 
                 for confirmation_ in module_data.raw_data:
                     # translatable strings
                     t_give = utils.sanitize_confirmation(confirmation_.give)
                     t_receive = utils.sanitize_confirmation(confirmation_.receive)
 
+                    children = [
+                        self.main_window.confirmations_tree.new_item(
+                            give=give or _("Nothing"),
+                            to='-->',
+                            receive=receive or _("Nothing"),
+                        )
+                        for give, receive in itertools.zip_longest(confirmation_.give, confirmation_.receive)
+                    ]
+
                     item = self.main_window.confirmations_tree.new_item(
                         str(confirmation_.id),
                         str(confirmation_.creatorid),
@@ -313,24 +318,18 @@ class SteamToolsNG(Gtk.Application):
                         utils.markup(confirmation_.to),
                         utils.markup(t_receive),
                         '. '.join(confirmation_.summary),
+                        children=children,
                     )
 
-                    for give, receive in itertools.zip_longest(confirmation_.give, confirmation_.receive):
-                        child = self.main_window.confirmations_tree.new_item(
-                            give=give or _("Nothing"),
-                            to='-->',
-                            receive=receive or _("Nothing"),
-                        )
-
-                        item.children.append(child)
-
-                    self.main_window.confirmations_tree.append_row(item)
+                    confirmation_items.append(item)
 
+                self.main_window.confirmations_tree.update_rows(confirmation_items, key='id')
                 self.old_confirmations = module_data.raw_data
                 self.main_window.statusbar.clear('confirmations')
 
     @while_window_realized
     async def run_market(self) -> None:
+        await self.main_window.wait_tab("market_list")
         market_fetch_buy_event = self.main_window.market_fetch_buy_event
         market_fetch_sell_event = self.main_window.market_fetch_sell_event
         market = core.market.main(market_fetch_buy_event, market_fetch_sell_event)
@@ -394,21 +393,10 @@ class SteamToolsNG(Gtk.Application):
                     f"{histogram.buy_order_count})",
                     order,
                     histogram,
+                    children_factory=functools.partial(utils.histogram_children, tree),
                 )
 
-                for i in range(1, 5):
-                    child = tree.new_item(
-                        sell_price=histogram.sell_order_table[i].price.as_monetary_string() +
-                                   f" ({histogram.sell_order_table[i].quantity})"
-                        if len(histogram.sell_order_table) > i else '-',
-                        buy_price=histogram.buy_order_table[i].price.as_monetary_string() +
-                                  f" ({histogram.buy_order_table[i].quantity})"
-                        if len(histogram.buy_order_table) > i else '-'
-                    )
-
-                    item.children.append(child)
-
-                tree.append_row(item)
+                tree.queue_row(item)
 
             if module_data.action == "clear":
                 self.main_window.market_buy_tree.clear()
@@ -424,6 +412,7 @@ class SteamToolsNG(Gtk.Application):
 
     @while_window_realized
     async def run_coupons(self) -> None:
+        await self.main_window.wait_tab("coupons_list")
         coupon_fetch_event = self.main_window.coupon_fetch_event
         wait_available = self.main_window.coupons_tree.wait_available
         coupons = core.coupons.main(self.steamid, coupon_fetch_event, wait_available)
@@ -452,7 +441,7 @@ class SteamToolsNG(Gtk.Application):
                     str(module_data.raw_data['assetid']),
                 )
 
-                self.main_window.coupons_tree.append_row(item)
+                self.main_window.coupons_tree.queue_row(item)
 
             if module_data.action == "clear":
                 self.main_window.coupons_tree.clear()
@@ -18,22 +18,18 @@
 
 import asyncio
 import contextlib
-import logging
 import sys
 
 from gi.repository import Gtk, GLib, Gio
 
-from .. import core
+from .. import config, core, loop_monitor, metrics, profiling, tracing
 
 
-async def main_loop(application: Gtk.Application | None = None) -> None:
+async def iterate_main_context() -> None:
     main_context = GLib.MainContext.default()
 
-    await core.fix_ssl()
-
-    if application:
-        application.register()
-        application.activate()
+    # GLib sources and signal handlers are dispatched from here
+    profiling.current_module.set('gtk')
 
     while Gio.ListModel.get_n_items(Gtk.Window.get_toplevels()):
         while main_context.pending():
@@ -42,11 +38,40 @@ async def main_loop(application: Gtk.Application | None = None) -> None:
         await asyncio.sleep(0.01)
 
 
-def run(application: Gtk.Application | None = None) -> None:
+async def main_loop(
+        application: Gtk.Application | None = None,
+        profile: bool = False,
+        cprofile: bool = False,
+) -> None:
+    # before any task is created, so all of them are accounted
+    if profile:
+        profiling.start(cprofile=cprofile)
+
+    if config.parser.getboolean('logger', 'log_trace_spans'):
+        tracing.start()
+
+    await core.fix_ssl()
+    metrics.start_exporters()
+    loop_monitor.start()
+
+    if application:
+        application.register()
+        application.activate()
+
+    # in its own task, so the profiler can account it
+    await asyncio.create_task(iterate_main_context())
+
+
+def run(application: Gtk.Application | None = None, profile: bool = False, cprofile: bool = False) -> None:
     with contextlib.suppress(asyncio.CancelledError, KeyboardInterrupt):
-        asyncio.run(main_loop(application))
+        asyncio.run(main_loop(application, profile, cprofile))
+
+    tracing.stop()
+
+    if profile:
+        profiling.stop()
 
-    # prevent tries to open log file at shutdown
-    logging.root.removeHandler(logging.root.handlers[0])
+    # flush pending log records and close log file
+    config.shutdown_logger()
 
     sys.exit(0)
@@ -16,6 +16,7 @@
 # along with this program. If not, see http://www.gnu.org/licenses/.
 #
 import asyncio
+import functools
 import logging
 from typing import Any, Dict
 
@@ -293,6 +294,7 @@ class MarketWindow(utils.PopupWindowBase):
                 self.item.buy_price,
                 self.item.order,
                 self.item.histogram,
+                children_factory=functools.partial(utils.histogram_children, self.tree),
             )
         elif self.raw_action == 'buy':
             await self.cancel(self.item.order, "buy")
@@ -328,6 +330,7 @@ class MarketWindow(utils.PopupWindowBase):
                 f"$ {self.price.as_float()} ({total_amount}:{self.item.histogram.buy_order_count})",
                 self.item.order,
                 self.item.histogram,
+                children_factory=functools.partial(utils.histogram_children, self.tree),
             )
         else:
             await self.cancel(self.item.order, self.data)
@@ -335,17 +338,5 @@ class MarketWindow(utils.PopupWindowBase):
             self.tree.remove_item(self.item)
             return
 
-        for i in range(1, 5):
-            child = self.tree.new_item(
-                sell_price=self.item.histogram.sell_order_table[i].price.as_monetary_string() +
-                           f" ({self.item.histogram.sell_order_table[i].quantity})"
-                if len(self.item.histogram.sell_order_table) > i else '-',
-                buy_price=self.item.histogram.buy_order_table[i].price.as_monetary_string() +
-                          f" ({self.item.histogram.buy_order_table[i].quantity})"
-                if len(self.item.histogram.buy_order_table) > i else '-'
-            )
-
-            new_item.children.append(child)
-
         self.tree.append_row(new_item)
         self.tree.remove_item(self.item)
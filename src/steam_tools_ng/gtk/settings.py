@@ -23,7 +23,7 @@ from typing import Any
 from gi.repository import Gtk
 
 from . import utils
-from .. import config, i18n
+from .. import config, i18n, tracing
 
 log = logging.getLogger(__name__)
 _ = i18n.get_translation
@@ -124,6 +124,40 @@ class SettingsWindow(utils.PopupWindowBase):
         log_color.set_halign(Gtk.Align.END)
         log_color.connect('state-set', utils.on_setting_state_set)
 
+        log_max_size = logger_section.new_item("log_max_size", _("Max file size (MB):"), Gtk.Entry, 0, 3)
+        log_max_size.connect("changed", utils.on_digit_only_setting_changed)
+
+        log_rotate_interval = logger_section.new_item(
+            "log_rotate_interval",
+            _("Rotate interval (hours):"),
+            Gtk.Entry,
+            0, 4,
+        )
+        log_rotate_interval.connect("changed", utils.on_digit_only_setting_changed)
+
+        log_backup_count = logger_section.new_item("log_backup_count", _("Backup count:"), Gtk.Entry, 0, 5)
+        log_backup_count.connect("changed", utils.on_digit_only_setting_changed)
+
+        log_directory_max_size = logger_section.new_item(
+            "log_directory_max_size",
+            _("Max directory size (MB):"),
+            Gtk.Entry,
+            0, 6,
+        )
+        log_directory_max_size.connect("changed", utils.on_digit_only_setting_changed)
+
+        log_compress = logger_section.new_item("log_compress", _("Compress old logs:"), Gtk.Switch, 0, 7)
+        log_compress.set_halign(Gtk.Align.END)
+        log_compress.connect('state-set', utils.on_setting_state_set)
+
+        log_trace_spans = logger_section.new_item("log_trace_spans", _("Trace spans:"), Gtk.Switch, 0, 8)
+        log_trace_spans.set_halign(Gtk.Align.END)
+        log_trace_spans.connect('state-set', self.on_log_trace_spans_state_set)
+
+        log_rotation_info = Gtk.Label()
+        log_rotation_info.set_markup(utils.markup(_("Rotation changes are applied after restart"), color='blue'))
+        logger_section.attach(log_rotation_info, 0, 9, 1, 1)
+
     @staticmethod
     def on_log_button_clicked(button: Gtk.Button) -> None:
         call([config.file_manager, config.parser.get("logger", "log_directory")])
@@ -140,6 +174,11 @@ class SettingsWindow(utils.PopupWindowBase):
 
         config.new('general', 'show_close_button', state)
 
+    @staticmethod
+    def on_log_trace_spans_state_set(switch: Gtk.Switch, state: bool) -> None:
+        tracing.set_enabled(state)
+        config.new('logger', 'log_trace_spans', state)
+
     def on_theme_changed(self, dropdown: Gtk.DropDown, *args: Any) -> None:
         theme = list(config.gtk_themes)[dropdown.get_selected()]
 
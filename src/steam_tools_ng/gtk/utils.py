@@ -16,7 +16,7 @@
 # along with this program. If not, see http://www.gnu.org/licenses/.
 #
 import asyncio
-import contextlib
+import difflib
 import functools
 import html
 import inspect
@@ -26,7 +26,7 @@ import traceback
 from collections import OrderedDict
 from traceback import StackSummary
 from types import FrameType
-from typing import Any, Callable, List, Type, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Type, Tuple
 from xml.etree import ElementTree
 
 from gi.repository import Gtk, Gdk, Gio, GObject
@@ -113,6 +113,9 @@ class AsyncButton(Gtk.Button):
 
 
 class StatusBar(Gtk.Grid):
+    rotation_interval = 3
+    priorities = {"critical": 0, "warning": 1}
+
     def __init__(self) -> None:
         super().__init__()
         _separator = Gtk.Separator()
@@ -122,57 +125,227 @@ class StatusBar(Gtk.Grid):
         self._status.set_hexpand(True)
         self.attach(self._status, 0, 1, 1, 1)
 
-        self.messages = {}
-        for module in config.plugins.keys():
-            self.messages[module] = {"warning": "", "critical": ""}
+        # (module, level) -> message, only active messages are kept
+        self.messages: Dict[Tuple[str, str], str] = {}
+        self._arrival: Dict[Tuple[str, str], int] = {}
+        self._arrival_count = 0
+        self._current: Tuple[str, str] | None = None
+        self._rotation_handle: asyncio.TimerHandle | None = None
 
-        loop = asyncio.get_event_loop()
-        task = loop.create_task(self.__loop_messages())
-        task.add_done_callback(safe_task_callback)
+    @property
+    def queue(self) -> List[Tuple[str, str]]:
+        # critical messages first, then by arrival
+        return sorted(self.messages, key=lambda key: (self.priorities[key[1]], self._arrival[key]))
 
-    async def __loop_messages(self) -> None:
-        while True:
-            # when query is empty
-            if all(all(value == '' for value in messages.values()) for messages in self.messages.values()):
-                self._status.set_css_classes([])
-                self._status.set_text('')
-                await asyncio.sleep(1)
-                continue
+    def _set_message(self, module: str, level: str, message: str) -> None:
+        key = (module, level)
+
+        if not message:
+            if self.messages.pop(key, None) is None:
+                return
+
+            del self._arrival[key]
+        elif self.messages.get(key) == message:
+            return
+        else:
+            if key not in self.messages:
+                self._arrival_count += 1
+                self._arrival[key] = self._arrival_count
+
+            self.messages[key] = message
+
+        self._update(key)
+
+    def _update(self, changed: Tuple[str, str]) -> None:
+        if not self.messages:
+            self._cancel_rotation()
+            self._current = None
+            self._status.set_css_classes([])
+            self._status.set_text('')
+            return
+
+        current = self._current
+
+        if current not in self.messages:
+            self._show(self.queue[0])
+        elif changed in self.messages and self.priorities[changed[1]] < self.priorities[current[1]]:
+            self._show(changed)
+        else:
+            # countdowns update the current message faster than it rotates, so its timer is kept
+            if current == changed:
+                self._render(current)
+
+            if not self._rotation_handle and len(self.messages) > 1:
+                self._schedule_rotation()
+
+    def _render(self, key: Tuple[str, str]) -> None:
+        module_name, level = key
+        self._status.set_css_classes([level])
+        self._status.set_text(f"{module_name}: {self.messages[key]}")
+
+    def _show(self, key: Tuple[str, str]) -> None:
+        self._current = key
+        self._render(key)
+        self._cancel_rotation()
+
+        # a single message stays on screen without any timer
+        if len(self.messages) > 1:
+            self._schedule_rotation()
+
+    def _rotate(self) -> None:
+        self._rotation_handle = None
+        queue = self.queue
+
+        if not queue:
+            return
+
+        if self._current in queue:
+            self._show(queue[(queue.index(self._current) + 1) % len(queue)])
+        else:
+            self._show(queue[0])
 
-            for module_name, module_messages in self.messages.items():
-                for level in ["warning", "critical"]:
-                    if module_messages[level]:
-                        self._status.set_css_classes([level])
-                        self._status.set_text(f"{module_name}: {module_messages[level]}")
-                        await asyncio.sleep(3)
+    def _schedule_rotation(self) -> None:
+        loop = asyncio.get_event_loop()
+        self._rotation_handle = loop.call_later(self.rotation_interval, self._rotate)
+
+    def _cancel_rotation(self) -> None:
+        if self._rotation_handle:
+            self._rotation_handle.cancel()
+            self._rotation_handle = None
 
     def set_warning(self, module: str, message: str) -> None:
-        self.messages[module]["warning"] = message
+        self._set_message(module, "warning", message)
 
     def set_critical(self, module: str, message: str) -> None:
-        self.messages[module]["critical"] = message
+        self._set_message(module, "critical", message)
 
     def clear(self, module: str) -> None:
-        self.messages[module] = {"warning": "", "critical": ""}
+        for level in self.priorities:
+            self._set_message(module, level, "")
+
+
+def column_key(header: str) -> str:
+    key = header.replace(' ', '_').lower()
+
+    # remove translation mark
+    if key.startswith('_'):
+        key = key[1:]
+
+    return key
 
 
 class SimpleTextTreeItem(GObject.Object):
-    def __init__(self, *args: str, headers: Tuple[str, ...], **kwargs: Any) -> None:
+    def __init__(
+            self,
+            *args: Any,
+            columns: Dict[str, int],
+            children: Sequence['SimpleTextTreeItem'] = (),
+            children_factory: Callable[['SimpleTextTreeItem'], List['SimpleTextTreeItem']] | None = None,
+            **kwargs: Any,
+    ) -> None:
+        super(GObject.Object, self).__init__()
+        # PyGObject keeps the instance dict, so it holds five entries at most (the smallest
+        # dict size) and column values are a tuple indexed by the tree's column mapping
+        values = [*args[:len(columns)], *[None] * (len(columns) - len(args))]
+
         for name, value in kwargs.items():
-            setattr(self, name, value)
+            try:
+                values[columns[name]] = value
+            except KeyError:
+                raise TypeError(f"{name!r} is not a column of this tree") from None
+
+        self._columns = columns
+        self._values = tuple(values)
+        # no list is allocated until a row has children
+        self.children = children
+        self.children_factory = children_factory
+        self._child_model: SimpleTextTreeChildren | None = None
+
+    def __getattr__(self, name: str) -> Any:
+        # only called when the normal lookup fails
+        try:
+            columns = self.__dict__['_columns']
+        except KeyError:
+            raise AttributeError(name) from None
 
-        for index, header in enumerate(headers):
-            name = header.replace(' ', '_').lower()
+        if name in columns:
+            value = self.__dict__['_values'][columns[name]]
 
-            # remove translation mark
-            if name.startswith('_'):
-                name = name[1:]
+            if value is not None:
+                return value
 
-            with contextlib.suppress(IndexError):
-                setattr(self, name, args[index])
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
 
-        super(GObject.Object, self).__init__()
-        self.children: List[SimpleTextTreeItem] = []
+    def get_value(self, index: int) -> Any:
+        return self._values[index]
+
+    def same_values(self, other: 'SimpleTextTreeItem') -> bool:
+        if self._values != other._values:
+            return False
+
+        # lazy children are built from the row values
+        if self.children_factory or other.children_factory:
+            return True
+
+        return [child._values for child in self.children] == [child._values for child in other.children]
+
+    @property
+    def has_children(self) -> bool:
+        return bool(self.children) or self.children_factory is not None
+
+    def build_children(self) -> Sequence['SimpleTextTreeItem']:
+        # the factory is kept, so the children can be built again after being released
+        if self.children_factory and not self.children:
+            self.children = self.children_factory(self)
+
+        return self.children
+
+    def set_children(self, children: Sequence['SimpleTextTreeItem']) -> None:
+        # children must be replaced through here once the row is in a tree,
+        # so an expanded row is updated too
+        removed = len(self.children)
+
+        for child in self.children:
+            child.release_children()
+
+        self.children = children
+
+        if self._child_model is not None:
+            self._child_model.items_changed(0, removed, len(children))
+
+    @property
+    def child_model(self) -> 'SimpleTextTreeChildren | None':
+        if self._child_model is None and self.has_children:
+            self._child_model = SimpleTextTreeChildren(self)
+
+        return self._child_model
+
+    def release_children(self) -> None:
+        for child in self.children:
+            child.release_children()
+
+        # lazy children are only kept while the row is in a tree
+        if self.children_factory:
+            self.children = ()
+
+        self._child_model = None
+
+
+class SimpleTextTreeChildren(GObject.Object, Gio.ListModel):
+    # children are only built when the row is expanded for the first time
+    def __init__(self, parent: SimpleTextTreeItem) -> None:
+        super().__init__()
+        self._parent = parent
+
+    def do_get_item_type(self) -> GObject.GType:
+        return SimpleTextTreeItem.__gtype__
+
+    def do_get_n_items(self) -> int:
+        return len(self._parent.build_children())
+
+    def do_get_item(self, position: int) -> SimpleTextTreeItem | None:
+        children = self._parent.build_children()
+        return children[position] if position < len(children) else None
 
 
 class SimpleTextTree(Gtk.Grid):
@@ -182,9 +355,11 @@ class SimpleTextTree(Gtk.Grid):
             overlay_scrolling: bool = False,
             resizable: bool = True,
             fixed_width: int = 0,
+            flush_delay: float = 0.25,
     ) -> None:
         super().__init__()
         self.headers = headers
+        self.columns = {column_key(header): index for index, header in enumerate(headers)}
 
         self._scrolled_window = Gtk.ScrolledWindow()
         self._scrolled_window.set_overlay_scrolling(overlay_scrolling)
@@ -205,7 +380,7 @@ class SimpleTextTree(Gtk.Grid):
         expander_column.set_factory(expander_factory)
         self._view.append_column(expander_column)
 
-        for element in self.headers:
+        for index, element in enumerate(self.headers):
             column = Gtk.ColumnViewColumn()
             column.set_resizable(resizable)
 
@@ -220,7 +395,7 @@ class SimpleTextTree(Gtk.Grid):
 
             factory = Gtk.SignalListItemFactory()
             factory.connect('setup', self.setup)
-            factory.connect('bind', self.bind, element)
+            factory.connect('bind', self.bind, index)
             column.set_factory(factory)
             self._view.append_column(column)
 
@@ -235,6 +410,10 @@ class SimpleTextTree(Gtk.Grid):
         self._model.set_autoselect(True)
         self._view.set_model(self._model)
 
+        self._pending_rows: List[SimpleTextTreeItem] = []
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._flush_delay = flush_delay
+
         self._lock = False
         self._lock_label = Gtk.Label()
         self._lock_label.set_visible(False)
@@ -279,7 +458,7 @@ class SimpleTextTree(Gtk.Grid):
         item.set_child(expander)
 
     @staticmethod
-    def bind(view: Gtk.ListView, item: Gtk.ListItem, element: str | None = None) -> None:
+    def bind(view: Gtk.ListView, item: Gtk.ListItem, column_index: int | None = None) -> None:
         expander = item.get_child()
         assert isinstance(expander, Gtk.TreeExpander)
 
@@ -293,30 +472,23 @@ class SimpleTextTree(Gtk.Grid):
         if isinstance(data, Gtk.TreeListRow):
             data = data.get_item()
 
-        if element:
-            attribute = element.replace(' ', '_').lower()
+        if column_index is not None:
+            column_text = data.get_value(column_index)
 
-            if hasattr(data, attribute):
-                column_text = getattr(data, attribute)
+            if column_text is not None:
                 label.set_markup(column_text)
                 label.set_hexpand(True)
 
-    def item_factory(self, item: Gtk.ListItem) -> Gtk.TreeListModel | None:
-        store = Gio.ListStore.new(SimpleTextTreeItem)
-
+    @staticmethod
+    def item_factory(item: SimpleTextTreeItem | Gtk.TreeListRow) -> Gio.ListModel | None:
         if isinstance(item, Gtk.TreeListRow):
             item = item.get_item()
 
-        if item.children:
-            for child in item.children:
-                store.append(child)
-
-            return Gtk.TreeListModel.new(store, False, False, self.item_factory)
-
-        return None
+        # cached per item, so rebinding or re-expanding a row doesn't create a new model
+        return item.child_model
 
     def new_item(self, *data: str, **kwargs: Any) -> SimpleTextTreeItem:
-        return SimpleTextTreeItem(*data, headers=self.headers, **kwargs)
+        return SimpleTextTreeItem(*data, columns=self.columns, **kwargs)
 
     def append_row(self, row: Gtk.TreeListRow) -> None:
         self._store.append(row)
@@ -325,6 +497,81 @@ class SimpleTextTree(Gtk.Grid):
         if total == 1:
             self._model.emit('selection-changed', 0, total)
 
+    def append_rows(self, rows: Iterable[SimpleTextTreeItem]) -> None:
+        rows = list(rows)
+
+        if not rows:
+            return
+
+        was_empty = self._store.get_n_items() == 0
+        self._store.splice(self._store.get_n_items(), 0, rows)
+
+        if was_empty:
+            self._model.emit('selection-changed', 0, self._model.get_n_items())
+
+    def replace_all(self, rows: Iterable[SimpleTextTreeItem]) -> None:
+        self._pending_rows.clear()
+        self._release_children(0, self._store.get_n_items())
+        self._store.splice(0, self._store.get_n_items(), list(rows))
+        total = self._model.get_n_items()
+
+        if total > 0:
+            self._model.emit('selection-changed', 0, total)
+
+    def update_rows(self, rows: Iterable[SimpleTextTreeItem], key: str) -> None:
+        # rows are matched by the key column. Unchanged rows keep the current item, so
+        # they keep their selection and expansion, and only the changed ranges are spliced
+        key_index = self.columns[key]
+        current_items = [self._store.get_item(position) for position in range(self._store.get_n_items())]
+        items_by_key = {item.get_value(key_index): item for item in current_items}
+        new_items = []
+
+        for row in rows:
+            item = items_by_key.get(row.get_value(key_index))
+            new_items.append(item if item is not None and item.same_values(row) else row)
+
+        matcher = difflib.SequenceMatcher(
+            None,
+            [id(item) for item in current_items],
+            [id(item) for item in new_items],
+            autojunk=False,
+        )
+        changes = [opcode for opcode in matcher.get_opcodes() if opcode[0] != 'equal']
+
+        if not changes:
+            return
+
+        kept_items = {id(item) for item in new_items}
+
+        # from the end, so the positions of the previous ranges are still valid
+        for _tag, start, end, new_start, new_end in reversed(changes):
+            for item in current_items[start:end]:
+                if id(item) not in kept_items:
+                    item.release_children()
+
+            self._store.splice(start, end - start, new_items[new_start:new_end])
+
+        total = self._model.get_n_items()
+
+        if total > 0:
+            self._model.emit('selection-changed', 0, total)
+
+    def queue_row(self, row: SimpleTextTreeItem) -> None:
+        # rows that arrive close together are inserted in a single splice
+        self._pending_rows.append(row)
+
+        if not self._flush_handle:
+            self._flush_handle = asyncio.get_running_loop().call_later(self._flush_delay, self.flush_rows)
+
+    def flush_rows(self) -> None:
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        rows = self._pending_rows
+        self._pending_rows = []
+        self.append_rows(rows)
+
     def remove_row(self, row: Gtk.TreeListRow) -> bool:
         item = row.get_item()
         self.remove_item(item)
@@ -333,6 +580,7 @@ class SimpleTextTree(Gtk.Grid):
         found, position = self._store.find(item)
 
         if found:
+            item.release_children()
             self._store.remove(position)
             total = self._model.get_n_items()
 
@@ -344,8 +592,18 @@ class SimpleTextTree(Gtk.Grid):
         return False
 
     def clear(self) -> None:
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        self._pending_rows.clear()
+        self._release_children(0, self._store.get_n_items())
         self._store.remove_all()
 
+    def _release_children(self, position: int, count: int) -> None:
+        for index in range(position, position + count):
+            self._store.get_item(index).release_children()
+
     async def wait_available(self) -> None:
         while self.lock or self.disabled:
             await asyncio.sleep(1)
@@ -447,7 +705,7 @@ def when_running(function: Callable[..., Any]) -> Callable[..., Any]:
 
 
 class Status(Gtk.Frame):
-    def __init__(self, display_size: int) -> None:
+    def __init__(self, display_size: int, play_event: asyncio.Event | None = None) -> None:
         super().__init__()
 
         # noinspection PyUnusedLocal
@@ -474,7 +732,7 @@ class Status(Gtk.Frame):
         self._play_pause_button.connect("toggled", self.__on_play_pause_button_toggled)
         self._grid.attach(self._play_pause_button, 1, 0, 1, 1)
 
-        self._play_event = asyncio.Event()
+        self._play_event = play_event or asyncio.Event()
         self._play_pause_button.emit("clicked")
 
         self._status = Gtk.Label()
@@ -814,6 +1072,26 @@ def remove_letters(text: str) -> str:
     return ''.join(new_text)
 
 
+def histogram_children(tree: SimpleTextTree, item: SimpleTextTreeItem) -> List[SimpleTextTreeItem]:
+    sell_order_table = item.histogram.sell_order_table
+    buy_order_table = item.histogram.buy_order_table
+    children = []
+
+    for index in range(1, 5):
+        child = tree.new_item(
+            sell_price=sell_order_table[index].price.as_monetary_string() +
+                       f" ({sell_order_table[index].quantity})"
+            if len(sell_order_table) > index else '-',
+            buy_price=buy_order_table[index].price.as_monetary_string() +
+                      f" ({buy_order_table[index].quantity})"
+            if len(buy_order_table) > index else '-'
+        )
+
+        children.append(child)
+
+    return children
+
+
 def color_by_price(price1: int, price2: int, price3: int, quantity1: int, quantity2: int) -> str:
     color = 'red'
 
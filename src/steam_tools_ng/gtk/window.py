@@ -19,9 +19,9 @@
 import asyncio
 import contextlib
 import logging
-from pathlib import Path
+import time
 from subprocess import call
-from typing import Tuple, Any
+from typing import Tuple, Any, Callable, Dict
 
 import stlib
 from gi.repository import Gio, Gtk, Gdk
@@ -29,18 +29,18 @@ from stlib import login, plugins, universe
 
 from . import confirmation, utils, coupon, authenticator, market
 from .login import LoginWindow
-from .. import config, i18n, core
+from .. import config, i18n, core, cookies
 
 _ = i18n.get_translation
 log = logging.getLogger(__name__)
 
-if stlib.steamworks_available:
-    from stlib import client
-
 
 # noinspection PyUnusedLocal
 class Main(Gtk.ApplicationWindow):
     def __init__(self, application: Gtk.Application, title: str) -> None:
+        self._init_time = time.perf_counter()
+        self.first_frame_time: float | None = None
+
         super().__init__(application=application, title=title)
         self.application = application
         self._gtk_settings = Gtk.Settings.get_default()
@@ -109,37 +109,91 @@ class Main(Gtk.ApplicationWindow):
 
         self.main_tabs = Gtk.Stack()
         self.main_tabs.set_hhomogeneous(True)
-        self.main_tabs.connect("notify::visible-child", self.on_stack_child_changed)
         main_grid.attach(self.main_tabs, 1, 2, 1, 1)
 
         switcher = Gtk.StackSwitcher()
         switcher.set_stack(self.main_tabs)
         main_grid.attach(switcher, 1, 1, 1, 1)
 
-        steamguard_section = utils.Section("steamguard")
-        steamguard_section.stackup_section("SteamGuard", self.main_tabs)
+        # tabs are only built when shown for the first time (or when a module needs it)
+        self._tab_builders: Dict[str, Callable[[utils.Section], None]] = {
+            "steamguard": self._build_steamguard_tab,
+            "cardfarming": self._build_cardfarming_tab,
+            "steamgifts": self._build_steamgifts_tab,
+            "steamtrades": self._build_steamtrades_tab,
+            "market": self._build_market_tab,
+            "coupons": self._build_coupons_tab,
+        }
+        self._tab_events = {name: asyncio.Event() for name in [*self._tab_builders, "market_list", "coupons_list"]}
+
+        # modules run before their tab is built, so the play events and
+        # the last status are kept here until the status widget exists
+        self._play_events: Dict[str, asyncio.Event] = {}
+        self._pending_status: Dict[str, core.utils.ModuleData] = {}
+
+        for module_name in ["steamguard", "cardfarming", "steamgifts", "steamtrades"]:
+            self._play_events[module_name] = asyncio.Event()
+            self._play_events[module_name].set()
+
+        self.coupon_fetch_event = asyncio.Event()
+        self.market_fetch_buy_event = asyncio.Event()
+        self.market_fetch_sell_event = asyncio.Event()
+
+        self.statusbar = utils.StatusBar()
+        main_grid.attach(self.statusbar, 1, 3, 1, 1)
+
+        self.main_tabs.connect("notify::visible-child", self.on_stack_child_changed)
 
-        cardfarming_section = utils.Section("cardfarming")
-        cardfarming_section.stackup_section("CardFarming", self.main_tabs)
+        for section_name, section_title in [
+            ("steamguard", "SteamGuard"),
+            ("cardfarming", "CardFarming"),
+            ("steamgifts", "SteamGifts"),
+            ("steamtrades", "SteamTrades"),
+            ("market", _("Market")),
+            ("coupons", _("Coupons")),
+        ]:
+            section = utils.Section(section_name)
+            section.stackup_section(section_title, self.main_tabs)
 
-        steamgifts_section = utils.Section("steamgifts")
-        steamgifts_section.stackup_section("SteamGifts", self.main_tabs)
+        self.connect("destroy", lambda *args: core.safe_exit())
+        self.connect("close-request", lambda *args: core.safe_exit())
+        self.connect_after("realize", self.on_realize)
 
-        steamtrades_section = utils.Section("steamtrades")
-        steamtrades_section.stackup_section("SteamTrades", self.main_tabs)
+        plugin_status_task = asyncio.create_task(self.plugin_status())
+        plugin_status_task.add_done_callback(utils.safe_task_callback)
 
-        market_section = utils.Section("market")
-        market_section.stackup_section(_("Market"), self.main_tabs)
+        user_info_task = asyncio.create_task(self.user_info())
+        user_info_task.add_done_callback(utils.safe_task_callback)
+
+    def on_realize(self, window: Gtk.Window) -> None:
+        frame_clock = self.get_frame_clock()
+        self._after_paint_handler = frame_clock.connect("after-paint", self.on_first_frame)
+
+    def on_first_frame(self, frame_clock: Gdk.FrameClock) -> None:
+        frame_clock.disconnect(self._after_paint_handler)
+        self.first_frame_time = time.perf_counter() - self._init_time
+        log.info(_("Main window first frame in %.1fms"), self.first_frame_time * 1000)
 
-        coupons_section = utils.Section("coupons")
-        coupons_section.stackup_section(_("Coupons"), self.main_tabs)
+    def is_tab_built(self, name: str) -> bool:
+        return self._tab_events[name].is_set()
 
-        # grid managed by plugin switch
-        self.steamguard_status = utils.Status(4)
-        self.cardfarming_status = utils.Status(6)
-        self.steamgifts_status = utils.Status(5)
-        self.steamtrades_status = utils.Status(5)
+    async def wait_tab(self, name: str) -> None:
+        await self._tab_events[name].wait()
+
+    def build_tab(self, name: str) -> None:
+        if self.is_tab_built(name):
+            return
 
+        section = self.main_tabs.get_child_by_name(name)
+        log.debug(i18n.LazyMessage("Building {} tab", name))
+        self._tab_builders[name](section)
+        self._tab_events[name].set()
+
+        if name in self._pending_status:
+            self._apply_status(name, self._pending_status.pop(name))
+
+    def _build_steamguard_tab(self, steamguard_section: utils.Section) -> None:
+        self.steamguard_status = utils.Status(4, self._play_events["steamguard"])
         steamguard_section.attach(self.steamguard_status, 0, 0, 2, 1)
 
         steamguard_stack = Gtk.Stack()
@@ -300,6 +354,8 @@ class Main(Gtk.ApplicationWindow):
         reset_button.connect("clicked", self.on_reset_clicked)
         steamguard_advanced.attach(reset_button, 0, 8, 2, 1)
 
+    def _build_cardfarming_tab(self, cardfarming_section: utils.Section) -> None:
+        self.cardfarming_status = utils.Status(6, self._play_events["cardfarming"])
         cardfarming_section.attach(self.cardfarming_status, 0, 0, 2, 1)
 
         cardfarming_stack = Gtk.Stack()
@@ -340,6 +396,12 @@ class Main(Gtk.ApplicationWindow):
         reverse_sorting = cardfarming_settings.new_item("reverse_sorting", _("Reverse Sorting:"), Gtk.Switch, 0, 7)
         reverse_sorting.connect("state-set", utils.on_setting_state_set)
 
+        memory_budget = cardfarming_settings.new_item("memory_budget", _("Memory budget (MB):"), Gtk.Entry, 0, 8)
+        memory_budget.connect("changed", utils.on_digit_only_setting_changed)
+
+        cpu_budget = cardfarming_settings.new_item("cpu_budget", _("CPU budget (%):"), Gtk.Entry, 0, 9)
+        cpu_budget.connect("changed", utils.on_digit_only_setting_changed)
+
         if not stlib.steamworks_available:
             cardfarming_settings.set_sensitive(False)
             cardfarming_enable.set_active(False)
@@ -356,6 +418,8 @@ class Main(Gtk.ApplicationWindow):
             _cardfarming_disabled.set_markup(utils.markup(_message, color="hotpink", background="black"))
             cardfarming_section.attach(_cardfarming_disabled, 0, 0, 2, 1)
 
+    def _build_steamgifts_tab(self, steamgifts_section: utils.Section) -> None:
+        self.steamgifts_status = utils.Status(5, self._play_events["steamgifts"])
         steamgifts_section.attach(self.steamgifts_status, 0, 0, 2, 1)
 
         steamgifts_stack = Gtk.Stack()
@@ -467,6 +531,8 @@ class Main(Gtk.ApplicationWindow):
             _steamgifts_disabled.set_markup(utils.markup(_message, color="hotpink", background="black"))
             steamgifts_section.attach(_steamgifts_disabled, 0, 0, 2, 2)
 
+    def _build_steamtrades_tab(self, steamtrades_section: utils.Section) -> None:
+        self.steamtrades_status = utils.Status(5, self._play_events["steamtrades"])
         steamtrades_section.attach(self.steamtrades_status, 0, 0, 2, 1)
 
         steamtrades_stack = Gtk.Stack()
@@ -509,6 +575,7 @@ class Main(Gtk.ApplicationWindow):
             _steamtrades_disabled.set_markup(utils.markup(_message, color="hotpink", background="black"))
             steamtrades_settings.attach(_steamtrades_disabled, 0, 1, 2, 2)
 
+    def _build_coupons_tab(self, coupons_section: utils.Section) -> None:
         self.coupon_warning = Gtk.Label()
         self.coupon_warning.set_markup(utils.markup(
             _("Warning: It's a heavy uncached operation. Fetch only once a day or you will be blocked."),
@@ -531,6 +598,42 @@ class Main(Gtk.ApplicationWindow):
         self.coupons_grid.set_row_spacing(10)
         coupons_stack.add_titled(self.coupons_grid, "coupons_list", _("Coupon List"))
 
+        coupons_settings = utils.Section("coupons")
+        coupons_settings.stackup_section(_("Settings"), coupons_stack)
+
+        coupon_botids = coupons_settings.new_item("botids", _("BotIDs:"), Gtk.Entry, 0, 1)
+        coupon_botids.set_placeholder_text('12345, asdfg, ...')
+        coupon_botids.connect("changed", utils.on_setting_changed)
+
+        coupon_tokens = coupons_settings.new_item("tokens", _("Tokens:"), Gtk.Entry, 0, 2)
+        coupon_tokens.set_placeholder_text('12345, asdfg, ...')
+        coupon_tokens.connect("changed", utils.on_setting_changed)
+
+        coupon_botid_to_donate = coupons_settings.new_item("botid_to_donate", _("BotID To Donate:"), Gtk.Entry, 0, 3)
+        coupon_botid_to_donate.connect("changed", utils.on_digit_only_setting_changed)
+
+        coupon_token_to_donate = coupons_settings.new_item("token_to_donate", _("Token To Donate:"), Gtk.Entry, 0, 4)
+        coupon_token_to_donate.connect("changed", utils.on_setting_changed)
+
+        coupon_blacklist = coupons_settings.new_item("blacklist", _("Blacklist:"), Gtk.Entry, 0, 5)
+        coupon_blacklist.connect("changed", utils.on_setting_changed)
+
+        coupon_discount = coupons_settings.new_item(
+            "minimum_discount",
+            _("Minimum Discount:"),
+            Gtk.DropDown,
+            0, 6,
+            items=config.coupon_discounts,
+        )
+        coupon_discount.connect("notify::selected", utils.on_dropdown_setting_changed, config.coupon_discounts)
+
+        if config.parser.getboolean("coupons", "enable"):
+            self._build_coupons_list()
+
+    def _build_coupons_list(self) -> None:
+        if self.is_tab_built("coupons_list"):
+            return
+
         coupons_tree_headers = '_price', '_name', 'link', 'botid', 'token', 'assetid'
         self.coupons_tree = utils.SimpleTextTree(*coupons_tree_headers)
 
@@ -567,9 +670,6 @@ class Main(Gtk.ApplicationWindow):
         fetch_coupons_button.set_label(_('Fetch'))
         fetch_coupons_button.connect('clicked', self.on_fetch_coupons)
         self.coupons_grid.attach(fetch_coupons_button, 0, 5, 1, 1)
-
-        self.coupon_fetch_event = asyncio.Event()
-
         stop_fetching_coupons_button = Gtk.Button()
         stop_fetching_coupons_button.set_margin_start(3)
         stop_fetching_coupons_button.set_margin_end(3)
@@ -591,35 +691,11 @@ class Main(Gtk.ApplicationWindow):
         give_coupon_button.connect('clicked', self.on_coupon_action, 'give')
         self.coupons_grid.attach(give_coupon_button, 3, 5, 1, 1)
 
-        coupons_settings = utils.Section("coupons")
-        coupons_settings.stackup_section(_("Settings"), coupons_stack)
-
-        coupon_botids = coupons_settings.new_item("botids", _("BotIDs:"), Gtk.Entry, 0, 1)
-        coupon_botids.set_placeholder_text('12345, asdfg, ...')
-        coupon_botids.connect("changed", utils.on_setting_changed)
-
-        coupon_tokens = coupons_settings.new_item("tokens", _("Tokens:"), Gtk.Entry, 0, 2)
-        coupon_tokens.set_placeholder_text('12345, asdfg, ...')
-        coupon_tokens.connect("changed", utils.on_setting_changed)
-
-        coupon_botid_to_donate = coupons_settings.new_item("botid_to_donate", _("BotID To Donate:"), Gtk.Entry, 0, 3)
-        coupon_botid_to_donate.connect("changed", utils.on_digit_only_setting_changed)
-
-        coupon_token_to_donate = coupons_settings.new_item("token_to_donate", _("Token To Donate:"), Gtk.Entry, 0, 4)
-        coupon_token_to_donate.connect("changed", utils.on_setting_changed)
-
-        coupon_blacklist = coupons_settings.new_item("blacklist", _("Blacklist:"), Gtk.Entry, 0, 5)
-        coupon_blacklist.connect("changed", utils.on_setting_changed)
-
-        coupon_discount = coupons_settings.new_item(
-            "minimum_discount",
-            _("Minimum Discount:"),
-            Gtk.DropDown,
-            0, 6,
-            items=config.coupon_discounts,
-        )
-        coupon_discount.connect("notify::selected", utils.on_dropdown_setting_changed, config.coupon_discounts)
+        coupon_indicator_task = asyncio.create_task(self.coupon_running_indicator())
+        coupon_indicator_task.add_done_callback(utils.safe_task_callback)
+        self._tab_events["coupons_list"].set()
 
+    def _build_market_tab(self, market_section: utils.Section) -> None:
         market_stack = Gtk.Stack()
         market_stack.set_vexpand(True)
         market_section.attach(market_stack, 1, 1, 1, 1)
@@ -636,8 +712,26 @@ class Main(Gtk.ApplicationWindow):
         market_stack.add_titled(self.market_sell_grid, "market_sell_list", _("Sell List"))
         market_stack.add_titled(self.market_buy_grid, "market_buy_list", _("Buy List"))
 
-        self.market_fetch_buy_event = asyncio.Event()
-        self.market_fetch_sell_event = asyncio.Event()
+        market_settings = utils.Section("market")
+        market_settings.stackup_section(_("Settings"), market_stack)
+
+        market_enable = market_settings.new_item("enable", _("Enable:"), Gtk.Switch, 0, 1)
+        market_enable.label.set_margin_top(40)
+        market_enable.widget.set_margin_top(40)
+        market_enable.connect("state-set", utils.on_setting_state_set)
+
+        market_refetch_button = Gtk.Button()
+        market_refetch_button.set_label(_("Refetch market data"))
+        market_refetch_button.set_name("market_refetch_button")
+        market_refetch_button.connect('clicked', self.on_market_refetch_clicked)
+        market_settings.attach(market_refetch_button, 0, 2, 2, 1)
+
+        if config.parser.getboolean("market", "enable"):
+            self._build_market_list()
+
+    def _build_market_list(self) -> None:
+        if self.is_tab_built("market_list"):
+            return
 
         market_tree_headers = '_name', '_my_price', '_sell_price', '_buy_price', 'order', 'histogram'
 
@@ -769,37 +863,9 @@ class Main(Gtk.ApplicationWindow):
         self.market_buy_cancel_button.connect("clicked", self.on_market_action, "cancel", "buy", self.market_buy_tree)
         self.market_buy_grid.attach(self.market_buy_cancel_button, 5, 5, 1, 1)
 
-        market_settings = utils.Section("market")
-        market_settings.stackup_section(_("Settings"), market_stack)
-
-        market_enable = market_settings.new_item("enable", _("Enable:"), Gtk.Switch, 0, 1)
-        market_enable.label.set_margin_top(40)
-        market_enable.widget.set_margin_top(40)
-        market_enable.connect("state-set", utils.on_setting_state_set)
-
-        market_refetch_button = Gtk.Button()
-        market_refetch_button.set_label(_("Refetch market data"))
-        market_refetch_button.set_name("market_refetch_button")
-        market_refetch_button.connect('clicked', self.on_market_refetch_clicked)
-        market_settings.attach(login_button, 0, 2, 2, 1)
-
-        self.statusbar = utils.StatusBar()
-        main_grid.attach(self.statusbar, 1, 3, 1, 1)
-
-        self.connect("destroy", lambda *args: core.safe_exit())
-        self.connect("close-request", lambda *args: core.safe_exit())
-
-        plugin_status_task = asyncio.create_task(self.plugin_status())
-        plugin_status_task.add_done_callback(utils.safe_task_callback)
-
-        user_info_task = asyncio.create_task(self.user_info())
-        user_info_task.add_done_callback(utils.safe_task_callback)
-
-        coupon_indicator_task = asyncio.create_task(self.coupon_running_indicator())
-        coupon_indicator_task.add_done_callback(utils.safe_task_callback)
-
         market_indicator_task = asyncio.create_task(self.market_running_indicator())
         market_indicator_task.add_done_callback(utils.safe_task_callback)
+        self._tab_events["market_list"].set()
 
     @property
     def theme(self) -> str:
@@ -822,7 +888,7 @@ class Main(Gtk.ApplicationWindow):
 
             if (
                     not login_session
-                    or not await login_session.is_logged_in()
+                    or not await cookies.is_logged_in(login_session)
                     or not self.application.steamid
             ):
                 self.application.main_window.user_info_label.set_markup(
@@ -879,12 +945,16 @@ class Main(Gtk.ApplicationWindow):
                 if plugin_name == 'market':
                     enabled = config.parser.getboolean("market", "enable")
 
+                    if not self.is_tab_built("market"):
+                        continue
+
                     if enabled:
+                        self._build_market_list()
                         self.market_buy_grid.disabled = False
                         self.market_sell_grid.disabled = False
                         self.market_buy_tree.set_sensitive(True)
                         self.market_sell_tree.set_sensitive(True)
-                    else:
+                    elif self.is_tab_built("market_list"):
                         self.market_buy_grid.disabled = True
                         self.market_sell_grid.disabled = True
                         self.market_buy_tree.set_sensitive(False)
@@ -898,6 +968,14 @@ class Main(Gtk.ApplicationWindow):
                     else:
                         enabled = config.parser.getboolean(plugin_name, "enable")
 
+                        if not self.is_tab_built("coupons"):
+                            continue
+
+                        if enabled:
+                            self._build_coupons_list()
+                        elif not self.is_tab_built("coupons_list"):
+                            continue
+
                     main = getattr(self, f'{plugin_name}_grid')
                     tree = getattr(self, f'{plugin_name}_tree')
 
@@ -911,6 +989,11 @@ class Main(Gtk.ApplicationWindow):
                     continue
 
                 enabled = config.parser.getboolean(plugin_name, "enable")
+
+                # disabled modules that were never shown have nothing to update
+                if not self.is_tab_built(plugin_name):
+                    continue
+
                 status = getattr(self, f'{plugin_name}_status')
 
                 if not enabled:
@@ -972,14 +1055,8 @@ class Main(Gtk.ApplicationWindow):
         row = self.coupons_tree.model.get_item(position)
         item = row.get_item()
         url = f"steam://openurl/{item.link}"
-        steam_running = False
-
-        if stlib.steamworks_available:
-            with contextlib.suppress(ProcessLookupError):
-                with client.SteamGameServer() as server:
-                    steam_running = True
 
-        if not steam_running:
+        if not core.steam_process.is_running():
             url = item.link
 
         call([config.file_manager, url])
@@ -990,14 +1067,8 @@ class Main(Gtk.ApplicationWindow):
         item = row.get_item()
         raw_url = f"https://steamcommunity.com/market/listings/{item.order.appid}/{item.order.hash_name}"
         url = f"steam://openurl/{raw_url}"
-        steam_running = False
 
-        if stlib.steamworks_available:
-            with contextlib.suppress(ProcessLookupError):
-                with client.SteamGameServer() as server:
-                    steam_running = True
-
-        if not steam_running:
+        if not core.steam_process.is_running():
             url = raw_url
 
         call([config.file_manager, url])
@@ -1041,7 +1112,8 @@ class Main(Gtk.ApplicationWindow):
         self.market_buy_cancel_button.set_sensitive(True)
 
     def on_market_refetch_clicked(self, button: Gtk.Button) -> None:
-        self.fetch_market_event.set()
+        self.market_fetch_sell_event.set()
+        self.market_fetch_buy_event.set()
 
     def on_market_action(self, button: Gtk.Button, action: str, value: str | None, tree: utils.SimpleTextTree) -> None:
         market_window = market.MarketWindow(self, self.application, tree, action, value)
@@ -1053,9 +1125,9 @@ class Main(Gtk.ApplicationWindow):
         if parent := item.get_parent():
             view.set_selected(parent.get_position())
 
-    @staticmethod
-    def on_stack_child_changed(tabs: Gtk.Stack, *args: Any) -> None:
+    def on_stack_child_changed(self, tabs: Gtk.Stack, *args: Any) -> None:
         main_section = tabs.get_visible_child()
+        self.build_tab(main_section.get_name())
 
         if not (config_stack := main_section.get_child_at(1, 1)):
             log.debug("Not reading config values cause GUI didn't finish loading")
@@ -1067,14 +1139,14 @@ class Main(Gtk.ApplicationWindow):
                 config_section = config_section.get_child().get_child()
 
             if not isinstance(config_section, utils.Section):
-                log.debug(f"Not reading config for {config_section} cause there's no config section")
+                log.debug("Not reading config for %s cause there's no config section", config_section)
                 continue
 
             for item in config_section.items:
                 if item.get_name().startswith('_'):
                     continue
 
-                log.debug(f'Reading {item.section.get_name()}:{item.get_name()} from config file')
+                log.debug('Reading %s:%s from config file', item.section.get_name(), item.get_name())
                 item.update_values()
 
     @staticmethod
@@ -1096,44 +1168,61 @@ class Main(Gtk.ApplicationWindow):
             level: Tuple[int, int] = (0, 0),
             suppress_logging: bool = False,
     ) -> None:
-        _status = getattr(self, f'{module}_status')
-
         if not module_data:
             module_data = core.utils.ModuleData(display, status, info, error, level, suppress_logging=suppress_logging)
 
-        if module_data.display:
-            if not module_data.suppress_logging:
-                log.debug(f"display data: {module_data.display}")
+        if not module_data.suppress_logging:
+            if module_data.display:
+                log.debug("display data: %s", module_data.display)
 
+            if module_data.status:
+                log.debug("status data: %s", module_data.status)
+
+            if module_data.info:
+                log.info(module_data.info)
+
+            if module_data.error:
+                log.error(module_data.error)
+
+        if self.is_tab_built(module):
+            self._apply_status(module, module_data)
+            return
+
+        # it's applied when the tab is built, so a module running in background doesn't build it
+        if pending := self._pending_status.get(module):
+            module_data = core.utils.ModuleData(
+                module_data.display,
+                module_data.status or pending.status,
+                module_data.info or pending.info,
+                # status and error share the same label
+                module_data.error or ('' if module_data.status else pending.error),
+                module_data.level,
+            )
+
+        self._pending_status[module] = module_data
+
+    def _apply_status(self, module: str, module_data: core.utils.ModuleData) -> None:
+        _status = getattr(self, f'{module}_status')
+
+        if module_data.display:
             _status.set_display(module_data.display)
         else:
             _status.unset_display()
 
         if module_data.status:
-            if not module_data.suppress_logging:
-                log.debug(f"status data: {module_data.status}")
-
             _status.set_status(module_data.status)
 
         if module_data.info:
-            if not module_data.suppress_logging:
-                log.info(module_data.info)
-
             _status.set_info(module_data.info)
 
         if module_data.error:
-            if not module_data.suppress_logging:
-                log.error(module_data.error)
-
             _status.set_error(module_data.error)
 
         if module_data.level:
             _status.set_level(*module_data.level)
 
     def get_play_event(self, module: str) -> asyncio.Event:
-        _status = getattr(self, f'{module}_status')
-        assert isinstance(_status, utils.Status)
-        return _status.play_event
+        return self._play_events[module]
 
     def on_login_button_clicked(self, button: Gtk.Button) -> None:
         login_window = LoginWindow(self, self.application)
@@ -1161,12 +1250,16 @@ class Main(Gtk.ApplicationWindow):
         login_window.no_steamguard.set_visible(False)
         login_window.present()
 
+        with contextlib.suppress(IndexError):
+            cookie_jar = login.Login.get_session(0).http_session.cookie_jar
+
+            if isinstance(cookie_jar, cookies.PersistentCookieJar):
+                cookie_jar.discard()
+
         config.cookies_file.unlink(missing_ok=True)
         config.config_file.unlink(missing_ok=True)
 
-        log_directory = config.parser.get("logger", "log_directory")
-        Path(log_directory, 'steam-tools-ng.log').unlink()
-        Path(log_directory, 'steam-tools-ng.log.1').unlink()
+        config.remove_log_files()
 
         login_window.status.info(_("Successful!\nExiting..."))
         asyncio.get_running_loop().call_later(3, lambda: core.safe_exit())
@@ -22,7 +22,6 @@ import os
 import sys
 from gi.repository import Gtk
 from multiprocessing import freeze_support
-from pathlib import Path
 from steam_tools_ng import config, i18n
 from steam_tools_ng.gtk import application, about, async_gtk, utils
 from subprocess import call
@@ -42,6 +41,7 @@ def main() -> None:
     freeze_support()
     try:
         config.init()
+        config.init_plugins()
     except configparser.Error as exception:
         utils.fatal_error_dialog(exception, [])
         sys.exit(1)
@@ -76,6 +76,20 @@ def main() -> None:
         dest='reset_password',
     )
 
+    command_parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Account CPU time and awaits to each module and save a report in the log directory on exit',
+        dest='profile',
+    )
+
+    command_parser.add_argument(
+        '--cprofile',
+        action='store_true',
+        help='Also save a cProfile dump with the report (slower, implies --profile)',
+        dest='cprofile',
+    )
+
     command_parser.add_argument(
         '-v', '--version',
         action='store_true',
@@ -84,6 +98,7 @@ def main() -> None:
     )
 
     console_params = command_parser.parse_args()
+    console_params.profile |= console_params.cprofile
 
     if console_params.version:
         about_dialog = about.AboutDialog(parent_window=None)
@@ -111,11 +126,7 @@ def main() -> None:
 
     if console_params.reset:
         config.config_file.unlink(missing_ok=True)
-        logging.root.removeHandler(logging.root.handlers[0])
-
-        log_directory = config.parser.get("logger", "log_directory")
-        Path(log_directory, 'steam-tools-ng.log').unlink()
-        Path(log_directory, 'steam-tools-ng.log.1').unlink()
+        config.remove_log_files()
 
         log.info(_('Done!'))
         sys.exit(0)
@@ -131,7 +142,7 @@ def main() -> None:
         sys.exit(1)
 
     app = application.SteamToolsNG()
-    async_gtk.run(app)
+    async_gtk.run(app, profile=console_params.profile, cprofile=console_params.cprofile)
 
 
 if __name__ == "__main__":
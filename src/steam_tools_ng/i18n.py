@@ -19,21 +19,18 @@
 # Never use VHL methods in this file to avoid infinite recursion:
 # [method>get_translation->vhlm->get_translation->vhlm] IT'S NOT A BUG!
 import configparser
+import functools
 import gettext
 import os
 from importlib import resources
 from pathlib import Path
+from typing import Any
 
 from . import config
 
 
-def get_translation(text: str) -> str:
-    try:
-        language = config.parser.get('general', 'language')
-    except configparser.NoSectionError:
-        # assume that config is not fully loaded yet
-        return text
-
+@functools.lru_cache(maxsize=None)
+def _load_translation(language: str) -> gettext.NullTranslations:
     with resources.as_file(resources.files('steam_tools_ng')) as path:
         locale_path = path / 'locale'
 
@@ -53,5 +50,30 @@ def get_translation(text: str) -> str:
                 locale_path = path
                 break
 
-    translation = gettext.translation("steam-tools-ng", locale_path, languages=[language], fallback=True)
-    return translation.gettext(text)
+    return gettext.translation("steam-tools-ng", locale_path, languages=[language], fallback=True)
+
+
+def get_translation(text: str) -> str:
+    try:
+        language = config.parser.get('general', 'language')
+    except configparser.NoSectionError:
+        # assume that config is not fully loaded yet
+        return text
+
+    return _load_translation(language).gettext(text)
+
+
+class LazyMessage:
+    __slots__ = ('message', 'args', 'kwargs')
+
+    # translated and formatted only when a log handler emits it
+    def __init__(self, message: str, *args: Any, **kwargs: Any) -> None:
+        self.message = message
+        self.args = args
+        self.kwargs = kwargs
+
+    def __str__(self) -> str:
+        return get_translation(self.message).format(*self.args, **self.kwargs)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.message!r})'
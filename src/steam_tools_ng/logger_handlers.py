@@ -16,13 +16,22 @@
 # along with this program. If not, see http://www.gnu.org/licenses/.
 #
 
+import gzip
+import logging
+import os
+import queue
+import shutil
 import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 # noinspection PyUnresolvedReferences
-from logging import Handler, NullHandler
+from logging import Filter, Handler, NullHandler
 # noinspection PyUnresolvedReferences
-from logging.handlers import RotatingFileHandler
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from pathlib import Path
 from types import TracebackType
-from typing import Any, Type
+from typing import Any, List, Type
 
 if sys.platform == 'win32':
     from ctypes import Structure, byref, c_short, windll
@@ -94,7 +103,16 @@ class ColoredStreamHandler(Handler):
         'DEBUG': 2 | 1,
     }
 
+    # shared with console renderer, so status line and log messages don't mix
+    console_lock = threading.RLock()
+    writes = 0
+
     def emit(self, record: Any) -> None:
+        with self.console_lock:
+            ColoredStreamHandler.writes += 1
+            self._write(record)
+
+    def _write(self, record: Any) -> None:
         # noinspection PyBroadException
         try:
             msg = record.getMessage().split('\n')
@@ -115,7 +133,8 @@ class ColoredStreamHandler(Handler):
             else:
                 color_number = self.unix_color_map.get(record.levelname, 37)
                 sys.stdout.write('\033[32m --> ')
-                sys.stdout.write(f'\033[{color_number}m{msg.pop(0)}\033[m\n')
+                # clears the console status lines below the message too
+                sys.stdout.write(f'\033[{color_number}m{msg.pop(0)}\033[m\033[J\n')
 
                 sys.stdout.write('\033[1;37m')
                 for line in msg:
@@ -123,3 +142,147 @@ class ColoredStreamHandler(Handler):
                 sys.stdout.write('\033[m')
         except Exception:
             self.handleError(record)
+
+
+class ExcludeFilter(Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        return not super().filter(record)
+
+
+class BoundedQueueHandler(QueueHandler):
+    def __init__(self, maxsize: int = 10000) -> None:
+        super().__init__(queue.Queue(maxsize))
+        # records wait for a free slot instead of being dropped (used on shutdown)
+        self.blocking = False
+        self.dropped = 0
+        self.total_dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # formatting is done by the listener handlers on the background thread
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        with self._dropped_lock:
+            try:
+                if self.dropped:
+                    self.queue.put(self._dropped_record(), block=self.blocking)
+                    self.dropped = 0
+
+                self.queue.put(record, block=self.blocking)
+            except queue.Full:
+                self.dropped += 1
+                self.total_dropped += 1
+
+    def _dropped_record(self) -> logging.LogRecord:
+        return logging.LogRecord(
+            __name__,
+            logging.INFO,
+            __file__,
+            0,
+            "Log queue is full. %d messages has been dropped",
+            (self.dropped,),
+            None,
+            'enqueue',
+        )
+
+
+class BlockingQueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # wait for a free slot instead of losing the sentinel when queue is full
+        self.queue.put(self._sentinel)
+
+
+class SizedTimedRotatingFileHandler(RotatingFileHandler):
+    def __init__(
+            self,
+            filename: Path,
+            max_bytes: int = 0,
+            interval: int = 0,
+            backup_count: int = 0,
+            compress: bool = False,
+            max_directory_size: int = 0,
+            encoding: str | None = None,
+    ) -> None:
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding=encoding)
+        self.interval = interval
+        self.compress = compress
+        self.max_directory_size = max_directory_size
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='log-compressor')
+        self._compressing: Future[None] | None = None
+
+        if self.compress:
+            self.namer = self.gzip_namer
+            self.rotator = self.gzip_rotator
+
+        if interval and os.path.exists(self.baseFilename):
+            self.rollover_at = os.stat(self.baseFilename).st_mtime + interval
+        else:
+            self.rollover_at = time.time() + interval
+
+    @staticmethod
+    def gzip_namer(name: str) -> str:
+        return f'{name}.gz'
+
+    def gzip_rotator(self, source: str, dest: str) -> None:
+        uncompressed = dest.removesuffix('.gz')
+        os.rename(source, uncompressed)
+        self._compressing = self._compressor.submit(self._compress, uncompressed, dest)
+
+    def _compress(self, source: str, dest: str) -> None:
+        with open(source, 'rb') as source_file, gzip.open(dest, 'wb') as dest_file:
+            shutil.copyfileobj(source_file, dest_file)
+
+        os.remove(source)
+        self.prune()
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if self.interval and time.time() >= self.rollover_at:
+            return True
+
+        return bool(super().shouldRollover(record))
+
+    def doRollover(self) -> None:
+        # the previous backup must be in place before shifting files
+        if self._compressing:
+            self._compressing.result()
+            self._compressing = None
+
+        super().doRollover()
+        self.rollover_at = time.time() + self.interval
+
+        if not self.compress:
+            self.prune()
+
+    def log_files(self) -> List[Path]:
+        base_file = Path(self.baseFilename)
+        return [base_file, *base_file.parent.glob(f'{base_file.name}.*')]
+
+    def prune(self) -> None:
+        if not self.max_directory_size:
+            return
+
+        backups = []
+        total_size = 0
+
+        for log_file in self.log_files():
+            try:
+                stat = log_file.stat()
+            except FileNotFoundError:
+                continue
+
+            total_size += stat.st_size
+
+            if log_file.name != os.path.basename(self.baseFilename):
+                backups.append((stat.st_mtime, stat.st_size, log_file))
+
+        for _mtime, size, log_file in sorted(backups):
+            if total_size <= self.max_directory_size:
+                break
+
+            log_file.unlink(missing_ok=True)
+            total_size -= size
+
+    def close(self) -> None:
+        self._compressor.shutdown(wait=True)
+        super().close()
@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import asyncio
+import collections
+import logging
+import re
+import statistics
+from dataclasses import dataclass
+from typing import Deque, Dict, Tuple
+
+from . import config, i18n, metrics
+
+log = logging.getLogger(__name__)
+_ = i18n.get_translation
+
+# last 5 minutes at the default sampling interval
+max_samples = 1200
+
+# asyncio debug mode formats the handle as a string in the warning, e.g.:
+# <Task pending name='Task-2' coro=<main() running at /path/file.py:10> ...>
+# <Handle main.<locals>.<lambda>() at /path/file.py:8 created at /path/file.py:8>
+_callback_name = re.compile(r"coro=<([^\s(]+)|<(?:Timer)?Handle ([^\s(]+)")
+_callback_location = re.compile(r"(?:running|defined) at (\S+:\d+)|\) at (\S+:\d+)")
+
+loop_lag = metrics.histogram(
+    'stng_event_loop_lag_seconds',
+    'Delay between the time a loop callback was scheduled and the time it ran',
+    buckets=(.001, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0),
+)
+slow_callbacks_total = metrics.counter(
+    'stng_event_loop_slow_callbacks_total',
+    'Callbacks that blocked the event loop longer than the slow callback duration',
+)
+
+
+@dataclass
+class SlowCallback:
+    name: str
+    location: str
+    count: int = 0
+    total_time: float = 0.0
+    max_time: float = 0.0
+
+
+class SlowCallbackFilter(logging.Filter):
+    """Collects the slow callback warnings of asyncio debug mode"""
+
+    def __init__(self, monitor: 'LoopMonitor') -> None:
+        super().__init__()
+        self.monitor = monitor
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not isinstance(record.msg, str) or not isinstance(record.args, tuple):
+            return True
+
+        # selector timings are logged on each loop iteration in debug mode
+        if record.msg.startswith('poll '):
+            return False
+
+        if not record.msg.startswith('Executing '):
+            return True
+
+        handle, duration = record.args
+        self.monitor.add_slow_callback(str(handle), float(duration))
+
+        # the monitor logs it with the source location
+        return False
+
+
+class LoopMonitor:
+    def __init__(
+            self,
+            interval: float = 0.25,
+            slow_callback_duration: float = 0.1,
+            report_interval: float = 0,
+    ) -> None:
+        self.interval = interval
+        self.slow_callback_duration = slow_callback_duration
+        self.report_interval = report_interval
+        self.debug_hooks = False
+        self.samples: Deque[float] = collections.deque(maxlen=max_samples)
+        self.max_lag = 0.0
+        self.slow_callbacks: Dict[Tuple[str, str], SlowCallback] = {}
+        self._filter: SlowCallbackFilter | None = None
+        self._task: asyncio.Task[None] | None = None
+
+    def start(self, debug_hooks: bool = False) -> None:
+        loop = asyncio.get_running_loop()
+        self.debug_hooks = debug_hooks
+
+        if debug_hooks:
+            # debug mode makes asyncio report every callback slower than this
+            loop.set_debug(True)
+            loop.slow_callback_duration = self.slow_callback_duration
+            self._filter = SlowCallbackFilter(self)
+            logging.getLogger('asyncio').addFilter(self._filter)
+
+        self._task = loop.create_task(self._sample())
+
+    def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+        if self._filter:
+            logging.getLogger('asyncio').removeFilter(self._filter)
+            self._filter = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        last_report = loop.time()
+
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            self.add_sample(max(loop.time() - expected, 0.0))
+
+            if self.report_interval and loop.time() - last_report >= self.report_interval:
+                log.info(self.report())
+                last_report = loop.time()
+
+    def add_sample(self, lag: float) -> None:
+        self.samples.append(lag)
+        self.max_lag = max(self.max_lag, lag)
+        loop_lag.observe(lag)
+
+    def add_slow_callback(self, handle: str, duration: float) -> None:
+        name_match = _callback_name.search(handle)
+        location_match = _callback_location.search(handle)
+        name = next(filter(None, name_match.groups()), '') if name_match else ''
+        location = next(filter(None, location_match.groups()), '') if location_match else ''
+
+        if not name and not location:
+            name = handle
+
+        slow_callback = self.slow_callbacks.setdefault((name, location), SlowCallback(name, location))
+        slow_callback.count += 1
+        slow_callback.total_time += duration
+        slow_callback.max_time = max(slow_callback.max_time, duration)
+        slow_callbacks_total.inc()
+
+        log.debug(i18n.LazyMessage("Event loop blocked for {:.3f}s by {} at {}", duration, name, location))
+
+    def percentiles(self) -> Dict[str, float]:
+        if len(self.samples) < 2:
+            return {}
+
+        quantiles = statistics.quantiles(self.samples, n=100, method='inclusive')
+
+        return {
+            'mean': statistics.fmean(self.samples),
+            'p50': quantiles[49],
+            'p90': quantiles[89],
+            'p99': quantiles[98],
+            'max': self.max_lag,
+        }
+
+    def report(self, max_callbacks: int = 10) -> str:
+        lines = [_("Event loop lag ({} samples, every {}s):").format(len(self.samples), self.interval)]
+
+        if percentiles := self.percentiles():
+            lines.append('  ' + '  '.join(f'{name}: {value * 1000:.1f}ms' for name, value in percentiles.items()))
+        else:
+            lines.append('  ' + _("No samples yet"))
+
+        if self.debug_hooks:
+            lines.append(_("Slow callbacks (> {}ms):").format(round(self.slow_callback_duration * 1000)))
+            slowest = sorted(self.slow_callbacks.values(), key=lambda callback: callback.total_time, reverse=True)
+
+            for callback in slowest[:max_callbacks]:
+                lines.append(
+                    f'  {callback.count}x max {callback.max_time * 1000:.0f}ms '
+                    f'total {callback.total_time * 1000:.0f}ms: {callback.name} ({callback.location})'
+                )
+
+            if not slowest:
+                lines.append('  ' + _("None"))
+
+        return '\n'.join(lines)
+
+
+monitor: LoopMonitor | None = None
+
+
+def start(debug_hooks: bool | None = None, report_interval: float = 0) -> LoopMonitor | None:
+    global monitor
+
+    if debug_hooks is None:
+        if not config.parser.getboolean('loop_monitor', 'enable'):
+            return None
+
+        debug_hooks = config.parser.getboolean('loop_monitor', 'debug_hooks')
+
+    monitor = LoopMonitor(
+        config.parser.getint('loop_monitor', 'interval') / 1000,
+        config.parser.getint('loop_monitor', 'slow_callback_duration') / 1000,
+        report_interval,
+    )
+    monitor.start(debug_hooks)
+
+    return monitor
+
+
+def report() -> str:
+    if not monitor:
+        return _("Event loop monitor is disabled")
+
+    return monitor.report()
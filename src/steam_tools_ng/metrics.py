@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import asyncio
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Dict, List, Sequence, Tuple, Type, TypeVar, TYPE_CHECKING
+
+from . import config, i18n
+
+if TYPE_CHECKING:
+    import aiohttp
+
+log = logging.getLogger(__name__)
+_ = i18n.get_translation
+
+default_buckets = (.005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0, 10.0, 30.0)
+content_type = 'text/plain; version=0.0.4; charset=utf-8'
+# the event loop only keeps weak references to tasks
+_exporters: List['asyncio.Task[None]'] = []
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return '+Inf'
+
+    if float(value).is_integer():
+        return str(int(value))
+
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ''
+
+    labels = ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return f'{{{labels}}}'
+
+
+class Metric:
+    type_ = 'untyped'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, Any] = {}
+
+    def _label_values(self, labels: Dict[str, Any]) -> LabelValues:
+        if labels.keys() != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def value(self, **labels: Any) -> Any:
+        return self._values.get(self._label_values(labels), 0)
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            return [
+                (self.name, _format_labels(self.labelnames, label_values), value)
+                for label_values, value in sorted(self._values.items())
+            ]
+
+    def render(self) -> str:
+        lines = [
+            f'# HELP {self.name} {_escape(self.documentation)}',
+            f'# TYPE {self.name} {self.type_}',
+        ]
+
+        for name, labels, value in self.samples():
+            lines.append(f'{name}{labels} {_format_value(value)}')
+
+        return '\n'.join(lines)
+
+
+class Counter(Metric):
+    type_ = 'counter'
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented")
+
+        label_values = self._label_values(labels)
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+
+class Gauge(Metric):
+    type_ = 'gauge'
+
+    def set(self, value: float, **labels: Any) -> None:
+        label_values = self._label_values(labels)
+
+        with self._lock:
+            self._values[label_values] = value
+
+    def inc(self, amount: float = 1, **labels: Any) -> None:
+        label_values = self._label_values(labels)
+
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type_ = 'histogram'
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = default_buckets,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any) -> None:
+        label_values = self._label_values(labels)
+
+        with self._lock:
+            if label_values not in self._values:
+                # one counter per bucket plus +Inf, then sum
+                self._values[label_values] = [0] * (len(self.buckets) + 1) + [0.0]
+
+            values = self._values[label_values]
+            values[bisect.bisect_left(self.buckets, value)] += 1
+            values[-1] += value
+
+    def value(self, **labels: Any) -> SimpleNamespace:
+        values = self._values.get(self._label_values(labels), [0] * (len(self.buckets) + 2))
+        return SimpleNamespace(count=sum(values[:-1]), sum=values[-1])
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        samples = []
+
+        with self._lock:
+            for label_values, values in sorted(self._values.items()):
+                cumulative = 0
+
+                for bucket, count in zip([*self.buckets, math.inf], values):
+                    cumulative += count
+                    labels = _format_labels([*self.labelnames, 'le'], [*label_values, _format_value(bucket)])
+                    samples.append((f'{self.name}_bucket', labels, cumulative))
+
+                labels = _format_labels(self.labelnames, label_values)
+                samples.append((f'{self.name}_sum', labels, values[-1]))
+                samples.append((f'{self.name}_count', labels, cumulative))
+
+        return samples
+
+
+_M = TypeVar('_M', bound=Metric)
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric_class: Type[_M], name: str, *args: Any, **kwargs: Any) -> _M:
+        with self._lock:
+            if name in self._metrics:
+                metric = self._metrics[name]
+
+                if not isinstance(metric, metric_class):
+                    raise ValueError(f"{name} is already registered as a {metric.type_}")
+
+                return metric
+
+            metric = metric_class(name, *args, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames)
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labelnames: Sequence[str] = (),
+            buckets: Sequence[float] = default_buckets,
+    ) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, buckets)
+
+    def get(self, name: str) -> Metric:
+        return self._metrics[name]
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        return ''.join(f'{metric.render()}\n' for metric in metrics)
+
+
+registry = Registry()
+counter = registry.counter
+gauge = registry.gauge
+histogram = registry.histogram
+
+http_requests = counter(
+    'stng_http_requests_total',
+    'Requests made to steam (and plugin) servers',
+    ['host', 'method', 'status'],
+)
+http_errors = counter(
+    'stng_http_errors_total',
+    'Requests that failed without a response',
+    ['host', 'error'],
+)
+http_request_duration = histogram(
+    'stng_http_request_duration_seconds',
+    'Time until the response headers of steam servers are received',
+    ['host'],
+)
+module_errors = counter(
+    'stng_module_errors_total',
+    'Errors reported by the core modules (each one is followed by a retry or a wait)',
+    ['module'],
+)
+
+
+def http_trace_config() -> 'aiohttp.TraceConfig':
+    import aiohttp
+
+    async def on_request_start(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceRequestStartParams,
+    ) -> None:
+        context.start_time = time.monotonic()
+
+    async def on_request_end(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceRequestEndParams,
+    ) -> None:
+        host = params.url.host or ''
+        http_requests.inc(host=host, method=params.method, status=params.response.status)
+        http_request_duration.observe(time.monotonic() - context.start_time, host=host)
+
+    async def on_request_exception(
+            session: aiohttp.ClientSession,
+            context: SimpleNamespace,
+            params: aiohttp.TraceRequestExceptionParams,
+    ) -> None:
+        http_errors.inc(host=params.url.host or '', error=type(params.exception).__name__)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+
+    return trace_config
+
+
+async def _handle_http_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), 10)
+
+        # headers are not used
+        while (await asyncio.wait_for(reader.readline(), 10)).strip():
+            pass
+
+        method, path, *_version = request_line.decode('latin-1').split()
+
+        if method == 'GET' and path.split('?')[0] in ('/', '/metrics'):
+            status = '200 OK'
+            body = registry.render().encode()
+        else:
+            status = '404 Not Found'
+            body = b'Not Found\n'
+
+        writer.write(
+            f'HTTP/1.0 {status}\r\n'
+            f'Content-Type: {content_type}\r\n'
+            f'Content-Length: {len(body)}\r\n'
+            'Connection: close\r\n\r\n'.encode('latin-1') + body
+        )
+        await writer.drain()
+    except (asyncio.TimeoutError, ConnectionError, ValueError):
+        pass
+    finally:
+        writer.close()
+
+
+async def start_server(host: str, port: int) -> asyncio.AbstractServer:
+    server = await asyncio.start_server(_handle_http_client, host, port)
+    port = server.sockets[0].getsockname()[1]
+    log.info(_("Metrics are available at http://%s:%s/metrics"), host, port)
+    return server
+
+
+async def serve(host: str, port: int) -> None:
+    server = await start_server(host, port)
+
+    async with server:
+        await server.serve_forever()
+
+
+def write_file(path: Path) -> None:
+    # write and rename, so readers never see a partial file
+    temp_file = path.with_name(f'.{path.name}.tmp')
+    temp_file.write_text(registry.render(), encoding='utf-8')
+    os.replace(temp_file, path)
+
+
+async def dump(path: Path, interval: int) -> None:
+    log.info(_("Metrics are being dumped to %s every %s seconds"), path, interval)
+
+    try:
+        while True:
+            write_file(path)
+            await asyncio.sleep(interval)
+    finally:
+        write_file(path)
+
+
+def start_exporters() -> List['asyncio.Task[None]']:
+    http_port = config.parser.getint('metrics', 'http_port')
+    dump_file = config.parser.get('metrics', 'dump_file')
+
+    if http_port:
+        http_host = config.parser.get('metrics', 'http_host')
+        _exporters.append(asyncio.create_task(serve(http_host, http_port)))
+
+    if dump_file:
+        dump_interval = config.parser.getint('metrics', 'dump_interval')
+        _exporters.append(asyncio.create_task(dump(Path(dump_file), max(dump_interval, 1))))
+
+    return _exporters
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import asyncio
+import collections.abc
+import contextvars
+import cProfile
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Coroutine, Dict, Generator, Tuple
+
+from . import config, i18n
+
+log = logging.getLogger(__name__)
+_ = i18n.get_translation
+
+# name of the module that owns the running task. Tasks copy the context
+# when created, so helper tasks are accounted to the module that made them
+current_module: contextvars.ContextVar[str] = contextvars.ContextVar('stng_module', default='')
+
+
+@dataclass
+class ModuleStats:
+    name: str
+    steps: int = 0
+    awaits: int = 0
+    cpu_time: float = 0.0
+    wall_time: float = 0.0
+    await_time: float = 0.0
+    max_step: float = 0.0
+
+
+class ProfiledCoroutine(collections.abc.Coroutine[Any, Any, Any]):
+    """Measures each step a task runs its coroutine until the next await"""
+
+    __slots__ = ('coro', 'profiler', 'suspended_at')
+
+    def __init__(self, coro: Coroutine[Any, Any, Any], profiler: 'Profiler') -> None:
+        self.coro = coro
+        self.profiler = profiler
+        self.suspended_at = 0.0
+
+    def __getattr__(self, name: str) -> Any:
+        # __name__, cr_frame, etc., used by the task repr
+        return getattr(self.coro, name)
+
+    def _step(self, method: Callable[..., Any], *args: Any) -> Any:
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+
+        try:
+            result = method(*args)
+        except BaseException:
+            self.profiler.add_step(current_module.get(), cpu_start, start, self.suspended_at, False)
+            raise
+
+        self.suspended_at = self.profiler.add_step(current_module.get(), cpu_start, start, self.suspended_at, True)
+        return result
+
+    def send(self, value: Any) -> Any:
+        return self._step(self.coro.send, value)
+
+    def throw(self, *args: Any) -> Any:  # type: ignore[override]
+        return self._step(self.coro.throw, *args)
+
+    def close(self) -> None:
+        self.coro.close()
+
+    # tasks resume coroutines with next() when the sent value is None
+    def __next__(self) -> Any:
+        return self._step(self.coro.send, None)
+
+    def __iter__(self) -> 'ProfiledCoroutine':
+        return self
+
+    def __await__(self) -> Generator[Any, None, Any]:
+        return self  # type: ignore[return-value]
+
+
+class Profiler:
+    def __init__(self, cprofile: bool = False) -> None:
+        self.modules: Dict[str, ModuleStats] = {}
+        self.cprofile = cProfile.Profile() if cprofile else None
+        self.cpu_start = 0.0
+        self.wall_start = 0.0
+        self.cpu_time = 0.0
+        self.wall_time = 0.0
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task_factory: Any = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._task_factory = self._loop.get_task_factory()
+        self._loop.set_task_factory(self.task_factory)
+        self.cpu_start = time.process_time()
+        self.wall_start = time.perf_counter()
+
+        if self.cprofile:
+            self.cprofile.enable()
+
+    def stop(self) -> None:
+        if self.cprofile:
+            self.cprofile.disable()
+
+        if self._loop:
+            if not self._loop.is_closed():
+                self._loop.set_task_factory(self._task_factory)
+
+            self.cpu_time = time.process_time() - self.cpu_start
+            self.wall_time = time.perf_counter() - self.wall_start
+            self._loop = None
+
+    def task_factory(
+            self,
+            loop: asyncio.AbstractEventLoop,
+            coro: Coroutine[Any, Any, Any],
+            **kwargs: Any,
+    ) -> asyncio.Future[Any]:
+        profiled_coro = ProfiledCoroutine(coro, self)
+
+        if self._task_factory:
+            return self._task_factory(loop, profiled_coro, **kwargs)  # type: ignore[no-any-return]
+
+        return asyncio.Task(profiled_coro, loop=loop, **kwargs)
+
+    def add_step(self, module: str, cpu_start: float, start: float, suspended_at: float, suspended: bool) -> float:
+        end = time.perf_counter()
+        cpu_time = time.thread_time() - cpu_start
+        wall_time = end - start
+
+        try:
+            stats = self.modules[module]
+        except KeyError:
+            stats = self.modules[module] = ModuleStats(module)
+
+        stats.steps += 1
+        stats.cpu_time += cpu_time
+        stats.wall_time += wall_time
+        stats.max_step = max(stats.max_step, wall_time)
+
+        if suspended_at:
+            stats.await_time += start - suspended_at
+
+        if suspended:
+            stats.awaits += 1
+
+        return end
+
+    def totals(self) -> Tuple[float, float]:
+        if self._loop:
+            return time.process_time() - self.cpu_start, time.perf_counter() - self.wall_start
+
+        return self.cpu_time, self.wall_time
+
+    def report(self) -> str:
+        cpu_time, wall_time = self.totals()
+        lines = [
+            _("Profile of {:.1f}s running, {:.1f}s of CPU time:").format(wall_time, cpu_time),
+            f"  {'module':<24} {'cpu':>9} {'wall':>9} {'cpu%':>6} {'awaits':>8} {'awaiting':>10} {'max step':>9}",
+        ]
+
+        for stats in sorted(self.modules.values(), key=lambda stats: stats.cpu_time, reverse=True):
+            lines.append(
+                f"  {stats.name or _('(main)'):<24} {stats.cpu_time:>8.3f}s {stats.wall_time:>8.3f}s "
+                f"{stats.cpu_time / cpu_time * 100 if cpu_time else 0:>5.1f}% {stats.awaits:>8} "
+                f"{stats.await_time:>9.1f}s {stats.max_step * 1000:>7.1f}ms"
+            )
+
+        # plain loop callbacks (transports, timers, GLib sources) and threads
+        unaccounted = max(cpu_time - sum(stats.cpu_time for stats in self.modules.values()), 0.0)
+        lines.append(f"  {_('(outside tasks)'):<24} {unaccounted:>8.3f}s")
+
+        return '\n'.join(lines)
+
+    def write(self, directory: Path) -> Path:
+        base_name = f"steam-tools-ng-profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        report_file = directory / f"{base_name}.txt"
+        report_file.write_text(self.report() + '\n', encoding='utf-8')
+
+        if self.cprofile:
+            self.cprofile.dump_stats(directory / f"{base_name}.prof")
+
+        return report_file
+
+
+profiler: Profiler | None = None
+
+
+def start(cprofile: bool = False) -> Profiler:
+    global profiler
+
+    profiler = Profiler(cprofile)
+    profiler.start()
+
+    return profiler
+
+
+def stop() -> Path | None:
+    """Stops the profiler and writes the report (and the cProfile dump) to the log directory"""
+    if not profiler:
+        return None
+
+    profiler.stop()
+    report_file = profiler.write(Path(config.parser.get("logger", "log_directory")))
+    log.info(_("Profile saved to %s"), report_file)
+
+    return report_file
+
+
+def report() -> str:
+    if not profiler:
+        return _("Profiler is disabled")
+
+    return profiler.report()
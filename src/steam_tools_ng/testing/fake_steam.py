@@ -0,0 +1,884 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import asyncio
+import collections
+import html
+import json
+import logging
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from types import TracebackType
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, Type
+
+from aiohttp import web, ClientRequest, ClientResponse, ClientHandlerType
+from yarl import URL
+
+from ..core import steam_process
+
+log = logging.getLogger(__name__)
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+# steam host -> fake server path prefix
+steam_hosts = {
+    'api.steampowered.com': '/api',
+    'steamcommunity.com': '/community',
+    'store.steampowered.com': '/store',
+    'steamgifts.com': '/steamgifts',
+    'www.steamgifts.com': '/steamgifts',
+}
+
+# stlib module -> base url kwargs accepted by new_session
+session_urls = {
+    'webapi': {'api_url': '/api'},
+    'community': {
+        'api_url': '/api',
+        'community_url': '/community',
+        'economy_url': '/community/economy',
+        'mobileconf_url': '/community/mobileconf',
+    },
+    'internals': {'store_url': '/store'},
+    'steamgifts': {
+        'server': '/steamgifts',
+        'search_page': '/steamgifts/giveaways/search',
+        'config_page': '/steamgifts/account/settings/giveaways',
+        'login_page': '/steamgifts/?login',
+        'openid_url': '/community/openid',
+    },
+}
+
+
+@dataclass
+class FakeGame:
+    appid: int
+    name: str
+    cards: int = 0
+    playtime_forever: int = 0
+
+
+@dataclass
+class FakeItem:
+    assetid: int
+    classid: int
+    name: str
+    type: str = ''
+    appid: int = 753
+    amount: int = 1
+    actions: List[Dict[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class FakeOrder:
+    orderid: int
+    appid: int
+    hash_name: str
+    name: str
+    price: int
+    amount: int = 1
+    buy: bool = False
+    assetid: int = 0
+
+
+@dataclass
+class FakeConfirmation:
+    id: int
+    nonce: int
+    name: str
+    price: int
+    creator_id: int = 0
+
+
+@dataclass
+class FakePackage:
+    packageid: int
+    name: str
+    price: int
+    discount_percent: int = 0
+    apps: List[int] = field(default_factory=list)
+
+
+@dataclass
+class FakeGiveaway:
+    code: str
+    name: str
+    points: int
+    copies: int = 1
+    level: int = 0
+    entered: bool = False
+
+
+@dataclass
+class FakeSteamData:
+    games: List[FakeGame] = field(default_factory=list)
+    inventories: Dict[Tuple[int, int], List[FakeItem]] = field(default_factory=dict)
+    packages: Dict[int, FakePackage] = field(default_factory=dict)
+    orders: List[FakeOrder] = field(default_factory=list)
+    confirmations: List[FakeConfirmation] = field(default_factory=list)
+    trade_offers: List[Dict[str, Any]] = field(default_factory=list)
+    giveaways: List[FakeGiveaway] = field(default_factory=list)
+    points: int = 400
+    level: int = 5
+
+    @classmethod
+    def generate(
+            cls,
+            games: int = 30,
+            coupons: int = 20,
+            orders: int = 10,
+            confirmations: int = 5,
+            giveaways: int = 10,
+            seed: int = 0,
+    ) -> 'FakeSteamData':
+        rng = random.Random(seed)
+        data = cls()
+
+        for index in range(games):
+            appid = 10000 + index * 10
+            data.games.append(FakeGame(appid, f"Game {index}", rng.choice([0, 0, 1, 2, 3])))
+
+        coupon_items = data.inventories.setdefault((753, 3), [])
+
+        for index in range(coupons):
+            packageid = 50000 + index
+            discount = rng.choice([33, 50, 66, 75, 90])
+            data.packages[packageid] = FakePackage(packageid, f"Package {index}", rng.randint(199, 5999))
+
+            coupon_items.append(
+                FakeItem(
+                    assetid=900000 + index,
+                    classid=700000 + index,
+                    name=f"{discount}% OFF Coupon Game {index} - Coupon",
+                    type="Coupon",
+                    actions=[{
+                        'link': f"https://store.steampowered.com/search/?list_of_subs={packageid}",
+                        'name': "View",
+                    }],
+                )
+            )
+
+        for index in range(orders):
+            data.orders.append(
+                FakeOrder(
+                    orderid=300000 + index,
+                    appid=753,
+                    hash_name=f"{10000 + index}-Card {index}",
+                    name=f"Card {index}",
+                    price=rng.randint(3, 150),
+                    amount=rng.randint(1, 3),
+                    buy=bool(index % 2),
+                    assetid=800000 + index,
+                )
+            )
+
+        for index in range(confirmations):
+            data.confirmations.append(
+                FakeConfirmation(
+                    id=600000 + index,
+                    nonce=rng.randint(10 ** 9, 10 ** 10),
+                    name=f"Card {index}",
+                    price=rng.randint(3, 150),
+                    creator_id=400000 + index,
+                )
+            )
+
+        for index in range(giveaways):
+            data.giveaways.append(
+                FakeGiveaway(
+                    code=f"gA{index:05}",
+                    name=f"Giveaway Game {index}",
+                    points=rng.randint(1, 50),
+                    copies=rng.choice([1, 1, 1, 5, 10]),
+                    level=rng.randint(0, 10),
+                )
+            )
+
+        return data
+
+
+class FakeSteamAPIExecutor:
+    """Stand-in for stlib.client.SteamAPIExecutor that doesn't need a steam client"""
+
+    def __init__(self, appid: int = 480) -> None:
+        self.appid = appid
+        self._running = True
+
+    def is_running(self) -> bool:
+        return self._running
+
+    def shutdown(self, *args: Any, **kwargs: Any) -> None:
+        self._running = False
+
+
+# keeps the memory of fake games alive in their worker process
+_game_memory = b''
+
+
+def _burn_cpu(usage: float) -> None:
+    while True:
+        end = time.thread_time() + usage / 100
+        while time.thread_time() < end:
+            pass
+
+        time.sleep((1 - usage) / 100)
+
+
+def _fake_steam_api(memory: int, cpu_usage: float) -> int:
+    global _game_memory
+
+    # filled, so the pages are really allocated
+    _game_memory = b'\x01' * memory
+
+    if cpu_usage:
+        threading.Thread(target=_burn_cpu, args=(cpu_usage,), daemon=True).start()
+
+    return os.getpid()
+
+
+class FakeSteamAPIProcessExecutor(ProcessPoolExecutor):
+    """Stand-in for stlib.client.SteamAPIExecutor with a worker process using memory and CPU like a game"""
+
+    memory = 32 * 1024 * 1024
+    cpu_usage = 0.0
+
+    def __init__(self, appid: int = 480, max_workers: int = 1) -> None:
+        super().__init__(max_workers=max_workers)
+        self.appid = appid
+        self._is_running = True
+        self.submit(_fake_steam_api, self.memory, self.cpu_usage).result()
+
+    def is_running(self) -> bool:
+        return self._is_running
+
+    def shutdown(self, *args: Any, **kwargs: Any) -> None:
+        self._is_running = False
+        super().shutdown(*args, **kwargs)
+
+
+def running_steam_watcher() -> steam_process.SteamWatcher:
+    """Watcher that always sees a steam client running"""
+    watcher = steam_process.SteamWatcher([])
+    watcher.set_running(True)
+    return watcher
+
+
+# badge names are delimited by tabs
+_tabs = '\t' * 9
+
+
+def _price(cents: int) -> str:
+    return f"${cents // 100}.{cents % 100:02}"
+
+
+class FakeSteam:
+    def __init__(
+            self,
+            data: FakeSteamData | None = None,
+            *,
+            latency: float = 0.0,
+            latency_jitter: float = 0.0,
+            error_rate: float = 0.0,
+            rate_limit: int = 0,
+            rate_limit_window: float = 60.0,
+            seed: int = 0,
+    ) -> None:
+        self.data = data or FakeSteamData.generate(seed=seed)
+        self.latency = latency
+        self.latency_jitter = latency_jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.rate_limit_window = rate_limit_window
+
+        self.requests: collections.Counter[str] = collections.Counter()
+        self.errors: collections.Counter[str] = collections.Counter()
+        # (loop time, route, url) of each request, for ordering assertions
+        self.history: List[Tuple[float, str, URL]] = []
+        self._rng = random.Random(seed)
+        self._window: collections.deque[float] = collections.deque()
+
+        self.app = web.Application(middlewares=[self._chaos_middleware])
+        self._runner: web.AppRunner | None = None
+        self.url = URL()
+
+        self.app.router.add_get('/api/ISteamWebAPIUtil/GetServerInfo/v1', self.server_info)
+        self.app.router.add_get('/api/IPlayerService/GetOwnedGames/v1', self.owned_games)
+        self.app.router.add_get('/store/api/packagedetails', self.package_details)
+        self.app.router.add_get('/community', self.community_home)
+        self.app.router.add_get('/community/', self.community_home)
+        self.app.router.add_get('/community/dev/apikey', self.apikey)
+        self.app.router.add_get('/community/profiles/{steamid}/badges/', self.badges)
+        self.app.router.add_get('/community/profiles/{steamid}/gamecards/{appid}', self.gamecards)
+        self.app.router.add_get('/community/inventory/{steamid}/{appid}/{contextid}', self.inventory)
+        self.app.router.add_get('/community/market/mylistings', self.my_listings)
+        self.app.router.add_get('/community/market/listings/{appid}/{hash_name}', self.listing)
+        self.app.router.add_get('/community/market/itemordershistogram', self.histogram)
+        self.app.router.add_post('/community/market/removelisting/{orderid}', self.remove_listing)
+        self.app.router.add_post('/community/market/cancelbuyorder', self.cancel_buy_order)
+        self.app.router.add_post('/community/market/sellitem', self.sell_item)
+        self.app.router.add_post('/community/market/createbuyorder', self.create_buy_order)
+        self.app.router.add_post('/community/tradeoffer/new/send', self.send_trade_offer)
+        self.app.router.add_get('/community/mobileconf/getlist', self.confirmation_list)
+        self.app.router.add_get('/community/mobileconf/details/{confid}', self.confirmation_details)
+        self.app.router.add_get('/community/mobileconf/ajaxop', self.confirmation_op)
+        self.app.router.add_post('/community/openid/login', self.openid_login)
+        self.app.router.add_get('/steamgifts/', self.steamgifts_login)
+        self.app.router.add_get('/steamgifts/account/settings/giveaways', self.steamgifts_settings)
+        self.app.router.add_post('/steamgifts/account/settings/giveaways', self.steamgifts_settings)
+        self.app.router.add_get('/steamgifts/giveaways/search', self.giveaways_search)
+        self.app.router.add_get('/steamgifts/giveaway/{code}/{slug}', self.giveaway)
+        self.app.router.add_post('/steamgifts/ajax.php', self.giveaway_join)
+
+    async def __aenter__(self) -> 'FakeSteam':
+        await self.start()
+        return self
+
+    async def __aexit__(
+            self,
+            exception_type: Type[BaseException] | None,
+            exception_value: BaseException | None,
+            traceback: TracebackType | None,
+    ) -> None:
+        await self.stop()
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> None:
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+
+        _host, port = self._runner.addresses[0][:2]
+        self.url = URL.build(scheme='http', host=host, port=port)
+        log.debug("Fake steam is listening at %s", self.url)
+
+    async def stop(self) -> None:
+        if self._runner:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @property
+    def total_requests(self) -> int:
+        return sum(self.requests.values())
+
+    def base_url(self, path: str) -> str:
+        return str(self.url.join(URL(path)))
+
+    def session_kwargs(self, module: str) -> Dict[str, str]:
+        return {name: self.base_url(path) for name, path in session_urls[module].items()}
+
+    def http_params(self) -> Dict[str, Any]:
+        # some stlib methods use hardcoded urls (e.g. SteamId.profile_url)
+        return {'middlewares': (self.rewrite_middleware,)}
+
+    async def rewrite_middleware(self, request: ClientRequest, handler: ClientHandlerType) -> ClientResponse:
+        if request.url.host in steam_hosts:
+            request.url = self.url.with_path(
+                steam_hosts[request.url.host] + request.url.path,
+            ).with_query(request.url.query)
+
+        return await handler(request)
+
+    @web.middleware
+    async def _chaos_middleware(self, request: web.Request, handler: Handler) -> web.StreamResponse:
+        route = request.match_info.route.resource.canonical if request.match_info.route.resource else request.path
+        now = asyncio.get_running_loop().time()
+        self.requests[route] += 1
+        self.history.append((now, route, request.rel_url))
+
+        if self.latency or self.latency_jitter:
+            await asyncio.sleep(self.latency + self._rng.uniform(0, self.latency_jitter))
+
+        if self.rate_limit:
+            now = asyncio.get_running_loop().time()
+
+            while self._window and now - self._window[0] > self.rate_limit_window:
+                self._window.popleft()
+
+            if len(self._window) >= self.rate_limit:
+                self.errors[route] += 1
+                raise web.HTTPTooManyRequests(headers={'Retry-After': str(round(self.rate_limit_window))})
+
+            self._window.append(now)
+
+        if self.error_rate and self._rng.random() < self.error_rate:
+            self.errors[route] += 1
+            raise web.HTTPInternalServerError()
+
+        return await handler(request)
+
+    @staticmethod
+    async def server_info(request: web.Request) -> web.Response:
+        server_time = int(time.time())
+        return web.json_response({'servertime': server_time, 'servertimestring': time.ctime(server_time)})
+
+    async def owned_games(self, request: web.Request) -> web.Response:
+        appids = {int(value) for key, value in request.query.items() if key.startswith('appids_filter')}
+
+        games = [
+            {
+                'appid': game.appid,
+                'name': game.name,
+                'playtime_forever': game.playtime_forever,
+                'img_icon_url': '',
+                'has_dlc': False,
+                'has_market': True,
+                'has_workshop': False,
+            }
+            for game in self.data.games
+            if not appids or game.appid in appids
+        ]
+
+        return web.json_response({'response': {'game_count': len(games), 'games': games}})
+
+    async def package_details(self, request: web.Request) -> web.Response:
+        packageid = request.query['packageids']
+
+        if int(packageid) not in self.data.packages:
+            return web.json_response({packageid: {'success': False}})
+
+        package = self.data.packages[int(packageid)]
+
+        return web.json_response({
+            packageid: {
+                'success': True,
+                'data': {
+                    'name': package.name,
+                    'page_image': '',
+                    'small_logo': '',
+                    'apps': [{'id': appid, 'name': ''} for appid in package.apps],
+                    'platforms': {'windows': True, 'mac': False, 'linux': True},
+                    'release_date': {'coming_soon': False, 'date': '1 Jan, 2024'},
+                    'price': {'initial': package.price, 'final': package.price, 'discount_percent': 0},
+                },
+            }
+        })
+
+    @staticmethod
+    async def community_home(request: web.Request) -> web.Response:
+        response = web.Response(text='<html><body></body></html>', content_type='text/html')
+        response.set_cookie('sessionid', 'fakesessionid')
+        return response
+
+    @staticmethod
+    async def apikey(request: web.Request) -> web.Response:
+        return web.Response(
+            text='<html><div id="mainContents"><h2>Your Steam Web API Key</h2></div></html>',
+            content_type='text/html',
+        )
+
+    async def badges(self, request: web.Request) -> web.Response:
+        steamid = request.match_info['steamid']
+        rows = []
+
+        for game in self.data.games:
+            progress = f"{game.cards} card drops remaining" if game.cards else "No card drops remaining"
+            rows.append(
+                '<div class="badge_title_row">'
+                f'<a href="steam://run/{game.appid}">Play</a>'
+                f'<div class="badge_title">\n{_tabs}{html.escape(game.name)}{_tabs}&nbsp;</div>'
+                f'<span class="progress_info_bold">{progress}</span>'
+                f'<a href="/profiles/{steamid}/gamecards/{game.appid}/">details</a>'
+                '</div>'
+            )
+
+        return web.Response(text=f"<html><body>{''.join(rows)}</body></html>", content_type='text/html')
+
+    async def gamecards(self, request: web.Request) -> web.Response:
+        appid = int(request.match_info['appid'])
+
+        for game in self.data.games:
+            if game.appid == appid:
+                break
+        else:
+            return web.Response(text='<html><body></body></html>', content_type='text/html')
+
+        progress = f"{game.cards} card drops remaining" if game.cards else "No card drops remaining"
+
+        # each check while farming is a card drop
+        game.cards = max(game.cards - 1, 0)
+        game.playtime_forever += 1
+
+        return web.Response(
+            text=(
+                '<html><body><div class="badge_title_stats_drops">'
+                f'<span class="progress_info_bold">{progress}</span>'
+                '</div></body></html>'
+            ),
+            content_type='text/html',
+        )
+
+    async def inventory(self, request: web.Request) -> web.Response:
+        appid = int(request.match_info['appid'])
+        contextid = int(request.match_info['contextid'])
+        items = self.data.inventories.get((appid, contextid), [])
+        assets = []
+        descriptions = []
+
+        for item in items:
+            assets.append({
+                'appid': item.appid,
+                'contextid': str(contextid),
+                'assetid': str(item.assetid),
+                'classid': str(item.classid),
+                'instanceid': '0',
+                'amount': str(item.amount),
+            })
+
+            descriptions.append({
+                'appid': item.appid,
+                'classid': str(item.classid),
+                'instanceid': '0',
+                'name': item.name,
+                'market_name': item.name,
+                'type': '',
+                'marketable': 0,
+                'tradable': 1,
+                'commodity': 0,
+                'icon_url': '',
+                'icon_url_large': '',
+                'item_expiration': '',
+                'actions': item.actions,
+            })
+
+        return web.json_response({
+            'success': 1,
+            'total_inventory_count': len(items),
+            'assets': assets,
+            'descriptions': descriptions,
+        })
+
+    async def my_listings(self, request: web.Request) -> web.Response:
+        start = int(request.query.get('start', 0))
+        count = int(request.query.get('count', 100))
+        listings = []
+        buy_orders = []
+
+        for order in self.data.orders:
+            if order.buy:
+                buy_orders.append({
+                    'appid': order.appid,
+                    'hash_name': order.hash_name,
+                    'wallet_currency': 1,
+                    'price': str(order.price),
+                    'quantity': str(order.amount),
+                    'buy_orderid': str(order.orderid),
+                    'description': {'name': order.name, 'type': 'Trading Card', 'icon_url': '', 'icon_url_large': ''},
+                })
+            else:
+                listings.append({
+                    'listingid': str(order.orderid),
+                    'price': order.price,
+                    'asset': {
+                        'name': order.name,
+                        'appid': order.appid,
+                        'market_hash_name': order.hash_name,
+                        'type': 'Trading Card',
+                        'amount': str(order.amount),
+                        'unowned_id': str(order.assetid),
+                        'unowned_contextid': '6',
+                        'icon_url': '',
+                        'icon_url_large': '',
+                    },
+                })
+
+        return web.json_response({
+            'success': True,
+            'total_count': len(listings),
+            'listings': listings[start:start + count],
+            'buy_orders': buy_orders,
+        })
+
+    async def listing(self, request: web.Request) -> web.Response:
+        hash_name = request.match_info['hash_name']
+        item_nameid = next(
+            (index for index, order in enumerate(self.data.orders) if order.hash_name == hash_name),
+            len(self.data.orders),
+        )
+        wallet_info = json.dumps({'wallet_currency': 1, 'wallet_country': 'US'})
+
+        return web.Response(
+            text=(
+                '<html><body>'
+                f'<script>\r\nvar g_rgWalletInfo = {wallet_info};\r\n</script>'
+                f'<script>\r\nMarket_LoadOrderSpread( {item_nameid} );\r\n</script>'
+                '</body></html>'
+            ),
+            content_type='text/html',
+        )
+
+    async def histogram(self, request: web.Request) -> web.Response:
+        item_nameid = int(request.query['item_nameid'])
+        rng = random.Random(item_nameid)
+        base_price = self.data.orders[item_nameid].price if item_nameid < len(self.data.orders) else 10
+
+        sell_table = [
+            {'price': _price(base_price + offset), 'quantity': str(rng.randint(1, 50))}
+            for offset in range(0, 10, 2)
+        ]
+
+        buy_table = [
+            {'price': _price(max(base_price - offset, 3)), 'quantity': str(rng.randint(1, 50))}
+            for offset in range(1, 10, 2)
+        ]
+
+        return web.json_response({
+            'success': 1,
+            'sell_order_table': sell_table,
+            'sell_order_count': str(sum(int(order['quantity']) for order in sell_table)),
+            'sell_order_price': sell_table[0]['price'],
+            'buy_order_table': buy_table,
+            'buy_order_count': str(sum(int(order['quantity']) for order in buy_table)),
+            'buy_order_price': buy_table[0]['price'],
+            'highest_buy_order': str(max(base_price - 1, 3)),
+            'lowest_sell_order': str(base_price),
+            'buy_order_graph': [],
+            'sell_order_graph': [],
+            'price_prefix': '$',
+            'price_suffix': '',
+        })
+
+    def _pop_order(self, orderid: int) -> FakeOrder | None:
+        for order in self.data.orders:
+            if order.orderid == orderid:
+                self.data.orders.remove(order)
+                return order
+
+        return None
+
+    async def remove_listing(self, request: web.Request) -> web.Response:
+        self._pop_order(int(request.match_info['orderid']))
+        return web.json_response({})
+
+    async def cancel_buy_order(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        order = self._pop_order(int(str(form['buy_orderid'])))
+        return web.json_response({'success': 1 if order else 29})
+
+    async def sell_item(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        orderid = max((order.orderid for order in self.data.orders), default=300000) + 1
+
+        self.data.orders.append(
+            FakeOrder(
+                orderid=orderid,
+                appid=int(str(form['appid'])),
+                hash_name=f"{form['appid']}-{form['assetid']}",
+                name=f"Item {form['assetid']}",
+                price=int(str(form['price'])),
+                amount=int(str(form['amount'])),
+                assetid=int(str(form['assetid'])),
+            )
+        )
+
+        return web.json_response({'success': True, 'requires_confirmation': 0})
+
+    async def create_buy_order(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        orderid = max((order.orderid for order in self.data.orders), default=300000) + 1
+        hash_name = str(form['market_hash_name'])
+
+        self.data.orders.append(
+            FakeOrder(
+                orderid=orderid,
+                appid=int(str(form['appid'])),
+                hash_name=hash_name,
+                name=hash_name.split('-', 1)[-1],
+                price=int(str(form['price_total'])) // int(str(form['quantity'])),
+                amount=int(str(form['quantity'])),
+                buy=True,
+            )
+        )
+
+        return web.json_response({'success': 1, 'buy_orderid': str(orderid)})
+
+    async def send_trade_offer(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        tradeofferid = str(700000 + len(self.data.trade_offers))
+
+        self.data.trade_offers.append({
+            'tradeofferid': tradeofferid,
+            'partner': str(form['partner']),
+            'offer': json.loads(str(form['json_tradeoffer'])),
+        })
+
+        return web.json_response({'tradeofferid': tradeofferid})
+
+    async def confirmation_list(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'success': True,
+            'conf': [
+                {
+                    'type': 3,
+                    'type_name': 'Market Listing',
+                    'id': str(confirmation.id),
+                    'creator_id': str(confirmation.creator_id),
+                    'nonce': str(confirmation.nonce),
+                    'creation_time': int(time.time()),
+                    'cancel': 'Cancel',
+                    'accept': 'Create Listing',
+                    'icon': '',
+                    'multi': False,
+                    'headline': confirmation.name,
+                    'summary': [_price(confirmation.price)],
+                }
+                for confirmation in self.data.confirmations
+            ],
+        })
+
+    async def confirmation_details(self, request: web.Request) -> web.Response:
+        confid = int(request.match_info['confid'])
+        confirmation = next((item for item in self.data.confirmations if item.id == confid), None)
+
+        if not confirmation:
+            return web.json_response({'success': False})
+
+        receive = _price(confirmation.price - max(confirmation.price // 8, 1))
+        # stlib splits it by ',' and ':"', so the last value must be a number
+        hover = json.dumps(
+            {'id': str(confirmation.id), 'market_name': confirmation.name, 'type': 'Trading Card', 'end': 0},
+            separators=(',', ':'),
+        )
+
+        return web.json_response({
+            'success': True,
+            'html': (
+                '<div class="mobileconf_listing_prices">'
+                f'You receive: <br/>{receive}<br/>'
+                f'Buyer pays: <br/>{_price(confirmation.price)}<br/>'
+                '</div>'
+                '<script></script><script></script>'
+                f"<script>BuildHover( 'confiteminfo', {hover} );</script>"
+            ),
+        })
+
+    async def confirmation_op(self, request: web.Request) -> web.Response:
+        confid = int(request.query['cid'])
+
+        for confirmation in self.data.confirmations:
+            if confirmation.id == confid:
+                self.data.confirmations.remove(confirmation)
+                return web.json_response({'success': True})
+
+        return web.json_response({'success': False})
+
+    @staticmethod
+    async def steamgifts_login(request: web.Request) -> web.Response:
+        return web.Response(
+            text=(
+                '<html><body><form action="https://steamcommunity.com/openid/login" method="post">'
+                '<input type="hidden" name="action" value="steam_openid_login">'
+                '<input type="hidden" name="openid.mode" value="checkid_setup">'
+                '<input type="hidden" name="nonce" value="fakenonce">'
+                '<input type="submit" id="imageLogin">'
+                '</form></body></html>'
+            ),
+            content_type='text/html',
+        )
+
+    @staticmethod
+    async def openid_login(request: web.Request) -> web.Response:
+        return web.Response(
+            text='<html><body><a class="nav__avatar-outer-wrap" href="/user/fakeuser"></a></body></html>',
+            content_type='text/html',
+        )
+
+    @staticmethod
+    async def steamgifts_settings(request: web.Request) -> web.Response:
+        return web.Response(
+            text=(
+                '<html><body><form method="post">'
+                '<input type="hidden" name="xsrf_token" value="fakexsrf">'
+                '<input type="hidden" name="filter_giveaways_level" value="0">'
+                '</form></body></html>'
+            ),
+            content_type='text/html',
+        )
+
+    async def giveaways_search(self, request: web.Request) -> web.Response:
+        point_min = int(request.query.get('point_min', 0))
+        point_max = int(request.query.get('point_max', 50))
+        rows = []
+
+        for giveaway in self.data.giveaways:
+            if not point_min <= giveaway.points <= point_max:
+                continue
+
+            faded = '<div class="is-faded"></div>' if giveaway.entered else ''
+            copies = f'<span class="giveaway__heading__thin">({giveaway.copies} Copies)</span>'
+
+            rows.append(
+                '<div class="giveaway__row-outer-wrap">'
+                f'{faded}'
+                f'<a class="giveaway__heading__name" href="/giveaway/{giveaway.code}/game">'
+                f'{html.escape(giveaway.name)}</a>'
+                f'{copies if giveaway.copies > 1 else ""}'
+                f'<span class="giveaway__heading__thin">({giveaway.points}P)</span>'
+                f'<div class="giveaway__column--contributor-level">Level {giveaway.level}+</div>'
+                '</div>'
+            )
+
+        return web.Response(
+            text=(
+                '<html><body>'
+                f'<span class="nav__points">{self.data.points}</span><span>Level {self.data.level}</span>'
+                '<div class="widget-container"><div class="page__heading"></div>'
+                f"{''.join(rows)}"
+                '</div></body></html>'
+            ),
+            content_type='text/html',
+        )
+
+    async def giveaway(self, request: web.Request) -> web.Response:
+        code = request.match_info['code']
+        giveaway = next((item for item in self.data.giveaways if item.code == code), None)
+        form = ''
+
+        if giveaway and not giveaway.entered:
+            form = (
+                '<form>'
+                '<input type="hidden" name="xsrf_token" value="fakexsrf">'
+                f'<input type="hidden" name="code" value="{code}">'
+                '</form>'
+            )
+
+        return web.Response(
+            text=(
+                '<html><body><a class="nav__avatar-outer-wrap" href="/user/fakeuser"></a>'
+                f'<div class="sidebar">{form}</div>'
+                '</body></html>'
+            ),
+            content_type='text/html',
+        )
+
+    async def giveaway_join(self, request: web.Request) -> web.Response:
+        form = await request.post()
+        code = str(form['code'])
+        giveaway = next((item for item in self.data.giveaways if item.code == code), None)
+
+        if not giveaway or giveaway.entered:
+            return web.json_response({'type': 'error', 'msg': 'Previously Won'})
+
+        if giveaway.points > self.data.points:
+            return web.json_response({'type': 'error', 'msg': 'Not Enough Points'})
+
+        giveaway.entered = True
+        self.data.points -= giveaway.points
+
+        return web.json_response({'type': 'success', 'entry_count': '1', 'points': str(self.data.points)})
@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import asyncio
+import selectors
+from typing import Any, Coroutine, TypeVar
+
+_T = TypeVar('_T')
+
+
+class VirtualTimeLoop(asyncio.SelectorEventLoop):
+    """Event loop that skips idle waits
+
+    When nothing is ready to run and no I/O arrives within `io_grace`
+    seconds, the clock jumps to the next scheduled timer, so sleeps and
+    timeouts finish immediately. `wakeups` counts loop iterations.
+    """
+
+    def __init__(self, skip_idle: bool = True, io_grace: float = 0.0) -> None:
+        super().__init__(selectors.DefaultSelector())
+        self.skip_idle = skip_idle
+        self.io_grace = io_grace
+        self.offset = 0.0
+        self.wakeups = 0
+
+    def time(self) -> float:
+        return super().time() + self.offset
+
+    def _run_once(self) -> None:
+        self.wakeups += 1
+
+        # noinspection PyUnresolvedReferences
+        if self.skip_idle and not self._ready and not self._stopping:  # type: ignore[attr-defined]
+            next_timer = min(
+                (handle.when() for handle in self._scheduled if not handle.cancelled()),  # type: ignore[attr-defined]
+                default=None,
+            )
+
+            if next_timer is not None:
+                delay = next_timer - self.time()
+
+                if delay > self.io_grace:
+                    event_list = self._selector.select(self.io_grace)  # type: ignore[attr-defined]
+
+                    if event_list:
+                        self._process_events(event_list)  # type: ignore[attr-defined]
+                    else:
+                        self.offset += delay
+
+        super()._run_once()  # type: ignore[misc]
+
+
+def run(coro: Coroutine[Any, Any, _T], loop: VirtualTimeLoop | None = None) -> _T:
+    if not loop:
+        loop = VirtualTimeLoop()
+
+    asyncio.set_event_loop(loop)
+
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(loop.shutdown_asyncgens())
+            loop.run_until_complete(loop.shutdown_default_executor())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
@@ -0,0 +1,198 @@
+#!/usr/bin/env python
+#
+# Lara Maia <dev@lara.monster> 2015 ~ 2024
+#
+# The Steam Tools NG is free software: you can redistribute it and/or
+# modify it under the terms of the GNU General Public License as
+# published by the Free Software Foundation, either version 3 of
+# the License, or (at your option) any later version.
+#
+# The Steam Tools NG is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+# See the GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program. If not, see http://www.gnu.org/licenses/.
+#
+import asyncio
+import contextlib
+import functools
+import inspect
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, TextIO, TypeVar, cast
+
+from . import config, i18n, profiling
+
+log = logging.getLogger(__name__)
+_ = i18n.get_translation
+
+_Session = TypeVar('_Session')
+
+
+class Tracer:
+    """Writes spans in the chrome trace event format (viewable in Perfetto)
+
+    Each task has its own track, so spans of concurrent calls are shown side by side.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.pid = os.getpid()
+        self._file: TextIO | None = path.open('w', encoding='utf-8')
+        self._file.write('[\n')
+        self._first_event = True
+        self._tracks: weakref.WeakKeyDictionary[asyncio.Task[Any], int] = weakref.WeakKeyDictionary()
+        self._track_ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def now() -> float:
+        try:
+            # the loop clock, so waits line up with the time the modules see
+            return asyncio.get_running_loop().time()
+        except RuntimeError:
+            return time.monotonic()
+
+    def track(self) -> int:
+        task = asyncio.current_task()
+
+        if not task:
+            return threading.get_ident()
+
+        try:
+            return self._tracks[task]
+        except KeyError:
+            track = self._tracks[task] = next(self._track_ids)
+
+        module = profiling.current_module.get()
+        name = f"{module}: {task.get_name()}" if module else task.get_name()
+        self.add_event({'ph': 'M', 'name': 'thread_name', 'tid': track, 'args': {'name': name}})
+
+        return track
+
+    def add_event(self, event: Dict[str, Any]) -> None:
+        event['pid'] = self.pid
+        data = json.dumps(event, default=str)
+
+        with self._lock:
+            if not self._file:
+                return
+
+            if not self._first_event:
+                self._file.write(',\n')
+
+            self._file.write(data)
+            self._first_event = False
+
+    def add_span(self, name: str, category: str, start: float, end: float, args: Dict[str, Any]) -> None:
+        self.add_event({
+            'ph': 'X',
+            'name': name,
+            'cat': category,
+            'ts': round(start * 1_000_000),
+            'dur': round((end - start) * 1_000_000),
+            'tid': self.track(),
+            'args': args,
+        })
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file:
+                self._file.write('\n]\n')
+                self._file.close()
+                self._file = None
+
+
+tracer: Tracer | None = None
+
+
+def start(directory: Path | None = None) -> Tracer:
+    global tracer
+
+    if tracer:
+        return tracer
+
+    if not directory:
+        directory = Path(config.parser.get("logger", "log_directory"))
+
+    tracer = Tracer(directory / f"steam-tools-ng-trace-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    log.info(_("Tracing spans to %s"), tracer.path)
+
+    return tracer
+
+
+def stop() -> None:
+    global tracer
+
+    if tracer:
+        tracer.close()
+        tracer = None
+
+
+def set_enabled(enabled: bool) -> None:
+    if enabled:
+        start()
+    else:
+        stop()
+
+
+@contextlib.contextmanager
+def span(name: str, category: str = 'stng', **args: Any) -> Iterator[None]:
+    if not tracer:
+        yield
+        return
+
+    start_time = tracer.now()
+
+    try:
+        yield
+    except Exception as exception:
+        args['error'] = type(exception).__name__
+        raise
+    finally:
+        # tracing can be disabled while the span is open
+        if tracer:
+            tracer.add_span(name, category, start_time, tracer.now(), args)
+
+
+class TracedSession:
+    """Proxy of a stlib session that traces each call of its coroutine methods"""
+
+    __slots__ = ('_session',)
+
+    def __init__(self, session: Any) -> None:
+        self._session = session
+
+    def __getattr__(self, name: str) -> Any:
+        attribute = getattr(self._session, name)
+
+        if not tracer or not inspect.iscoroutinefunction(attribute):
+            return attribute
+
+        span_name = f"{type(self._session).__name__}.{name}"
+
+        @functools.wraps(attribute)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            # ids and appids only, other values can be secrets
+            span_args = {
+                **{f'arg{index}': value for index, value in enumerate(args) if isinstance(value, int)},
+                **{key: value for key, value in kwargs.items() if isinstance(value, int)},
+            }
+
+            with span(span_name, 'stlib', **span_args):
+                return await attribute(*args, **kwargs)
+
+        return wrapper
+
+
+def traced(session: _Session) -> _Session:
+    return cast(_Session, TracedSession(session))
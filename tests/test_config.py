@@ -0,0 +1,40 @@
+import configparser
+from pathlib import Path
+
+import pytest
+
+from steam_tools_ng import config
+
+
+@pytest.fixture
+def main_parser(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> configparser.RawConfigParser:
+    parser = configparser.RawConfigParser()
+    parser.read_dict(config.default_config)
+    monkeypatch.setattr(config, 'parser', parser)
+    monkeypatch.setattr(config, 'profiles_directory', tmp_path / 'profiles')
+    monkeypatch.setattr(config, 'profiles', {0: ('', parser, tmp_path / 'main.config', tmp_path / 'cookiejar')})
+    monkeypatch.setattr(config, 'profile_options', {0: parser})
+    return parser
+
+
+def test_profile_saves_own_options_only(main_parser: configparser.RawConfigParser, tmp_path: Path) -> None:
+    session_index = config.load_profile('account2')
+    config.new('login', 'account_name', 'account2', session_index=session_index)
+
+    saved = configparser.RawConfigParser()
+    saved.read(tmp_path / 'profiles' / 'account2' / config.config_file_name)
+    assert saved.sections() == ['login']
+    assert saved.get('login', 'account_name') == 'account2'
+
+    # main config changes still reach the profile, but not the options it owns
+    config.new('steamgifts', 'minimum_points', 1234)
+    config.new('login', 'account_name', 'main')
+    profile_parser = config.get_parser(session_index)
+    assert profile_parser.get('steamgifts', 'minimum_points') == '1234'
+    assert profile_parser.get('login', 'account_name') == 'account2'
+
+    # and when the profile is loaded again
+    config.profiles.pop(session_index)
+    session_index = config.load_profile('account2')
+    assert config.get_parser(session_index).get('steamgifts', 'minimum_points') == '1234'
+    assert config.get_parser(session_index).get('login', 'account_name') == 'account2'
@@ -0,0 +1,57 @@
+import io
+
+import pytest
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng.console import utils
+from steam_tools_ng.core.utils import ModuleData
+
+
+class FakeTerminal(io.StringIO):
+    def isatty(self) -> bool:
+        return True
+
+
+def test_one_line_per_module() -> None:
+    stream = FakeTerminal()
+    renderer = utils.ConsoleRenderer(stream)
+
+    renderer.update('[a/steamguard] 12345', 'a/steamguard')
+    renderer.paint()
+    renderer.update('[b/steamgifts] Loading', 'b/steamgifts')
+    renderer.paint()
+    renderer.update('[a/steamguard] 67890', 'a/steamguard')
+    renderer.paint()
+
+    output = stream.getvalue()
+    # both modules stay on screen, and the cursor goes back to the first line
+    assert output.count('\033[1A') == 2
+    assert 'Loading' in output
+    # only the changed part of the first line is written, and the second one is skipped
+    assert output.endswith('\r\033[15C67890\n\r\033[1A')
+
+    renderer.remove('b/steamgifts')
+    assert stream.getvalue().endswith('\033[J\r')
+
+
+def test_pipe_prints_status_changes_only(capsys: pytest.CaptureFixture[str]) -> None:
+    for module in ['cardfarming', 'steamgifts']:
+        utils.set_console(ModuleData(status='Running', info='Waiting'), module=module)
+
+    for past_time in range(5):
+        for module in ['cardfarming', 'steamgifts']:
+            module_data = ModuleData(
+                status='Running',
+                info=f'Waiting ({5 - past_time}s)',
+                level=(past_time, 5),
+                suppress_logging=True,
+            )
+            utils.set_console(module_data, module=module)
+
+    utils.set_console(ModuleData(status='Done'), module='cardfarming')
+
+    assert capsys.readouterr().out.splitlines() == [
+        '[cardfarming] Running Waiting',
+        '[steamgifts] Running Waiting',
+        '[cardfarming] Done',
+    ]
@@ -0,0 +1,119 @@
+import asyncio
+import os
+import signal
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng.core import executor_pool
+from steam_tools_ng.testing import fake_steam
+
+
+class Executor(ProcessPoolExecutor):
+    def __init__(self, appid: int) -> None:
+        super().__init__(max_workers=1)
+        self.appid = appid
+        # starts the worker process
+        self.submit(os.getpid).result()
+
+
+def is_stopped(pid: int) -> bool:
+    # signals are delivered asynchronously
+    for _ in range(100):
+        if Path('/proc', str(pid), 'stat').read_text().rpartition(')')[2].split()[0] == 'T':
+            return True
+
+        time.sleep(0.01)
+
+    return False
+
+
+def test_pause_suspends_processes() -> None:
+    executor = Executor(480)
+    pid = executor_pool.worker_pids(executor)[0]
+
+    async def main() -> None:
+        await executor_pool.pause(executor)
+        await executor_pool.pause(executor)
+        assert is_stopped(pid)
+
+        executor_pool.resume(executor)
+        executor_pool.resume(executor)
+        assert executor.submit(os.getpid).result(timeout=5) == pid
+
+        await executor_pool.pause(executor)
+        executor_pool.wake(executor)
+
+    try:
+        asyncio.run(main())
+    finally:
+        os.kill(pid, signal.SIGCONT)
+        executor.shutdown()
+
+
+def test_pause_fallbacks_to_shutdown() -> None:
+    executor = fake_steam.FakeSteamAPIExecutor(480)
+
+    async def main() -> None:
+        await executor_pool.pause(executor)
+        assert not executor.is_running()
+
+        executor_pool.resume(executor)
+        assert executor.is_running()
+
+    asyncio.run(main())
+
+
+def test_registry_shutdown_kills_stragglers() -> None:
+    registry = executor_pool.ExecutorRegistry()
+    executors = [Executor(appid) for appid in range(3)]
+
+    for executor in executors:
+        registry[executor.appid] = executor
+
+    registry.discard(0)
+    executors[0].shutdown()
+    assert list(registry) == [1, 2]
+
+    # hangs until killed
+    hung = executors[2].submit(time.sleep, 60)
+    start = time.monotonic()
+    stragglers = registry.shutdown(timeout=0.5)
+
+    assert stragglers == [executors[2]]
+    assert time.monotonic() - start < 2
+    assert not len(registry)
+    assert hung.exception(timeout=5)
+
+
+def test_pool_adapts_to_budgets() -> None:
+    pool = executor_pool.ExecutorPool(50, memory_budget=200 * 1024 * 1024, cpu_budget=1)
+    assert pool.concurrency == 1
+
+    fake_steam.FakeSteamAPIProcessExecutor.cpu_usage = 0.5
+    executors = [fake_steam.FakeSteamAPIProcessExecutor(appid) for appid in range(2)]
+
+    try:
+        pool.sample(executors)
+        time.sleep(0.5)
+        pool.sample(executors)
+    finally:
+        fake_steam.FakeSteamAPIProcessExecutor.cpu_usage = 0.0
+
+        for executor in executors:
+            executor.shutdown()
+
+    assert pool.memory_per_executor >= fake_steam.FakeSteamAPIProcessExecutor.memory
+    assert 0.25 < pool.cpu_per_executor < 0.75
+    assert pool.concurrency == min(int(pool.memory_budget // pool.memory_per_executor), int(1 / pool.cpu_per_executor))
+
+    for _ in range(pool.concurrency):
+        assert not pool.locked()
+        pool.acquire()
+
+    assert pool.locked()
+    pool.release()
+    assert not pool.locked()
+
+    assert executor_pool.ExecutorPool(50).concurrency == 50
@@ -0,0 +1,185 @@
+import asyncio
+import contextlib
+import itertools
+import site
+from pathlib import Path
+from typing import Any, Awaitable, Callable
+
+import aiohttp
+import pytest
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng.testing import fake_steam
+
+stlib = pytest.importorskip('stlib')
+
+from stlib import community, internals, plugins, universe, webapi  # noqa: E402
+
+steamid = universe.generate_steamid(76561198000000000)
+
+# stlib keeps sessions in a global cache, so each test uses its own index
+session_indexes = itertools.count(100)
+
+
+def run(coro_function: Callable[..., Awaitable[Any]], **kwargs: Any) -> Any:
+    async def main() -> Any:
+        async with fake_steam.FakeSteam(**kwargs) as server:
+            session_index = next(session_indexes)
+            await stlib.set_default_http_params(session_index, **server.http_params())
+
+            try:
+                return await coro_function(server, session_index)
+            finally:
+                # the shared http session is closed by the first one
+                for module in (community.Community, webapi.SteamWebAPI, internals.Internals):
+                    with contextlib.suppress(KeyError):
+                        await module.destroy_session(session_index, no_fail=True)
+
+    return asyncio.run(main())
+
+
+def test_owned_games_and_badges() -> None:
+    async def check(server: fake_steam.FakeSteam, session_index: int) -> None:
+        webapi_session = await webapi.SteamWebAPI.new_session(session_index, **server.session_kwargs('webapi'))
+        community_session = await community.Community.new_session(session_index, **server.session_kwargs('community'))
+
+        games = await webapi_session.get_owned_games(steamid)
+        assert [game.appid for game in games] == [game.appid for game in server.data.games]
+
+        filtered = await webapi_session.get_owned_games(steamid, appids_filter=[games[1].appid])
+        assert [game.appid for game in filtered] == [games[1].appid]
+
+        badges = await community_session.get_badges(steamid)
+        expected = {game.appid: game.cards for game in server.data.games if game.cards}
+        assert {badge.appid: badge.cards for badge in badges} == expected
+
+        appid, cards = next(iter(expected.items()))
+        assert await community_session.get_card_drops_remaining(steamid, appid) == cards
+        assert await community_session.get_card_drops_remaining(steamid, appid) == cards - 1
+
+    run(check)
+
+
+def test_coupons_inventory_and_packages() -> None:
+    async def check(server: fake_steam.FakeSteam, session_index: int) -> None:
+        community_session = await community.Community.new_session(session_index, **server.session_kwargs('community'))
+        internals_session = await internals.Internals.new_session(session_index, **server.session_kwargs('internals'))
+
+        inventory = await community_session.get_inventory(steamid, 753, 3)
+        assert len(inventory) == len(server.data.inventories[(753, 3)])
+
+        packageid = int(inventory[0].actions[0]['link'].split('=')[1])
+        package = await internals_session.get_package(packageid)
+        assert package.price == server.data.packages[packageid].price / 100
+
+        with pytest.raises(ValueError):
+            await internals_session.get_package(1)
+
+    run(check)
+
+
+def test_market_orders() -> None:
+    async def check(server: fake_steam.FakeSteam, session_index: int) -> None:
+        community_session = await community.Community.new_session(session_index, **server.session_kwargs('community'))
+
+        sell_orders, buy_orders = await community_session.get_my_orders()
+        assert len(sell_orders) + len(buy_orders) == len(server.data.orders)
+
+        histogram = await community_session.get_item_histogram(sell_orders[0].appid, sell_orders[0].hash_name)
+        assert histogram.sell_order_table
+        assert histogram.buy_order_table
+
+        await community_session.cancel_buy_order(buy_orders[0].orderid)
+        assert len(server.data.orders) == len(sell_orders) + len(buy_orders) - 1
+
+        with pytest.raises(community.MarketError):
+            await community_session.cancel_buy_order(buy_orders[0].orderid)
+
+    run(check)
+
+
+def test_confirmations_and_trade_offers() -> None:
+    async def check(server: fake_steam.FakeSteam, session_index: int) -> None:
+        community_session = await community.Community.new_session(session_index, **server.session_kwargs('community'))
+        identity_secret = 'cnOgv/KdpLtgdqBSA5K5N9ZgVF8='
+
+        confirmations = await community_session.get_confirmations(identity_secret, steamid, 'android:fake')
+        assert [confirmation.give[0] for confirmation in confirmations] == [
+            f"{confirmation.name} - Trading Card" for confirmation in server.data.confirmations
+        ]
+
+        first = confirmations[0]
+        response = await community_session.send_confirmation(
+            identity_secret, steamid, 'android:fake', first.id, first.nonce, 'allow',
+        )
+        assert response['success']
+        assert len(server.data.confirmations) == len(confirmations) - 1
+
+        response = await community_session.send_trade_offer(steamid, 'token', 3, [(753, 1, 1)], [])
+        assert server.data.trade_offers[0]['tradeofferid'] == response['tradeofferid']
+
+    run(check)
+
+
+def test_steamgifts() -> None:
+    # it can only be changed before the first use
+    with contextlib.suppress(RuntimeError):
+        plugins.add_search_paths(*[str(Path(site_, 'stlib-plugins')) for site_ in site.getsitepackages()])
+
+    if not plugins.has_plugin('steamgifts'):
+        pytest.skip('steamgifts plugin is not installed')
+
+    steamgifts = plugins.get_plugin('steamgifts')
+
+    async def check(server: fake_steam.FakeSteam, session_index: int) -> None:
+        session = await steamgifts.Main.new_session(session_index, **server.session_kwargs('steamgifts'))
+
+        assert (await session.do_login())['nickname'] == 'fakeuser'
+        await session.configure()
+
+        giveaways = await session.get_giveaways('main', return_unavailable=True)
+        assert [giveaway.id for giveaway in giveaways] == [giveaway.code for giveaway in server.data.giveaways]
+        assert session.user_info == (server.data.points, server.data.level)
+
+        giveaway = next(giveaway for giveaway in giveaways if giveaway.level <= server.data.level)
+        assert await session.join(giveaway)
+        assert server.data.points == session.user_info.points
+
+        with pytest.raises(steamgifts.GiveawayEndedError):
+            await session.join(giveaway)
+
+    run(check)
+
+
+def test_rate_limit_and_errors() -> None:
+    async def check(server: fake_steam.FakeSteam, session_index: int) -> None:
+        async with aiohttp.ClientSession() as http_session:
+            url = server.base_url('/api/ISteamWebAPIUtil/GetServerInfo/v1')
+            statuses = []
+
+            for _ in range(5):
+                async with http_session.get(url) as response:
+                    statuses.append(response.status)
+
+        assert statuses == [200, 200, 200, 429, 429]
+        assert server.total_requests == 5
+        assert sum(server.errors.values()) == 2
+
+        server.rate_limit = 0
+        server.error_rate = 1
+
+        async with aiohttp.ClientSession() as http_session:
+            async with http_session.get(url) as response:
+                assert response.status == 500
+
+    run(check, rate_limit=3)
+
+
+def test_latency() -> None:
+    async def check(server: fake_steam.FakeSteam, session_index: int) -> float:
+        webapi_session = await webapi.SteamWebAPI.new_session(session_index, **server.session_kwargs('webapi'))
+        start = asyncio.get_running_loop().time()
+        await webapi_session.get_server_time()
+        return asyncio.get_running_loop().time() - start
+
+    assert run(check, latency=0.2) >= 0.2
@@ -0,0 +1,172 @@
+import gzip
+import logging
+import os
+import time
+from pathlib import Path
+from typing import List
+
+import pytest
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng import logger_handlers
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self, delay: float = 0) -> None:
+        super().__init__()
+        self.delay = delay
+        self.records: List[logging.LogRecord] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        time.sleep(self.delay)
+        self.records.append(record)
+
+
+def new_record(message: str, *args: object) -> logging.LogRecord:
+    return logging.LogRecord('test', logging.INFO, __file__, 0, message, args, None)
+
+
+def test_queue_overflow_is_counted() -> None:
+    handler = logger_handlers.BoundedQueueHandler(2)
+
+    for index in range(5):
+        handler.handle(new_record('message %d', index))
+
+    assert handler.queue.qsize() == 2
+    assert handler.dropped == 3
+    assert handler.total_dropped == 3
+
+    # the next record that fits is preceded by the dropped count
+    handler.queue.get_nowait()
+    handler.queue.get_nowait()
+    handler.handle(new_record('message %d', 5))
+
+    dropped_record = handler.queue.get_nowait()
+    assert dropped_record.getMessage() == 'Log queue is full. 3 messages has been dropped'
+    assert handler.queue.get_nowait().getMessage() == 'message 5'
+    assert handler.dropped == 0
+    assert handler.total_dropped == 3
+
+
+def test_prepare_keeps_the_raw_record() -> None:
+    handler = logger_handlers.BoundedQueueHandler()
+    handler.setFormatter(logging.Formatter('formatted: %(message)s'))
+    record = new_record('message %s', 'argument')
+
+    prepared = handler.prepare(record)
+
+    # formatting is left to the listener handlers
+    assert prepared is record
+    assert prepared.msg == 'message %s'
+    assert prepared.args == ('argument',)
+
+
+def test_listener_drains_the_queue_on_stop() -> None:
+    handler = logger_handlers.BoundedQueueHandler(10)
+    collector = CollectingHandler(delay=0.001)
+    listener = logger_handlers.BlockingQueueListener(handler.queue, collector)
+
+    # the sentinel must wait for a free slot in a full queue
+    for index in range(10):
+        handler.handle(new_record('message %d', index))
+
+    listener.start()
+    listener.stop()
+
+    assert [record.getMessage() for record in collector.records] == [f'message {index}' for index in range(10)]
+    assert handler.queue.empty()
+
+
+def test_shutdown_logger_writes_dropped_count(monkeypatch: pytest.MonkeyPatch) -> None:
+    handler = logger_handlers.BoundedQueueHandler(1)
+    file_handler = CollectingHandler(delay=0.01)
+    listener = logger_handlers.BlockingQueueListener(handler.queue, file_handler)
+
+    monkeypatch.setattr(logging.root, 'handlers', [handler])
+    monkeypatch.setattr(config, 'log_queue_handler', handler)
+    monkeypatch.setattr(config, 'log_listener', listener)
+
+    for index in range(3):
+        handler.handle(new_record('message %d', index))
+
+    listener.start()
+    config.shutdown_logger()
+
+    messages = [record.getMessage() for record in file_handler.records]
+    assert messages[-1] == '2 log messages has been dropped'
+    assert 'Log queue is full. 2 messages has been dropped' in messages
+    assert handler not in logging.root.handlers
+
+
+def rotating_handler(tmp_path: Path, **kwargs: object) -> logger_handlers.SizedTimedRotatingFileHandler:
+    handler = logger_handlers.SizedTimedRotatingFileHandler(tmp_path / 'test.log', encoding='utf-8', **kwargs)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    return handler
+
+
+def log_names(tmp_path: Path) -> List[str]:
+    return sorted(log_file.name for log_file in tmp_path.iterdir())
+
+
+def test_rotation_by_size(tmp_path: Path) -> None:
+    handler = rotating_handler(tmp_path, max_bytes=100, backup_count=2)
+
+    for index in range(10):
+        handler.handle(new_record('%s', str(index) * 40))
+
+    handler.close()
+
+    assert log_names(tmp_path) == ['test.log', 'test.log.1', 'test.log.2']
+    # two 41 bytes records fit in each file
+    assert (tmp_path / 'test.log').read_text() == '8' * 40 + '\n' + '9' * 40 + '\n'
+    assert (tmp_path / 'test.log.1').read_text() == '6' * 40 + '\n' + '7' * 40 + '\n'
+
+
+def test_rotation_by_age(tmp_path: Path) -> None:
+    log_file = tmp_path / 'test.log'
+    log_file.write_text('old run\n')
+    an_hour_ago = time.time() - 3600
+    os.utime(log_file, (an_hour_ago, an_hour_ago))
+
+    # the age of an existing log file is taken from its modification time
+    handler = rotating_handler(tmp_path, interval=60, backup_count=1)
+    handler.handle(new_record('new run'))
+    handler.handle(new_record('same interval'))
+    handler.close()
+
+    assert log_names(tmp_path) == ['test.log', 'test.log.1']
+    assert (tmp_path / 'test.log.1').read_text() == 'old run\n'
+    assert (tmp_path / 'test.log').read_text() == 'new run\nsame interval\n'
+    assert handler.rollover_at > time.time()
+
+
+def test_backups_are_compressed(tmp_path: Path) -> None:
+    handler = rotating_handler(tmp_path, max_bytes=100, backup_count=2, compress=True)
+
+    for index in range(5):
+        handler.handle(new_record('%s', str(index) * 60))
+
+    # waits for the compressor thread
+    handler.close()
+
+    assert log_names(tmp_path) == ['test.log', 'test.log.1.gz', 'test.log.2.gz']
+
+    with gzip.open(tmp_path / 'test.log.1.gz', 'rt') as backup:
+        assert backup.read() == '3' * 60 + '\n'
+
+
+def test_prune_keeps_directory_size(tmp_path: Path) -> None:
+    handler = rotating_handler(tmp_path, backup_count=5, max_directory_size=250)
+    handler.handle(new_record('%s', 'x' * 99))
+    now = time.time()
+
+    for index in range(1, 4):
+        backup = tmp_path / f'test.log.{index}'
+        backup.write_text('y' * 100)
+        os.utime(backup, (now - index * 60, now - index * 60))
+
+    handler.prune()
+    handler.close()
+
+    # the oldest backups are removed first and the current log is never removed
+    assert log_names(tmp_path) == ['test.log', 'test.log.1']
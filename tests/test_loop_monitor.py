@@ -0,0 +1,56 @@
+import asyncio
+import logging
+import time
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng import loop_monitor
+
+
+def block(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+async def blocking_coroutine() -> None:
+    block(0.06)
+
+
+def test_lag_is_sampled() -> None:
+    async def main() -> loop_monitor.LoopMonitor:
+        monitor = loop_monitor.LoopMonitor(interval=0.01)
+        monitor.start()
+        await asyncio.sleep(0.05)
+
+        asyncio.get_running_loop().call_soon(block, 0.1)
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+        return monitor
+
+    monitor = asyncio.run(main())
+
+    assert monitor.max_lag >= 0.08
+    assert monitor.percentiles()['max'] == monitor.max_lag
+    assert 'p99' in monitor.report()
+    assert 'Slow callbacks' not in monitor.report()
+
+
+def test_slow_callbacks_are_recorded() -> None:
+    async def main() -> loop_monitor.LoopMonitor:
+        monitor = loop_monitor.LoopMonitor(interval=0.01, slow_callback_duration=0.05)
+        monitor.start(debug_hooks=True)
+
+        asyncio.get_running_loop().call_soon(block, 0.06)
+        await asyncio.create_task(blocking_coroutine())
+        await asyncio.sleep(0.05)
+
+        monitor.stop()
+        return monitor
+
+    monitor = asyncio.run(main())
+    callbacks = {callback.name: callback for callback in monitor.slow_callbacks.values()}
+
+    assert set(callbacks) == {'block', 'blocking_coroutine'}
+    assert all(callback.location.startswith(__file__) for callback in callbacks.values())
+    assert callbacks['block'].max_time >= 0.05
+    assert 'blocking_coroutine' in monitor.report()
+    assert not logging.getLogger('asyncio').filters
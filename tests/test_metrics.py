@@ -0,0 +1,146 @@
+import asyncio
+import configparser
+from pathlib import Path
+from typing import List
+
+import aiohttp
+import pytest
+import stlib
+from stlib import webapi
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng import metrics
+from steam_tools_ng.core import steamguard, utils
+from steam_tools_ng.testing import fake_steam, virtual_time
+
+
+def test_render() -> None:
+    registry = metrics.Registry()
+    requests = registry.counter('test_requests_total', 'Requests "made"', ['host'])
+    running = registry.gauge('test_running', 'Running games')
+    latency = registry.histogram('test_latency_seconds', 'Latency', buckets=[0.1, 1])
+
+    requests.inc(host='a')
+    requests.inc(2, host='b\n')
+    running.set(3)
+    running.dec()
+    latency.observe(0.05)
+    latency.observe(0.5)
+    latency.observe(5)
+
+    assert registry.render() == (
+        '# HELP test_requests_total Requests \\"made\\"\n'
+        '# TYPE test_requests_total counter\n'
+        'test_requests_total{host="a"} 1\n'
+        'test_requests_total{host="b\\n"} 2\n'
+        '# HELP test_running Running games\n'
+        '# TYPE test_running gauge\n'
+        'test_running 2\n'
+        '# HELP test_latency_seconds Latency\n'
+        '# TYPE test_latency_seconds histogram\n'
+        'test_latency_seconds_bucket{le="0.1"} 1\n'
+        'test_latency_seconds_bucket{le="1"} 2\n'
+        'test_latency_seconds_bucket{le="+Inf"} 3\n'
+        'test_latency_seconds_sum 5.55\n'
+        'test_latency_seconds_count 3\n'
+    )
+
+
+def test_registry_errors() -> None:
+    registry = metrics.Registry()
+    requests = registry.counter('test_total', 'Test', ['host'])
+
+    assert registry.counter('test_total', 'Test', ['host']) is requests
+
+    with pytest.raises(ValueError):
+        registry.gauge('test_total', 'Test')
+
+    with pytest.raises(ValueError):
+        requests.inc(method='GET')
+
+    with pytest.raises(ValueError):
+        requests.inc(-1, host='a')
+
+
+def test_module_errors(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    session_index = 300
+    parser = configparser.RawConfigParser()
+    parser.read_dict(config.default_config)
+    monkeypatch.setitem(config.profiles, session_index, ('metrics', parser, tmp_path / 'config', tmp_path / 'cookiejar'))
+    # server time comes from the WebAPI, and the shared secret is empty
+    monkeypatch.setattr(stlib, 'steamworks_available', False)
+
+    async def main() -> List[utils.ModuleData]:
+        async with fake_steam.FakeSteam() as server:
+            await stlib.set_default_http_params(session_index, **server.http_params())
+            await webapi.SteamWebAPI.new_session(session_index, api_key='key', **server.session_kwargs('webapi'))
+
+            try:
+                return [data async for data in steamguard.main(session_index)]
+            finally:
+                await webapi.SteamWebAPI.destroy_session(session_index, no_fail=True)
+
+    before = metrics.module_errors.value(module='steamguard')
+    updates = virtual_time.run(main())
+
+    assert [data.error for data in updates if data.error] == [
+        'Steam is not running.',
+        'The current shared secret is invalid.',
+    ]
+    # the WebAPI fallback is an expected state, not a failure
+    assert metrics.module_errors.value(module='steamguard') == before + 1
+
+    # data created outside the core modules isn't counted
+    utils.ModuleData(error='Check your connection')
+    assert metrics.module_errors.value(module='steamguard') == before + 1
+
+
+def test_http_endpoint_and_trace() -> None:
+    async def main() -> str:
+        server = await metrics.start_server('127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+
+        async with fake_steam.FakeSteam() as steam, server:
+            async with aiohttp.ClientSession(trace_configs=[metrics.http_trace_config()]) as http_session:
+                async with http_session.get(steam.base_url('/api/ISteamWebAPIUtil/GetServerInfo/v1')):
+                    pass
+
+            # untraced, so the metrics requests are not counted
+            async with aiohttp.ClientSession() as http_session:
+                async with http_session.get(f'http://127.0.0.1:{port}/nothing') as response:
+                    assert response.status == 404
+
+                async with http_session.get(f'http://127.0.0.1:{port}/metrics') as response:
+                    assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+                    return await response.text()
+
+    before = metrics.http_requests.value(host='127.0.0.1', method='GET', status='200')
+    text = asyncio.run(main())
+
+    assert metrics.http_requests.value(host='127.0.0.1', method='GET', status='200') == before + 1
+    assert f'stng_http_requests_total{{host="127.0.0.1",method="GET",status="200"}} {before + 1}' in text
+    assert 'stng_http_request_duration_seconds_count{host="127.0.0.1"}' in text
+
+
+def test_dump(tmp_path: Path) -> None:
+    dump_file = tmp_path / 'stng.prom'
+    writes = []
+
+    async def main() -> None:
+        task = asyncio.create_task(metrics.dump(dump_file, 60))
+
+        for _ in range(3):
+            await asyncio.sleep(60)
+            writes.append(dump_file.stat().st_mtime_ns)
+            metrics.module_errors.inc(module='test_dump')
+
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    virtual_time.run(main())
+
+    assert len(writes) == 3
+    assert 'stng_module_errors_total{module="test_dump"} 3' in dump_file.read_text()
+    assert list(tmp_path.iterdir()) == [dump_file]
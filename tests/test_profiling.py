@@ -0,0 +1,68 @@
+import asyncio
+import pstats
+import time
+from pathlib import Path
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng import profiling
+
+
+def busy(seconds: float) -> None:
+    end = time.thread_time() + seconds
+    while time.thread_time() < end:
+        pass
+
+
+async def module(name: str, seconds: float, awaits: int) -> None:
+    profiling.current_module.set(name)
+
+    for _ in range(awaits):
+        busy(seconds / awaits)
+        await asyncio.sleep(0)
+
+    # helper tasks are accounted to the module that created them
+    await asyncio.create_task(asyncio.sleep(0.01))
+
+
+def test_modules_are_accounted(tmp_path: Path) -> None:
+    profiler = profiling.Profiler(cprofile=True)
+
+    async def main() -> None:
+        profiler.start()
+        await asyncio.gather(module('cardfarming', 0.1, 5), module('market', 0.01, 20))
+        profiler.stop()
+
+    asyncio.run(main())
+    cardfarming = profiler.modules['cardfarming']
+    market = profiler.modules['market']
+
+    assert cardfarming.cpu_time >= 0.1 > market.cpu_time
+    assert cardfarming.wall_time >= cardfarming.cpu_time * 0.9
+    assert cardfarming.awaits == 5 + 2
+    assert market.awaits == 20 + 2
+    assert market.await_time >= 0.01
+
+    report_file = profiler.write(tmp_path)
+    report = report_file.read_text()
+
+    assert report.index('cardfarming') < report.index('market')
+    assert pstats.Stats(str(report_file.with_suffix('.prof'))).total_calls
+
+
+def test_stop_restores_task_factory() -> None:
+    async def main() -> None:
+        loop = asyncio.get_running_loop()
+        # only the task accounting runs by default
+        profiler = profiling.Profiler()
+        assert profiler.cprofile is None
+        profiler.start()
+
+        task = asyncio.create_task(asyncio.sleep(0))
+        assert isinstance(task.get_coro(), profiling.ProfiledCoroutine)
+        assert 'sleep' in repr(task)
+        await task
+
+        profiler.stop()
+        assert loop.get_task_factory() is None
+
+    asyncio.run(main())
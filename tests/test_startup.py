@@ -0,0 +1,77 @@
+import os
+import subprocess
+import sys
+from typing import Dict
+
+import pytest
+
+# cumulative import time budget for the cli entry point, as a fraction of the time
+# taken to import the whole console stack on the same machine (currently about 0.25)
+IMPORT_BUDGET_RATIO = float(os.getenv('STNG_IMPORT_BUDGET_RATIO', 0.5))
+
+HEAVY_MODULES = [
+    'aiohttp',
+    'bs4',
+    'stlib',
+    'steam_tools_ng.console.cli',
+    'steam_tools_ng.core.steamguard',
+    'steam_tools_ng.core.cardfarming',
+]
+
+
+def import_times(module: str) -> Dict[str, int]:
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    times = {}
+
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _self_time, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+
+    return times
+
+
+def test_heavy_modules_are_lazy() -> None:
+    times = import_times('steam_tools_ng.cli')
+
+    for module in HEAVY_MODULES:
+        assert module not in times, f'{module} is imported at startup by steam_tools_ng.cli'
+
+
+def best_import_time(*modules: str) -> int:
+    # best of three to reduce noise from a cold disk cache
+    return min(
+        sum(times[module] for module in modules)
+        for times in (import_times(', '.join(modules)) for _ in range(3))
+    )
+
+
+def test_cli_import_budget() -> None:
+    cumulative = best_import_time('steam_tools_ng.cli')
+    # config must be imported first
+    baseline = best_import_time('steam_tools_ng.config', 'steam_tools_ng.console.cli')
+    budget = int(baseline * IMPORT_BUDGET_RATIO)
+
+    assert cumulative < budget, (
+        f'steam_tools_ng.cli took {cumulative}us to import '
+        f'(budget: {budget}us, {IMPORT_BUDGET_RATIO} of the console stack)'
+    )
+
+
+def test_core_modules_are_loaded_on_demand() -> None:
+    from steam_tools_ng import config  # noqa: F401 (must be imported first)
+    from steam_tools_ng import core
+
+    assert core.utils.ModuleData
+    assert core.steamguard.main
+
+    with pytest.raises(AttributeError):
+        getattr(core, 'not_a_module')
@@ -0,0 +1,38 @@
+import asyncio
+import shutil
+import subprocess
+from pathlib import Path
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng.core import steam_process
+
+
+def test_watcher(tmp_path: Path) -> None:
+    # a process named 'steam'
+    fake_steam = tmp_path / 'steam'
+    shutil.copy(shutil.which('sleep'), fake_steam)
+    pid_file = tmp_path / 'steam.pid'
+
+    async def main() -> list[bool]:
+        changes: list[bool] = []
+        watcher = steam_process.SteamWatcher([pid_file], poll_interval=60)
+        watcher.add_listener(changes.append)
+        watcher.start()
+        assert not watcher.is_running()
+
+        process = subprocess.Popen([fake_steam, '60'])
+        pid_file.write_text(str(process.pid))
+        await asyncio.wait_for(watcher.wait_running(), 5)
+        assert watcher.pid == process.pid
+
+        process.kill()
+        await asyncio.wait_for(watcher.wait_stopped(), 5)
+        process.wait()
+
+        # left behind by a crash
+        assert pid_file.exists()
+        watcher.stop()
+
+        return changes
+
+    assert asyncio.run(main()) == [True, False]
@@ -0,0 +1,62 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng import tracing
+from steam_tools_ng.core import utils
+from steam_tools_ng.testing import virtual_time
+
+
+class Session:
+    user_info = 'fakeuser'
+
+    async def get_package(self, package_id: int, secret: str) -> int:
+        await asyncio.sleep(1)
+
+        if not package_id:
+            raise ValueError
+
+        return package_id
+
+
+def test_spans(tmp_path: Path) -> None:
+    async def wait() -> None:
+        async for _data in utils.timed_module_data(3, utils.ModuleData(info='Waiting')):
+            pass
+
+    async def main() -> None:
+        session = tracing.traced(Session())
+        assert session.user_info == 'fakeuser'
+
+        tracing.start(tmp_path)
+        assert await asyncio.gather(session.get_package(1, 'secret'), session.get_package(2, secret='secret')) == [1, 2]
+
+        with pytest.raises(ValueError):
+            await session.get_package(0, 'secret')
+
+        await asyncio.create_task(wait())
+        tracing.stop()
+
+        # calls made with tracing disabled are not wrapped
+        assert await session.get_package(3, 'secret') == 3
+
+    virtual_time.run(main())
+    trace_file = next(tmp_path.glob('steam-tools-ng-trace-*.json'))
+    events = json.loads(trace_file.read_text())
+    spans = [event for event in events if event['ph'] == 'X']
+
+    assert [(span['name'], span['cat'], round(span['dur'] / 1_000_000, 2)) for span in spans] == [
+        ('Session.get_package', 'stlib', 1),
+        ('Session.get_package', 'stlib', 1),
+        ('Session.get_package', 'stlib', 1),
+        ('Waiting', 'wait', 3),
+    ]
+    assert spans[0]['args'] == {'arg0': 1}
+    assert spans[2]['args'] == {'arg0': 0, 'error': 'ValueError'}
+    # concurrent calls are in different tracks
+    assert spans[0]['tid'] != spans[1]['tid']
+    assert abs(spans[0]['ts'] - spans[1]['ts']) < 10_000
+    assert len([event for event in events if event['ph'] == 'M']) == len({span['tid'] for span in spans})
@@ -0,0 +1,246 @@
+import asyncio
+import collections
+import configparser
+import contextlib
+import itertools
+import site
+import time
+from pathlib import Path
+from typing import AsyncGenerator, Callable, Dict, List, Tuple
+
+import pytest
+
+from steam_tools_ng import config  # noqa: F401 (must be imported first)
+from steam_tools_ng.core import utils
+from steam_tools_ng.testing import fake_steam, virtual_time
+
+stlib = pytest.importorskip('stlib')
+
+from stlib import community, internals, plugins, universe, webapi  # noqa: E402
+from steam_tools_ng.core import cardfarming, checkpoint, steam_process, steamgifts  # noqa: E402
+
+steamid = universe.generate_steamid(76561198000000000)
+
+# stlib keeps sessions in a global cache, so each test uses its own index
+session_indexes = itertools.count(200)
+
+
+@pytest.fixture
+def session_index(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> int:
+    index = next(session_indexes)
+    parser = configparser.RawConfigParser()
+    parser.read_dict(config.default_config)
+    parser.set('cardfarming', 'invisible', 'False')
+    monkeypatch.setitem(config.profiles, index, ('virtual-time', parser, tmp_path / 'config', tmp_path / 'cookiejar'))
+    # one progress update per minute keeps a simulated day at a few thousand ticks
+    monkeypatch.setattr(utils, 'tick_interval', 60)
+    monkeypatch.setattr(cardfarming, 'executor_class', fake_steam.FakeSteamAPIExecutor)
+    monkeypatch.setattr(steam_process, 'watcher', fake_steam.running_steam_watcher())
+    return index
+
+
+def simulate(
+        server: fake_steam.FakeSteam,
+        session_index: int,
+        generator_factory: Callable[[], AsyncGenerator[utils.ModuleData, None]],
+        plugin: str = '',
+) -> Tuple[List[utils.ModuleData], float]:
+    async def main() -> Tuple[List[utils.ModuleData], float]:
+        async with server:
+            await stlib.set_default_http_params(session_index, **server.http_params())
+            await community.Community.new_session(session_index, **server.session_kwargs('community'))
+            await webapi.SteamWebAPI.new_session(session_index, api_key='key', **server.session_kwargs('webapi'))
+
+            if plugin:
+                await plugins.get_plugin(plugin).Main.new_session(session_index, **server.session_kwargs(plugin))
+
+            start_time = utils.loop_time()
+
+            try:
+                updates = [data async for data in generator_factory()]
+            finally:
+                # the shared http session is closed by the first one
+                for module in (community.Community, webapi.SteamWebAPI, internals.Internals):
+                    with contextlib.suppress(KeyError):
+                        await module.destroy_session(session_index, no_fail=True)
+
+            return updates, utils.loop_time() - start_time
+
+    return virtual_time.run(main())
+
+
+def farming_intervals(server: fake_steam.FakeSteam) -> Dict[int, Tuple[float, float]]:
+    intervals: Dict[int, Tuple[float, float]] = {}
+
+    for request_time, route, url in server.history:
+        if route.endswith('GetOwnedGames/v1'):
+            appid = int(url.query['appids_filter[0]'])
+        elif route.endswith('gamecards/{appid}'):
+            appid = int(url.name)
+        else:
+            continue
+
+        start, _end = intervals.get(appid, (request_time, request_time))
+        intervals[appid] = (start, request_time)
+
+    return intervals
+
+
+def test_timed_module_data_skips_waits() -> None:
+    async def wait() -> Tuple[List[Tuple[int, int]], float]:
+        start_time = utils.loop_time()
+        levels = [data.level async for data in utils.timed_module_data(18000, utils.ModuleData(info='Waiting'))]
+        return levels, utils.loop_time() - start_time
+
+    start = time.perf_counter()
+    levels, elapsed = virtual_time.run(wait())
+
+    assert time.perf_counter() - start < 5
+    assert len(levels) == 18000
+    assert levels[-1] == (17999, 18000)
+    assert elapsed == pytest.approx(18000, abs=0.1)
+
+
+def test_timed_module_data_excludes_paused_time() -> None:
+    async def wait() -> float:
+        start_time = utils.loop_time()
+
+        async for data in utils.timed_module_data(5, utils.ModuleData(info='Waiting')):
+            if data.level[0] == 2:
+                # like a paused game waiting for the play event
+                await asyncio.sleep(3)
+
+        return utils.loop_time() - start_time
+
+    assert virtual_time.run(wait()) == pytest.approx(8, abs=0.1)
+
+
+def test_cardfarming_day(session_index: int) -> None:
+    data = fake_steam.FakeSteamData.generate(games=3, coupons=0, orders=0, confirmations=0, giveaways=0)
+
+    for game in data.games:
+        game.cards = 2
+
+    server = fake_steam.FakeSteam(data)
+    start = time.perf_counter()
+    _updates, elapsed = simulate(server, session_index, lambda: cardfarming.main(steamid, session_index=session_index))
+
+    assert time.perf_counter() - start < 10
+    # 7200s of mandatory waiting plus two rounds of waiting while running
+    assert 7200 < elapsed < 86400
+    assert server.requests['/community/profiles/{steamid}/badges/'] == 1
+    # drops are checked until the server answers with no cards remaining
+    assert server.requests['/community/profiles/{steamid}/gamecards/{appid}'] == 3 * 3
+    assert server.requests['/api/IPlayerService/GetOwnedGames/v1'] == 3 * 3
+    assert all(game.cards == 0 for game in data.games)
+
+    # every game is farmed at the same time
+    intervals = farming_intervals(server)
+    assert len(intervals) == 3
+    assert max(start for start, _end in intervals.values()) - min(start for start, _end in intervals.values()) < 1
+
+
+def test_cardfarming_concurrency_is_fair(session_index: int) -> None:
+    config.get_parser(session_index).set('cardfarming', 'max_concurrency', '2')
+    data = fake_steam.FakeSteamData.generate(games=6, coupons=0, orders=0, confirmations=0, giveaways=0)
+
+    for game in data.games:
+        game.cards = 1
+
+    server = fake_steam.FakeSteam(data)
+    simulate(server, session_index, lambda: cardfarming.main(steamid, session_index=session_index))
+
+    checks = collections.Counter(url.name for _time, route, url in server.history if route.endswith('{appid}'))
+    # one check with the card remaining and one with none
+    assert checks == {str(game.appid): 2 for game in data.games}
+
+    intervals = farming_intervals(server)
+    assert sorted(intervals) == [game.appid for game in data.games]
+
+    events = sorted(
+        [(start, 1) for start, _end in intervals.values()] + [(end, -1) for _start, end in intervals.values()]
+    )
+    running = list(itertools.accumulate(change for _time, change in events))
+    assert max(running) == 2
+
+    # games start in badge order as soon as another one finishes
+    starts = sorted(intervals, key=lambda appid: intervals[appid][0])
+    assert starts == [game.appid for game in data.games]
+
+
+def test_cardfarming_resumes_from_checkpoint(session_index: int) -> None:
+    data = fake_steam.FakeSteamData.generate(games=3, coupons=0, orders=0, confirmations=0, giveaways=0)
+
+    for game in data.games:
+        game.cards = 1
+
+    running, waiting_drops, done = data.games
+    saved = checkpoint.Checkpoint(config.get_checkpoint_file(session_index), steamid.id64)
+    saved.badges = [community.Badge(game.name, game.appid, game.cards) for game in data.games]
+    # the time stng was down doesn't count as played time
+    saved.games[running.appid] = checkpoint.GameState('running', remaining=600, cards=1)
+    saved.games[waiting_drops.appid] = checkpoint.GameState('drops', deadline=time.time() - 1, cards=1)
+    saved.games[done.appid] = checkpoint.GameState('done')
+    saved.save()
+
+    server = fake_steam.FakeSteam(data)
+    simulate(server, session_index, lambda: cardfarming.main(steamid, session_index=session_index))
+
+    assert server.requests['/community/profiles/{steamid}/badges/'] == 0
+    # the first cycle of each game continues where it stopped
+    assert server.requests['/api/IPlayerService/GetOwnedGames/v1'] == 2
+    checks = collections.Counter(url.name for _time, route, url in server.history if route.endswith('{appid}'))
+    assert checks == {str(running.appid): 2, str(waiting_drops.appid): 2}
+
+    first_checks = {}
+
+    for request_time, route, url in server.history:
+        if route.endswith('{appid}'):
+            first_checks.setdefault(int(url.name), request_time)
+
+    # the remaining run time plus waiting for drops
+    assert 720 <= first_checks[running.appid] - first_checks[waiting_drops.appid] < 760
+    assert not config.get_checkpoint_file(session_index).exists()
+
+
+def test_checkpoint_round_trip(tmp_path: Path) -> None:
+    path = tmp_path / 'cardfarming.json'
+    saved = checkpoint.Checkpoint(path, steamid.id64)
+    saved.badges = [community.Badge('Game', 10, 3), community.Badge('Other', 20, 2)]
+    saved.save()
+    saved.update(10, phase='drops', deadline=100.0, cards=1)
+    saved.update(20, phase='done', cards=0)
+
+    loaded = checkpoint.Checkpoint.load(path, steamid.id64)
+    assert loaded.is_fresh()
+    assert loaded.games == saved.games
+    assert loaded.pending_badges() == [community.Badge('Game', 10, 1)]
+
+    # another account, other settings or an old checkpoint is ignored
+    assert not checkpoint.Checkpoint.load(path, steamid.id64 + 1).is_fresh()
+    assert not checkpoint.Checkpoint.load(path, steamid.id64, custom_game_id=10).is_fresh()
+    assert not checkpoint.Checkpoint.load(path, steamid.id64, reverse_sorting=True).is_fresh()
+    loaded.saved_at -= checkpoint.max_age
+    assert not loaded.is_fresh()
+
+
+def test_steamgifts_full_cycle(session_index: int) -> None:
+    # it can only be changed before the first use
+    with contextlib.suppress(RuntimeError):
+        plugins.add_search_paths(*[str(Path(site_, 'stlib-plugins')) for site_ in site.getsitepackages()])
+
+    if not plugins.has_plugin('steamgifts'):
+        pytest.skip('steamgifts plugin is not installed')
+
+    data = fake_steam.FakeSteamData.generate(games=0, coupons=0, orders=0, confirmations=0, giveaways=20)
+    data.points = 10000
+    eligible = [giveaway for giveaway in data.giveaways if giveaway.level <= data.level]
+
+    server = fake_steam.FakeSteam(data)
+    updates, elapsed = simulate(server, session_index, lambda: steamgifts.main(session_index), 'steamgifts')
+
+    assert not [update.error for update in updates if update.error]
+    assert elapsed > config.get_parser(session_index).getint('steamgifts', 'wait_after_full_cycle')
+    assert server.requests['/steamgifts/ajax.php'] == len(eligible)
+    assert all(giveaway.entered for giveaway in eligible)
+    assert data.points == 10000 - sum(giveaway.points for giveaway in eligible)